@@ -0,0 +1,46 @@
+"""
+Compara dois arquivos de resultado de `benchmarks.run`.
+
+Uso:
+    python -m benchmarks.compare base.json novo.json [--threshold 0.10]
+
+Sai com código 1 se algum caso ficar mais lento que `threshold` (fração) em relação à base.
+"""
+import argparse
+import json
+import sys
+
+
+def _index(report: dict) -> dict:
+    return {(r["suite"], r["case"], r["size"]): r for r in report["results"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara resultados de benchmark entre commits.")
+    parser.add_argument("base")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+
+    base_results, candidate_results = _index(base), _index(candidate)
+    regressions = 0
+    print(f"base={base['commit']} candidato={candidate['commit']}")
+    for key in sorted(base_results.keys() & candidate_results.keys()):
+        before, after = base_results[key]["mean_s"], candidate_results[key]["mean_s"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSÃO"
+            regressions += 1
+        print(f"{'/'.join(key):<45} {before * 1000:9.1f}ms -> {after * 1000:9.1f}ms  {change:+7.1%}{flag}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
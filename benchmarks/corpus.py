@@ -0,0 +1,123 @@
+"""
+Geradores de corpus sintético para os benchmarks do pipeline Markdown/Postman → PDF.
+
+Todos os geradores são determinísticos (mesmos parâmetros, mesma saída), para que
+resultados de commits diferentes sejam comparáveis.
+"""
+import json
+import random
+
+_WORDS = (
+    "api requisição resposta token usuário produto pedido cliente pagamento status "
+    "serviço parâmetro valor campo lista registro autenticação erro limite página"
+).split()
+
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, sentences: int = 4) -> str:
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def _json_payload(rng: random.Random, fields: int = 6) -> dict:
+    return {f"{rng.choice(_WORDS)}_{i}": rng.choice([rng.randint(0, 9999), _sentence(rng, 3), True, None])
+            for i in range(fields)}
+
+
+def markdown_document(sections: int, paragraphs_per_section: int = 3, seed: int = 1) -> str:
+    """Documento de texto corrido com títulos H1/H2/H3."""
+    rng = random.Random(seed)
+    parts = ["# Documento de Benchmark\n\n"]
+    for section in range(sections):
+        parts.append(f"## Seção {section + 1}\n\n")
+        for paragraph in range(paragraphs_per_section):
+            if paragraph == 1:
+                parts.append(f"### Subseção {section + 1}.{paragraph}\n\n")
+            parts.append(_paragraph(rng) + "\n\n")
+    return "".join(parts)
+
+
+def table_heavy_document(tables: int, rows: int = 20, columns: int = 5, seed: int = 2) -> str:
+    """Documento dominado por tabelas Markdown."""
+    rng = random.Random(seed)
+    header = "| " + " | ".join(f"Coluna {c + 1}" for c in range(columns)) + " |\n"
+    separator = "|" + "---|" * columns + "\n"
+    parts = ["# Tabelas\n\n"]
+    for table in range(tables):
+        parts.append(f"## Tabela {table + 1}\n\n{header}{separator}")
+        for _ in range(rows):
+            parts.append("| " + " | ".join(_sentence(rng, 2) for _ in range(columns)) + " |\n")
+        parts.append("\n")
+    return "".join(parts)
+
+
+def code_heavy_document(blocks: int, lines_per_block: int = 30, seed: int = 3) -> str:
+    """Documento dominado por blocos de código cercados (JSON)."""
+    rng = random.Random(seed)
+    parts = ["# Exemplos de Código\n\n"]
+    for block in range(blocks):
+        payload = [_json_payload(rng) for _ in range(max(1, lines_per_block // 8))]
+        parts.append(f"## Exemplo {block + 1}\n\n```json\n{json.dumps(payload, indent=2)}\n```\n\n")
+    return "".join(parts)
+
+
+def _postman_request(rng: random.Random, index: int) -> dict:
+    return {
+        "name": f"Endpoint {index}",
+        "request": {
+            "method": rng.choice(["GET", "POST", "PUT", "DELETE"]),
+            "description": _sentence(rng),
+            "header": [{"key": "Content-Type", "value": "application/json", "description": "Tipo de conteúdo"}],
+            "body": {"mode": "raw", "raw": json.dumps(_json_payload(rng))},
+            "url": {
+                "raw": f"https://api.example.com/v1/recurso/{index}",
+                "query": [{"key": "page", "value": "1", "description": "Página"}],
+                "variable": [{"key": "id", "value": str(index), "description": "Identificador"}],
+            },
+        },
+        "response": [{"name": "OK", "code": 200, "body": json.dumps(_json_payload(rng, 10))}],
+    }
+
+
+def postman_collection(requests: int, depth: int = 2, folders_per_level: int = 4, seed: int = 4) -> dict:
+    """
+    Coleção Postman com `requests` requisições distribuídas em uma árvore de pastas
+    com `depth` níveis e `folders_per_level` pastas por nível.
+    """
+    rng = random.Random(seed)
+    leaves = []
+
+    def build(level: int) -> list:
+        if level == depth:
+            folder = []
+            leaves.append(folder)
+            return folder
+        return [{"name": f"Pasta {level}.{i}", "description": _sentence(rng), "item": build(level + 1)}
+                for i in range(folders_per_level)]
+
+    root_items = build(0)
+    for index in range(requests):
+        leaves[index % len(leaves)].append(_postman_request(rng, index))
+
+    return {
+        "info": {"name": "Coleção de Benchmark", "description": _paragraph(rng)},
+        "item": root_items,
+    }
+
+
+def deep_postman_collection(depth: int, requests_per_level: int = 1, seed: int = 5) -> dict:
+    """Coleção com uma única cadeia de pastas aninhadas `depth` níveis."""
+    rng = random.Random(seed)
+    index = 0
+    innermost = []
+    items = innermost
+    for level in range(depth):
+        for _ in range(requests_per_level):
+            items.append(_postman_request(rng, index))
+            index += 1
+        child = []
+        items.append({"name": f"Nível {level + 1}", "item": child})
+        items = child
+    return {"info": {"name": "Coleção Profunda"}, "item": innermost}
@@ -0,0 +1,274 @@
+"""
+Benchmarks do pipeline completo Markdown/Postman → PDF.
+
+Uso:
+    python -m benchmarks.run [--suite postman converter api] [--sizes small medium large]
+                             [--repeat 3] [--output benchmarks/results/<commit>.json]
+
+Mede tempo (média, p50, p95), vazão, duração por etapa (`MarkdownToPDFConverter.timings`)
+e pico de memória Python (tracemalloc, medido em uma execução extra) para
+`PostmanJsonToMarkdown`, `MarkdownToPDFConverter` e o endpoint `/convert/` (inclusive
+a re-renderização incremental de uma coleção com uma única requisição alterada).
+O resultado é um JSON comparável entre commits com `python -m benchmarks.compare`.
+A suíte "api" usa o `TestClient` do FastAPI e, portanto, requer o pacote httpx.
+"""
+import argparse
+import io
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks import corpus
+
+SIZES = {
+    "small": {"sections": 10, "tables": 5, "code_blocks": 10, "requests": 100, "depth": 50},
+    "medium": {"sections": 100, "tables": 40, "code_blocks": 80, "requests": 2000, "depth": 200},
+    "large": {"sections": 500, "tables": 200, "code_blocks": 400, "requests": 20000, "depth": 400},
+}
+
+SUITES = ("postman", "converter", "api")
+
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def measure(fn, repeat: int) -> dict:
+    """
+    Executa `fn` `repeat` vezes e uma vez extra sob tracemalloc.
+
+    `fn` pode retornar um dicionário de durações por etapa, que é agregado pela média.
+    """
+    durations = []
+    stages = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage_timings = fn()
+        durations.append(time.perf_counter() - start)
+        for stage, seconds in (stage_timings or {}).items():
+            stages.setdefault(stage, []).append(seconds)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "runs": repeat,
+        "mean_s": statistics.mean(durations),
+        "min_s": min(durations),
+        "p50_s": _percentile(durations, 0.5),
+        "p95_s": _percentile(durations, 0.95),
+        "stages_s": {stage: statistics.mean(values) for stage, values in stages.items()},
+        "peak_python_bytes": peak,
+    }
+
+
+def bench_postman(size: str, params: dict, repeat: int) -> list:
+    from src.core.postman_html import PostmanHtmlRenderer
+    from src.core.postman_json_to_markdown import PostmanJsonToMarkdown
+    from src.core.postman_stream import StreamingPostmanJsonToMarkdown
+
+    cases = {
+        "wide": corpus.postman_collection(params["requests"], depth=3),
+        "deep": corpus.deep_postman_collection(params["depth"]),
+    }
+    results = []
+    for case, collection in cases.items():
+        raw = json.dumps(collection).encode("utf-8")
+        requests = _count_requests(collection)
+
+        def from_dict():
+            PostmanJsonToMarkdown(json.loads(raw)).write_markdown(io.StringIO())
+
+        def from_stream():
+            StreamingPostmanJsonToMarkdown(io.BytesIO(raw)).write_markdown(io.StringIO())
+
+        def stream_html():
+            PostmanHtmlRenderer(StreamingPostmanJsonToMarkdown(io.BytesIO(raw))).convert_to_html()
+
+        for variant, fn in (("dict", from_dict), ("stream", from_stream), ("stream_html", stream_html)):
+            result = measure(fn, repeat)
+            result.update({
+                "suite": "postman",
+                "case": f"{case}_{variant}",
+                "size": size,
+                "input_bytes": len(raw),
+                "requests": requests,
+                "requests_per_s": requests / result["mean_s"],
+                "mb_per_s": len(raw) / 1e6 / result["mean_s"],
+            })
+            results.append(result)
+    return results
+
+
+def _count_requests(collection: dict) -> int:
+    count, stack = 0, list(collection["item"])
+    while stack:
+        item = stack.pop()
+        if "item" in item:
+            stack.extend(item["item"])
+        elif "request" in item:
+            count += 1
+    return count
+
+
+def _markdown_cases(params: dict) -> dict:
+    return {
+        "text": corpus.markdown_document(params["sections"]),
+        "tables": corpus.table_heavy_document(params["tables"]),
+        "code": corpus.code_heavy_document(params["code_blocks"]),
+    }
+
+
+def bench_converter(size: str, params: dict, repeat: int, workdir: Path) -> list:
+    from src.core.converter import MarkdownToPDFConverter
+
+    results = []
+    for case, markdown in _markdown_cases(params).items():
+        md_path = workdir / f"{case}_{size}.md"
+        pdf_path = workdir / f"{case}_{size}.pdf"
+        md_path.write_text(markdown, encoding="utf-8")
+        pages = []
+
+        def convert():
+            converter = MarkdownToPDFConverter(md_path=str(md_path), pdf_path=str(pdf_path), header_text="Benchmark")
+            converter.convert()
+            pages.append(converter.page_count)
+            return converter.timings
+
+        result = measure(convert, repeat)
+        result.update({
+            "suite": "converter",
+            "case": case,
+            "size": size,
+            "input_bytes": len(markdown.encode("utf-8")),
+            "pages": pages[-1],
+            "output_bytes": pdf_path.stat().st_size,
+            "pages_per_s": pages[-1] / result["mean_s"],
+        })
+        results.append(result)
+    return results
+
+
+def bench_api(size: str, params: dict, repeat: int) -> list:
+    from fastapi.testclient import TestClient
+
+    from src.api.main import app
+
+    inputs = {f"markdown_{case}": ("markdown_file", f"{case}.md", text.encode("utf-8"))
+              for case, text in _markdown_cases(params).items()}
+    collection = corpus.postman_collection(params["requests"], depth=3)
+    inputs["postman"] = ("postman_json_file", "collection.json", json.dumps(collection).encode("utf-8"))
+
+    results = []
+    with TestClient(app) as client:
+        for case, (field, filename, payload) in inputs.items():
+            counter = iter(range(1_000_000))
+
+            def post(header_text=None):
+                # Cabeçalho único por execução para medir a conversão, não o cache de resultados.
+                response = client.post(
+                    "/convert/",
+                    files={field: (filename, payload)},
+                    data={"header_text": header_text or f"Benchmark {next(counter)} {time.time()}"},
+                )
+                response.raise_for_status()
+
+            result = measure(post, repeat)
+            result.update({"suite": "api", "case": case, "size": size, "input_bytes": len(payload)})
+            results.append(result)
+
+            post("Benchmark cache")
+            cached = measure(lambda: post("Benchmark cache"), repeat)
+            cached.update({"suite": "api", "case": f"{case}_cache_hit", "size": size, "input_bytes": len(payload)})
+            results.append(cached)
+
+        # Renderização incremental: a cada execução muda uma única requisição da coleção.
+        edits = iter(range(1_000_000))
+        payload = inputs["postman"][2]
+
+        def post_incremental(data=None):
+            response = client.post(
+                "/convert/",
+                files={"postman_json_file": ("collection.json", data or payload)},
+                data={"header_text": "Benchmark incremental", "incremental": "true"},
+            )
+            response.raise_for_status()
+
+        def post_one_change():
+            target = collection["item"][0]
+            while "item" in target:
+                target = target["item"][0]
+            target["name"] = f"Requisição alterada {next(edits)}"
+            post_incremental(json.dumps(collection).encode("utf-8"))
+
+        post_incremental()
+        result = measure(post_one_change, repeat)
+        result.update({"suite": "api", "case": "postman_incremental_edit", "size": size,
+                       "input_bytes": len(payload)})
+        results.append(result)
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline Markdown/Postman → PDF.")
+    parser.add_argument("--suite", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--sizes", nargs="+", choices=SIZES, default=["small", "medium"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="Arquivo JSON de saída (padrão: benchmarks/results/<commit>.json)")
+    args = parser.parse_args(argv)
+
+    commit = _git_commit()
+    output = args.output or Path(__file__).resolve().parent / "results" / f"{commit}.json"
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            params = SIZES[size]
+            if "postman" in args.suite:
+                results.extend(bench_postman(size, params, args.repeat))
+            if "converter" in args.suite:
+                results.extend(bench_converter(size, params, args.repeat, Path(workdir)))
+            if "api" in args.suite:
+                results.extend(bench_api(size, params, args.repeat))
+
+    for result in results:
+        print(f"{result['suite']:<10} {result['case']:<28} {result['size']:<7} "
+              f"mean={result['mean_s'] * 1000:9.1f}ms  p95={result['p95_s'] * 1000:9.1f}ms  "
+              f"peak={result['peak_python_bytes'] / 1e6:7.1f}MB")
+
+    report = {
+        "commit": commit,
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "results": results,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Resultados gravados em {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+
+
+class RequestTooLargeError(HTTPException):
+    """
+    Requisição ou arquivo acima do tamanho máximo permitido (HTTP 413).
+
+    Deriva de HTTPException para atravessar o parse do formulário do FastAPI, que
+    converteria qualquer outra exceção levantada durante a leitura do corpo em 400.
+    """
+    def __init__(self, detail: str):
+        super().__init__(status_code=413, detail=detail)
+
+
+class RequestSizeLimitMiddleware:
+    """
+    Middleware ASGI que limita o tamanho do corpo das requisições.
+
+    Requisições com Content-Length acima do limite são rejeitadas antes de qualquer
+    leitura; nas demais (ex.: Transfer-Encoding chunked), os bytes são contados à
+    medida que chegam e a leitura é interrompida assim que o limite é ultrapassado,
+    antes de o upload ser gravado por completo.
+    """
+    def __init__(self, app, max_bytes: int, path_limits: dict = None):
+        """
+        Args:
+            app: A aplicação ASGI.
+            max_bytes (int): Tamanho máximo do corpo, em bytes.
+            path_limits (dict, optional): Limites específicos por caminho exato (ex.: lotes).
+        """
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_limits = path_limits or {}
+
+    @staticmethod
+    def _error_message(max_bytes: int) -> str:
+        return f"A requisição excede o tamanho máximo permitido de {max_bytes} bytes."
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_bytes = self.path_limits.get(scope["path"], self.max_bytes)
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None:
+            try:
+                declared = int(content_length)
+            except ValueError:
+                await JSONResponse({"detail": "Cabeçalho Content-Length inválido."}, status_code=400)(scope, receive, send)
+                return
+            if declared > max_bytes:
+                response = JSONResponse({"detail": self._error_message(max_bytes)}, status_code=413)
+                await response(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    raise RequestTooLargeError(self._error_message(max_bytes))
+            return message
+
+        await self.app(scope, limited_receive, send)
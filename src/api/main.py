@@ -1,33 +1,635 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from prometheus_client import CONTENT_TYPE_LATEST
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
+from typing import List
+import asyncio
+import io
+import json
+import logging
 import shutil
 import os
 import secrets
-import json
+import time
 
-from src.core.converter import MarkdownToPDFConverter
+from src.api.limits import RequestSizeLimitMiddleware, RequestTooLargeError
+from src.core.assets import AssetStore, manifest_digest, normalize_asset_path
+from src.core.batch import ZipStream, merge_pdfs_with_toc
+from src.core.body_format import BodyFormatter
+from src.core.chunking import merge_pdf_chunks, pack_sections, split_markdown
+from src.core.jobs import JOB_DONE, JOB_FAILED, JobStore, describe_job
+from src.core.metrics import (
+    INPUT_BYTES,
+    POSTMAN_FRAGMENTS,
+    mark_process_exit,
+    observe_error,
+    observe_render,
+    observe_timings,
+    render_latest,
+    timed_stage,
+    update_body_cache_stats,
+    update_cache_stats,
+    update_scratch_usage,
+)
+from src.core.render_executor import (
+    RenderExecutor,
+    RenderQueueFullError,
+    RenderTimeoutError,
+    available_cpus,
+    render_html,
+    render_markdown,
+)
+from src.core.result_cache import PDFResultCache, iter_file_chunks
+from src.core.scratch import ScratchSpace
 from src.core.styles import generate_pdf_css
-from src.core.postman_json_to_markdown import PostmanJsonToMarkdown # NOVO: Importa a nova classe
+from src.core.postman_html import PostmanHtmlRenderer
+from src.core.profiling import profile_conversion, write_artifact
+from src.core.preview import PREVIEW_CSP, iter_markdown_preview, preview_error, preview_head, preview_tail
+from src.core.postman_json_to_markdown import PostmanJsonToMarkdown
+from src.core.postman_incremental import PostmanFragmentPlanner, merge_pdf_fragments
+from src.core.postman_stream import (
+    PostmanCollectionTooComplexError,
+    PostmanCollectionTooLargeError,
+    StreamingPostmanJsonToMarkdown,
+)
 
 # ======================================================================# Configuração da Aplicação FastAPI# ======================================================================
 
+_PROCESS_START = time.monotonic() # Referência para medir o tempo até o serviço ficar pronto
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+logger = logging.getLogger(__name__)
+
+TEMP_DIR = BASE_DIR / "temp"
+TEMP_DIR.mkdir(exist_ok=True) # Garante que o diretório temp existe
+
+# Processos do servidor (ver src/serve.py); cada um tem seu próprio pool de renderização.
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+
+# Pool de renderização: workers WeasyPrint em processos separados, fila de admissão limitada.
+# 0 = CPUs disponíveis divididas entre os processos do servidor.
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "0")) or max(1, available_cpus() // WEB_CONCURRENCY)
+RENDER_QUEUE_SIZE = int(os.getenv("RENDER_QUEUE_SIZE", "16"))
+RENDER_TIMEOUT = float(os.getenv("RENDER_TIMEOUT", "120"))
+RENDER_RETRY_AFTER = int(os.getenv("RENDER_RETRY_AFTER", "5"))
+# Documentos com ao menos o dobro deste tamanho (caracteres) são divididos em títulos H1/H2
+# e renderizados em paralelo nos workers; 0 desativa a divisão.
+RENDER_CHUNK_CHARS = int(os.getenv("RENDER_CHUNK_CHARS", "200000"))
+# Tempo máximo para todos os workers terminarem o aquecimento (renderização de um documento pequeno).
+RENDER_WARMUP_TIMEOUT = float(os.getenv("RENDER_WARMUP_TIMEOUT", "120"))
+# Contenção de memória do WeasyPrint/Pango: os workers são substituídos após, em média, este
+# número de jobs cada (o pool inteiro é trocado, ver `RenderExecutor`) e têm um teto de memória (espaço de endereçamento), em MB; 0 desativa cada limite.
+RENDER_MAX_TASKS_PER_CHILD = int(os.getenv("RENDER_MAX_TASKS_PER_CHILD", "0"))
+RENDER_MEMORY_LIMIT_MB = int(os.getenv("RENDER_MEMORY_LIMIT_MB", "0"))
+
+# Imagens referenciadas pelos documentos: arquivos enviados junto em /convert/ (até ASSETS_MAX_FILES,
+# cada um com até ASSET_MAX_BYTES) e cópias dos recursos remotos, guardados por conteúdo em
+# TEMP_DIR/assets com remoção LRU acima de ASSETS_CACHE_MAX_BYTES.
+ASSETS_MAX_FILES = int(os.getenv("ASSETS_MAX_FILES", "200"))
+ASSET_MAX_BYTES = int(os.getenv("ASSET_MAX_BYTES", str(10 * 1024 * 1024)))
+ASSETS_CACHE_MAX_BYTES = int(os.getenv("ASSETS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Recursos remotos: tempo limite de cada download (s) e validade da cópia local (s).
+# Com ASSETS_OFFLINE, nada é baixado: só as cópias já existentes são usadas.
+ASSET_FETCH_TIMEOUT = float(os.getenv("ASSET_FETCH_TIMEOUT", "10"))
+ASSET_REMOTE_TTL = float(os.getenv("ASSET_REMOTE_TTL", "86400"))
+ASSETS_OFFLINE = os.getenv("ASSETS_OFFLINE", "false").lower() in ("1", "true", "yes")
+# Entradas do cache de imagens já decodificadas de cada worker de renderização; 0 desativa.
+ASSET_IMAGE_CACHE_ENTRIES = int(os.getenv("ASSET_IMAGE_CACHE_ENTRIES", "256"))
+
+asset_store = AssetStore(TEMP_DIR / "assets", max_bytes=ASSETS_CACHE_MAX_BYTES)
+
+render_executor = RenderExecutor(
+    max_workers=RENDER_WORKERS,
+    max_queue=RENDER_QUEUE_SIZE,
+    timeout=RENDER_TIMEOUT,
+    retry_after=RENDER_RETRY_AFTER,
+    max_tasks_per_child=RENDER_MAX_TASKS_PER_CHILD,
+    memory_limit=RENDER_MEMORY_LIMIT_MB * 1024 * 1024,
+    asset_settings={
+        "directory": str(asset_store.directory),
+        "max_bytes": ASSETS_CACHE_MAX_BYTES,
+        "allow_remote": not ASSETS_OFFLINE,
+        "timeout": ASSET_FETCH_TIMEOUT,
+        "max_fetch_bytes": ASSET_MAX_BYTES,
+        "remote_ttl": ASSET_REMOTE_TTL,
+        "image_cache_entries": ASSET_IMAGE_CACHE_ENTRIES,
+    }
+)
+
+async def _warm_up_renderer():
+    """
+    Aquece os workers de renderização em segundo plano; `/ready` só responde 200 ao final.
+    """
+    try:
+        warmup_seconds = await render_executor.warm_up(RENDER_WARMUP_TIMEOUT)
+    except Exception:
+        logger.exception("Falha no aquecimento dos workers de renderização.")
+        return
+    logger.info(
+        "Renderização pronta: %d workers aquecidos em %.2fs (%.2fs desde o início do processo).",
+        render_executor.max_workers, warmup_seconds, time.monotonic() - _PROCESS_START
+    )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    render_executor.start()
+    _recover_unfinished_jobs()
+    background_tasks = [
+        asyncio.create_task(_warm_up_renderer()),
+        asyncio.create_task(_sweep_expired_jobs()),
+        asyncio.create_task(_sweep_scratch_space()),
+    ]
+    yield
+    for task in background_tasks:
+        task.cancel()
+    for task in list(_job_tasks):
+        task.cancel()
+    render_executor.shutdown()
+    mark_process_exit()
+
 app = FastAPI(
     title="Gerador de Documentação de API em PDF",
     description="API para converter documentações Markdown (.md) ou collection Postman (json) em documentos PDF com cabeçalho personalizado.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
+@lru_cache(maxsize=1)
+def _templates():
+    # Jinja2 só é importado quando a página inicial é pedida pela primeira vez.
+    from fastapi.templating import Jinja2Templates
 
-templates = Jinja2Templates(directory=str(BASE_DIR / "src" / "templates"))
+    return Jinja2Templates(directory=str(BASE_DIR / "src" / "templates"))
 
 app.mount("/statics", StaticFiles(directory=str(BASE_DIR / "src" / "statics")), name="statics")
 
-TEMP_DIR = BASE_DIR / "temp"
-TEMP_DIR.mkdir(exist_ok=True) # Garante que o diretório temp existe
+# Tamanho máximo aceito para o JSON de uma coleção Postman.
+POSTMAN_MAX_BYTES = int(os.getenv("POSTMAN_MAX_BYTES", str(200 * 1024 * 1024)))
+# Complexidade máxima de uma coleção: total de pastas/requisições e níveis de pastas aninhadas.
+POSTMAN_MAX_ITEMS = int(os.getenv("POSTMAN_MAX_ITEMS", "50000"))
+POSTMAN_MAX_DEPTH = int(os.getenv("POSTMAN_MAX_DEPTH", "32"))
+# Corpos de requisição/resposta acima deste tamanho (caracteres) são truncados ("truncate")
+# ou dobrados, mantendo início e fim ("fold"); 0 inclui os corpos inteiros.
+POSTMAN_BODY_MAX_CHARS = int(os.getenv("POSTMAN_BODY_MAX_CHARS", "20000"))
+POSTMAN_BODY_OVERFLOW = os.getenv("POSTMAN_BODY_OVERFLOW", "truncate")
+# Caracteres mantidos no cache de corpos já formatados, compartilhado entre as conversões.
+POSTMAN_BODY_CACHE_CHARS = int(os.getenv("POSTMAN_BODY_CACHE_CHARS", str(16 * 1024 * 1024)))
+# Inclui todos os exemplos de resposta de cada requisição, não apenas o primeiro.
+POSTMAN_ALL_EXAMPLES = os.getenv("POSTMAN_ALL_EXAMPLES", "false").lower() in ("1", "true", "yes")
+
+body_formatter = BodyFormatter(
+    max_chars=POSTMAN_BODY_MAX_CHARS,
+    overflow=POSTMAN_BODY_OVERFLOW,
+    cache_chars=POSTMAN_BODY_CACHE_CHARS
+)
+# Tamanho máximo aceito para um arquivo Markdown.
+MARKDOWN_MAX_BYTES = int(os.getenv("MARKDOWN_MAX_BYTES", str(20 * 1024 * 1024)))
+
+# Token exigido (cabeçalho X-Admin-Token) pelas rotas de administração, como o perfil de uma
+# conversão (`profile=true` em /convert/); vazio desativa essas rotas.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# Perfis gerados (ZIP com pstats, pilhas "collapsed" e estatísticas), removidos pela limpeza do TEMP_DIR.
+PROFILES_DIR = TEMP_DIR / "profiles"
+PROFILES_DIR.mkdir(exist_ok=True)
+
+# Tamanho máximo do corpo das requisições (verificado pelo Content-Length e durante o upload);
+# /convert/batch tem um limite próprio, para o lote inteiro.
+REQUEST_MAX_BYTES = int(os.getenv("REQUEST_MAX_BYTES", str(256 * 1024 * 1024)))
+BATCH_REQUEST_MAX_BYTES = int(os.getenv("BATCH_REQUEST_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    max_bytes=REQUEST_MAX_BYTES,
+    path_limits={"/convert/batch": BATCH_REQUEST_MAX_BYTES}
+)
+
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+result_cache = PDFResultCache(TEMP_DIR / "cache", max_bytes=CACHE_MAX_BYTES)
+
+# Número máximo de arquivos aceitos em uma única conversão em lote.
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+
+# Jobs assíncronos: conversões simultâneas, tempo de retenção dos resultados e intervalo da limpeza.
+JOBS_DIR = TEMP_DIR / "jobs"
+JOBS_DIR.mkdir(exist_ok=True)
+JOBS_CONCURRENCY = int(os.getenv("JOBS_CONCURRENCY", "2"))
+JOBS_TTL = float(os.getenv("JOBS_TTL", "3600"))
+JOBS_SWEEP_INTERVAL = float(os.getenv("JOBS_SWEEP_INTERVAL", "60"))
+
+job_store = JobStore(JOBS_DIR / "jobs.sqlite3")
+job_semaphore = asyncio.Semaphore(JOBS_CONCURRENCY)
+_job_tasks = set()
+
+# Cota do diretório temporário: idade máxima dos arquivos, tamanho total e intervalo da limpeza.
+# O cache de resultados e o de recursos têm suas próprias cotas (CACHE_MAX_BYTES e
+# ASSETS_CACHE_MAX_BYTES) e não entram nesta limpeza.
+TEMP_MAX_AGE = float(os.getenv("TEMP_MAX_AGE", str(24 * 3600)))
+TEMP_MAX_BYTES = int(os.getenv("TEMP_MAX_BYTES", str(1024 * 1024 * 1024)))
+TEMP_SWEEP_INTERVAL = float(os.getenv("TEMP_SWEEP_INTERVAL", "300"))
+
+scratch_space = ScratchSpace(
+    TEMP_DIR,
+    max_age=TEMP_MAX_AGE,
+    max_bytes=TEMP_MAX_BYTES,
+    exclude_dirs=(result_cache.directory, asset_store.directory),
+    protected_patterns=("jobs.sqlite3*", "*.input") # Banco de jobs e entradas ainda não processadas
+)
+
+def _etag_matches(request: Request, cache_key: str) -> bool:
+    """
+    Verifica se o cabeçalho If-None-Match do cliente corresponde ao ETag do resultado.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or f"\"{cache_key}\"" in tags
+
+def _detect_input_kind(filename: str):
+    """
+    Identifica o tipo de entrada pela extensão: "markdown", "postman" ou None.
+    """
+    if filename.endswith(('.md', '.markdown')):
+        return "markdown"
+    if filename.endswith('.json'):
+        return "postman"
+    return None
+
+def _postman_parser(json_file) -> StreamingPostmanJsonToMarkdown:
+    return StreamingPostmanJsonToMarkdown(
+        json_file,
+        max_bytes=POSTMAN_MAX_BYTES,
+        max_items=POSTMAN_MAX_ITEMS,
+        max_depth=POSTMAN_MAX_DEPTH,
+        body_formatter=body_formatter,
+        all_examples=POSTMAN_ALL_EXAMPLES
+    )
+
+def _postman_to_html(json_file) -> list:
+    """
+    Converte a coleção Postman em HTML (templates Jinja2) lendo o JSON como fluxo de
+    eventos, sem o Markdown intermediário.
+
+    Returns:
+        list: As seções do documento (cabeçalho e uma por item de primeiro nível),
+              pontos de corte para a renderização em paralelo.
+    """
+    return list(PostmanHtmlRenderer(_postman_parser(json_file)).iter_sections())
+
+def _postman_options_signature() -> str:
+    return PostmanJsonToMarkdown.options_signature(body_formatter, POSTMAN_ALL_EXAMPLES)
+
+def _require_admin(request: Request):
+    """
+    Exige o cabeçalho X-Admin-Token igual a ADMIN_TOKEN (403 se ausente, incorreto ou sem ADMIN_TOKEN).
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Rotas de administração desativadas (defina ADMIN_TOKEN).")
+    token = request.headers.get("x-admin-token", "")
+    if not secrets.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Token de administração inválido.")
+
+def _select_upload(markdown_file: UploadFile, postman_json_file: UploadFile):
+    """
+    Escolhe o arquivo enviado (Markdown OU coleção Postman) e valida sua extensão.
+
+    Returns:
+        tuple: (upload, tipo de entrada, nome do PDF de saída).
+    """
+    if markdown_file and markdown_file.filename:
+        if _detect_input_kind(markdown_file.filename) != "markdown":
+            raise HTTPException(
+                status_code=400,
+                detail="Por favor, envie um arquivo Markdown válido (.md ou .markdown)."
+            )
+        return markdown_file, "markdown", f"{Path(markdown_file.filename).stem}.pdf"
+
+    if postman_json_file and postman_json_file.filename:
+        if _detect_input_kind(postman_json_file.filename) != "postman":
+            raise HTTPException(
+                status_code=400,
+                detail="Por favor, envie um arquivo JSON (.json) válido para a coleção Postman."
+            )
+        return postman_json_file, "postman", f"postman_collection_{secrets.token_hex(8)}.pdf"
+
+    raise HTTPException(
+        status_code=400,
+        detail="Por favor, envie um arquivo Markdown ou um arquivo JSON de coleção Postman."
+    )
+
+def _check_input_size(input_kind: str, input_bytes: int):
+    """
+    Rejeita com 413 arquivos acima do limite do seu tipo, antes de qualquer leitura do conteúdo.
+    """
+    max_bytes = MARKDOWN_MAX_BYTES if input_kind == "markdown" else POSTMAN_MAX_BYTES
+    if input_bytes > max_bytes:
+        error = RequestTooLargeError(f"O arquivo excede o tamanho máximo permitido de {max_bytes} bytes.")
+        observe_error(error)
+        raise error
+
+async def _store_assets(uploads: List[UploadFile]) -> dict:
+    """
+    Guarda no `asset_store` os arquivos enviados junto com o documento. O nome de cada
+    arquivo é o caminho relativo usado pelo documento (ex.: "img/logo.png").
+
+    Returns:
+        dict: Caminho relativo -> SHA-256 do conteúdo (ver `MarkdownToPDFConverter`).
+    """
+    uploads = [upload for upload in uploads or [] if upload.filename]
+    if len(uploads) > ASSETS_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Envie no máximo {ASSETS_MAX_FILES} arquivos anexos.")
+    assets = {}
+    for upload in uploads:
+        try:
+            name = normalize_asset_path(upload.filename)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if upload.size is not None and upload.size > ASSET_MAX_BYTES:
+            error = RequestTooLargeError(f"O arquivo '{name}' excede o tamanho máximo de {ASSET_MAX_BYTES} bytes.")
+            observe_error(error)
+            raise error
+        data = await upload.read()
+        assets[name] = await run_in_threadpool(asset_store.put, data)
+    return assets
+
+async def _compute_cache_key(input_file, input_kind: str, header_text: str, variant: str = "") -> str:
+    """
+    Calcula a chave de cache da entrada (arquivo binário) fora do event loop.
+
+    `variant` distingue modos de conversão que geram PDFs diferentes para a mesma entrada.
+    """
+    if input_kind == "postman":
+        # Coleções são renderizadas via HTML; PDFs gerados pelo caminho antigo (Markdown) não são
+        # reaproveitados, nem os gerados com outras opções de formatação dos corpos.
+        options = f"html;{_postman_options_signature()}"
+        variant = f"{options}+{variant}" if variant else options
+    input_file.seek(0, os.SEEK_END)
+    input_bytes = input_file.tell()
+    input_file.seek(0)
+    INPUT_BYTES.labels(kind=input_kind).observe(input_bytes)
+    _check_input_size(input_kind, input_bytes)
+
+    timings = {}
+    with timed_stage(timings, "cache_key"):
+        cache_key = await run_in_threadpool(
+            PDFResultCache.make_key,
+            f"{input_kind}:{variant}" if variant else input_kind,
+            iter_file_chunks(input_file),
+            header_text,
+            generate_pdf_css(header_text)
+        )
+    observe_timings(timings, kind=input_kind)
+    return cache_key
+
+def _read_markdown(input_file) -> str:
+    return input_file.read().decode("utf-8-sig")
+
+async def _read_document(input_file, input_kind: str) -> tuple:
+    """
+    Retorna o documento a ser renderizado: o texto Markdown da entrada ou as seções
+    HTML geradas a partir da coleção Postman, lidos no threadpool. Nada é gravado no TEMP_DIR.
+
+    Returns:
+        tuple: ("markdown", texto) ou ("html", lista de seções), aceito por `_render_pdf`.
+    """
+    timings = {}
+    if input_kind == "markdown":
+        try:
+            with timed_stage(timings, "upload_read"):
+                md_content = await run_in_threadpool(_read_markdown, input_file)
+        except UnicodeDecodeError as e:
+            observe_error(e)
+            raise HTTPException(status_code=400, detail="O arquivo Markdown precisa estar codificado em UTF-8.")
+        observe_timings(timings, kind=input_kind)
+        return "markdown", md_content
+
+    # Com o parse em fluxo (ijson), leitura do JSON e geração do HTML formam uma única etapa.
+    return "html", await _parse_postman("postman_html", _postman_to_html, input_file)
+
+async def _parse_postman(stage: str, fn, *args):
+    """
+    Executa no threadpool uma leitura da coleção Postman, medindo a etapa e
+    traduzindo as falhas de leitura em erros HTTP.
+    """
+    timings = {}
+    try:
+        with timed_stage(timings, stage):
+            result = await run_in_threadpool(fn, *args)
+        observe_timings(timings, kind="postman")
+        return result
+    except PostmanCollectionTooLargeError as e:
+        observe_error(e)
+        raise HTTPException(status_code=413, detail=str(e))
+    except PostmanCollectionTooComplexError as e:
+        observe_error(e)
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        observe_error(e)
+        raise HTTPException(status_code=400, detail=str(e)) # JSON inválido ou erros de validação da coleção
+    except Exception as e:
+        observe_error(e)
+        raise HTTPException(status_code=500, detail=f"Erro ao processar arquivo JSON do Postman: {e}")
+
+async def _run_render_job(fn, *args):
+    """
+    Executa um job no pool de renderização, traduzindo as falhas em erros HTTP.
+    """
+    try:
+        return await render_executor.run(fn, *args)
+    except RenderQueueFullError as e:
+        observe_error(e)
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except RenderTimeoutError as e:
+        observe_error(e)
+        raise HTTPException(status_code=504, detail=str(e))
+    except FileNotFoundError as e:
+        observe_error(e)
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        observe_error(e)
+        raise HTTPException(status_code=500, detail=f"Erro durante a conversão para PDF: {e}")
+
+async def _render_pdf(document: tuple, header_text: str, assets: dict = None) -> bytes:
+    """
+    Renderiza o documento (ver `_read_document`) em PDF no pool de workers, inteiramente em memória.
+    `assets` são os arquivos enviados junto com o documento (ver `_store_assets`).
+
+    Documentos grandes são divididos em títulos H1/H2, ou nas seções do HTML gerado
+    (ver RENDER_CHUNK_CHARS): cada trecho é renderizado em um worker e os PDFs são
+    unidos, com os links entre trechos religados. Cada trecho começa em uma nova página.
+
+    Returns:
+        bytes: O PDF gerado.
+    """
+    content_format, content = document
+    if content_format == "html":
+        render_job = render_html
+        chunks = pack_sections(content, render_executor.max_workers, RENDER_CHUNK_CHARS)
+    else:
+        render_job = render_markdown
+        chunks = split_markdown(content, render_executor.max_workers, RENDER_CHUNK_CHARS)
+    if len(chunks) == 1:
+        result = await _run_render_job(render_job, chunks[0], header_text, False, assets)
+        observe_timings(result["timings"], pages=result["page_count"])
+        observe_render(result["page_count"], len(result["pdf_bytes"]))
+        return result["pdf_bytes"]
+
+    results = await asyncio.gather(
+        *(_run_render_job(render_job, chunk, header_text, True, assets) for chunk in chunks)
+    )
+    for result in results:
+        observe_timings(result["timings"], pages=result["page_count"], chunks=len(chunks))
+    pdf_bytes = await _run_render_job(merge_pdf_chunks, [result["pdf_bytes"] for result in results])
+    observe_render(sum(result["page_count"] for result in results), len(pdf_bytes))
+    return pdf_bytes
+
+def _write_file(path: Path, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+def _copy_upload(fileobj, path: Path):
+    with open(path, "wb") as buffer:
+        shutil.copyfileobj(fileobj, buffer)
+
+def _pin_cached_pdf(cache_key: str, target: Path):
+    """
+    Cria uma cópia própria (hard link ou cópia) do PDF em cache, para que ele sobreviva a
+    remoções LRU do cache até o fim da requisição ou do job.
+
+    Returns:
+        Path | None: `target`, ou None se o PDF não estiver (mais) no cache.
+    """
+    if target.exists():
+        return target # Mesma chave já fixada nesta requisição
+    pdf_path = result_cache.get(cache_key)
+    if pdf_path is None:
+        return None
+    try:
+        try:
+            os.link(pdf_path, target)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            shutil.copyfile(pdf_path, target)
+    except FileNotFoundError:
+        return None # Removido do cache entre a consulta e a cópia
+    return target
+
+def _make_work_dir(prefix: str) -> Path:
+    """
+    Diretório temporário de uma requisição que junta vários PDFs (lotes e fragmentos).
+    É removido ao fim da requisição; se ela for abandonada, pela limpeza do TEMP_DIR.
+    """
+    work_dir = TEMP_DIR / f"{prefix}_{secrets.token_hex(8)}"
+    work_dir.mkdir()
+    return work_dir
+
+def _store_work_pdf(work_dir: Path, cache_key: str, pdf_bytes: bytes) -> Path:
+    """Grava o PDF renderizado no diretório da requisição e no cache de resultados."""
+    pdf_path = work_dir / f"{cache_key}.pdf"
+    _write_file(pdf_path, pdf_bytes)
+    result_cache.put(cache_key, pdf_bytes)
+    return pdf_path
+
+def _plan_postman_fragments(json_file, header_text: str, work_dir: Path) -> list:
+    planner = PostmanFragmentPlanner(
+        _postman_parser(json_file),
+        header_text=header_text,
+        css=generate_pdf_css(header_text),
+        lookup=lambda cache_key: _pin_cached_pdf(cache_key, work_dir / f"{cache_key}.pdf")
+    )
+    return planner.plan()
+
+async def _render_fragment(fragment: dict, header_text: str, semaphore: asyncio.Semaphore, work_dir: Path):
+    async with semaphore:
+        pdf_bytes = await _render_pdf(("html", [fragment["html_content"]]), header_text)
+    fragment["html_content"] = None
+    fragment["pdf_path"] = await run_in_threadpool(_store_work_pdf, work_dir, fragment["cache_key"], pdf_bytes)
+
+async def _render_postman_incremental(json_file, header_text: str) -> bytes:
+    """
+    Renderiza uma coleção Postman por fragmentos (pastas de primeiro nível), reaproveitando
+    do cache os fragmentos cuja subárvore não mudou e juntando os PDFs no pool de workers.
+    Os fragmentos ficam em um diretório próprio da requisição até a junção terminar.
+
+    Returns:
+        bytes: O PDF final, com um marcador por fragmento.
+    """
+    work_dir = _make_work_dir("fragments")
+    try:
+        fragments = await _parse_postman(
+            "postman_fragments", _plan_postman_fragments, json_file, header_text, work_dir
+        )
+        missing = [fragment for fragment in fragments if fragment["pdf_path"] is None]
+        POSTMAN_FRAGMENTS.labels(result="reused").inc(len(fragments) - len(missing))
+        POSTMAN_FRAGMENTS.labels(result="rendered").inc(len(missing))
+
+        semaphore = asyncio.Semaphore(render_executor.max_workers)
+        await asyncio.gather(
+            *(_render_fragment(fragment, header_text, semaphore, work_dir) for fragment in missing)
+        )
+
+        documents = [(fragment["title"], str(fragment["pdf_path"])) for fragment in fragments]
+        return await _run_render_job(merge_pdf_fragments, documents)
+    finally:
+        await run_in_threadpool(shutil.rmtree, work_dir, True)
+
+async def _profile_conversion(upload: UploadFile, input_kind: str, header_text: str, assets: dict) -> tuple:
+    """
+    Converte a entrada sob o perfilador em um worker (ver `profiling.profile_conversion`),
+    sem passar pelo cache de resultados, e grava o ZIP do perfil em PROFILES_DIR.
+
+    Returns:
+        tuple: (bytes do PDF, identificador do perfil).
+    """
+    _check_input_size(input_kind, upload.size)
+    data = await upload.read()
+    result = await _run_render_job(
+        profile_conversion,
+        input_kind,
+        data,
+        header_text,
+        assets,
+        {
+            "max_bytes": POSTMAN_MAX_BYTES,
+            "max_items": POSTMAN_MAX_ITEMS,
+            "max_depth": POSTMAN_MAX_DEPTH,
+            "all_examples": POSTMAN_ALL_EXAMPLES,
+        },
+        {"max_chars": POSTMAN_BODY_MAX_CHARS, "overflow": POSTMAN_BODY_OVERFLOW}
+    )
+    # Os tempos medidos sob o perfilador não entram nos histogramas de /metrics.
+    profile_id = secrets.token_hex(16)
+    await run_in_threadpool(write_artifact, PROFILES_DIR / f"{profile_id}.zip", result)
+    logger.info("Perfil %s gerado: %s", profile_id, result["stats"])
+    return result["pdf_bytes"], profile_id
+
+def _pdf_headers(filename: str, cache_key: str) -> dict:
+    return {
+        "Content-Disposition": f"attachment; filename=\"{filename}\"",
+        "ETag": f"\"{cache_key}\""
+    }
+
+def _pdf_response(pdf_path: Path, filename: str, cache_key: str) -> FileResponse:
+    """Envia um PDF fixado por `_pin_cached_pdf` e o remove ao fim da resposta."""
+    return FileResponse(
+        path=str(pdf_path),
+        filename=filename,
+        media_type="application/pdf",
+        headers=_pdf_headers(filename, cache_key),
+        background=BackgroundTask(_remove_files, pdf_path)
+    )
 
 # ======================================================================# Endpoints da API# ======================================================================
 @app.get("/", response_class=HTMLResponse, summary="Página inicial do conversor")
@@ -35,13 +637,71 @@ async def read_root():
     """
     Exibe a página HTML para upload de arquivos Markdown e personalização do cabeçalho.
     """
-    return templates.TemplateResponse("index.html", {"request": {}})
+    return _templates().TemplateResponse("index.html", {"request": {}})
+
+@app.get("/health", summary="Verificação de vida do serviço")
+async def health():
+    """
+    Responde assim que o processo da API está no ar (liveness).
+    """
+    return {"status": "ok"}
+
+@app.get("/ready", summary="Verificação de prontidão do serviço")
+async def ready():
+    """
+    Responde 200 apenas depois que todos os workers de renderização foram aquecidos
+    (readiness); até lá, ou se o aquecimento falhar, responde 503.
+    """
+    if render_executor.ready:
+        return {
+            "status": "ready",
+            "workers": render_executor.max_workers,
+            "warmup_seconds": round(render_executor.warmup_seconds, 3),
+        }
+    status = "failed" if render_executor.warmup_error else "warming_up"
+    return JSONResponse({"status": status, "error": render_executor.warmup_error}, status_code=503)
+
+@app.get("/metrics", summary="Métricas no formato Prometheus")
+async def metrics():
+    """
+    Expõe histogramas de latência por etapa, tamanho de entrada, páginas e bytes gerados,
+    além dos contadores de erro e do estado do cache de resultados.
+    """
+    update_cache_stats(result_cache.stats())
+    update_body_cache_stats(body_formatter.stats())
+    return Response(content=render_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/temp/usage", summary="Uso de disco do diretório temporário")
+async def temp_usage():
+    """
+    Retorna arquivos e bytes ocupados no diretório temporário, por subdiretório,
+    além das cotas configuradas e do total já removido pela limpeza automática.
+    """
+    usage = await run_in_threadpool(scratch_space.usage)
+    update_scratch_usage(usage)
+    return usage
+
+@app.get("/cache/stats", summary="Métricas do cache de PDFs")
+async def cache_stats():
+    """
+    Retorna taxa de acertos, bytes armazenados e remoções do cache de resultados,
+    além do uso do cache de corpos formatados das coleções Postman e do cache de recursos (imagens).
+    """
+    return {
+        **result_cache.stats(),
+        "postman_bodies": body_formatter.stats(),
+        "assets": await run_in_threadpool(asset_store.usage),
+    }
 
 @app.post("/convert/", summary="Converte um arquivo Markdown ou JSON de coleção Postman para PDF")
 async def convert_to_pdf(
+    request: Request,
     markdown_file: UploadFile = File(None),
     postman_json_file: UploadFile = File(None),
-    header_text: str = Form("Documentação")
+    header_text: str = Form("Documentação"),
+    incremental: bool = Form(False),
+    assets: List[UploadFile] = File(None),
+    profile: bool = Form(False)
 ):
     """
     Recebe um arquivo Markdown OU um arquivo JSON de coleção Postman e um texto para o cabeçalho,
@@ -52,90 +712,456 @@ async def convert_to_pdf(
         postman_json_file (UploadFile): O arquivo JSON da coleção Postman exportado. (Opcional)
         header_text (str): O texto a ser exibido no cabeçalho superior central do PDF.
                             Valor padrão é "Documentação".
+        incremental (bool): Para coleções Postman, renderiza cada pasta de primeiro nível
+                            separadamente e reaproveita do cache as que não mudaram.
+                            Cada pasta passa a começar em uma nova página.
+        assets (List[UploadFile]): Imagens referenciadas pelo Markdown por caminhos relativos,
+                                   cada uma enviada com o caminho como nome. (Opcional)
+        profile (bool): Gera o perfil da conversão (exige o cabeçalho X-Admin-Token). O PDF é
+                        sempre renderizado, sem cache; o perfil fica disponível na URL do
+                        cabeçalho X-Profile-Url.
 
     Returns:
-        FileResponse: O arquivo PDF gerado para download.
+        Response: O arquivo PDF gerado para download, com ETag para revalidação
+                  via If-None-Match (304 quando o cliente já tem o PDF atual).
     """
-    input_md_path = None
-    output_pdf_path = None
-    output_pdf_filename = None
-
     try:
-        if markdown_file and markdown_file.filename:
-            if not markdown_file.filename.endswith(('.md', '.markdown')):
-                raise HTTPException(
-                    status_code=400,
-                    detail="Por favor, envie um arquivo Markdown válido (.md ou .markdown)."
-                )
-            input_md_path = TEMP_DIR / f"{secrets.token_hex(8)}_{markdown_file.filename}"
-            output_pdf_filename = f"{Path(markdown_file.filename).stem}.pdf"
-            
-            with open(input_md_path, "wb") as buffer:
-                shutil.copyfileobj(markdown_file.file, buffer)
-            
-        elif postman_json_file and postman_json_file.filename:
-            if not postman_json_file.filename.endswith('.json'):
-                raise HTTPException(
-                    status_code=400,
-                    detail="Por favor, envie um arquivo JSON (.json) válido para a coleção Postman."
-                )
+        if profile:
+            _require_admin(request)
+        upload, input_kind, output_pdf_filename = _select_upload(markdown_file, postman_json_file)
+        incremental = incremental and input_kind == "postman"
+        asset_manifest = await _store_assets(assets) if input_kind == "markdown" else {}
 
-            unique_id = secrets.token_hex(8)
-            input_md_path = TEMP_DIR / f"postman_doc_{unique_id}.md"
-            output_pdf_filename = f"postman_collection_{unique_id}.pdf"
-
-            try:
-                json_content = await postman_json_file.read()
-                postman_data = json.loads(json_content)
-                
-                parser = PostmanJsonToMarkdown(postman_data)
-                markdown_content = parser.convert_to_markdown()
-                
-                with open(input_md_path, "w", encoding="utf-8") as f:
-                    f.write(markdown_content)
-                
-            except json.JSONDecodeError:
-                raise HTTPException(status_code=400, detail="Arquivo JSON do Postman inválido. Verifique a formatação.")
-            except ValueError as e:
-                raise HTTPException(status_code=400, detail=str(e)) # Erros de validação da classe PostmanJsonToMarkdown
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Erro ao processar arquivo JSON do Postman: {e}")
-
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail="Por favor, envie um arquivo Markdown ou um arquivo JSON de coleção Postman."
+        if profile:
+            pdf_bytes, profile_id = await _profile_conversion(upload, input_kind, header_text, asset_manifest)
+            return Response(
+                content=pdf_bytes,
+                media_type="application/pdf",
+                headers={
+                    "Content-Disposition": f"attachment; filename=\"{output_pdf_filename}\"",
+                    "X-Profile-Id": profile_id,
+                    "X-Profile-Url": f"/admin/profiles/{profile_id}",
+                }
             )
 
-        output_pdf_path = TEMP_DIR / output_pdf_filename
+        # Entradas idênticas (mesmo conteúdo, cabeçalho, CSS e anexos) são servidas direto do cache.
+        if incremental:
+            variant = "incremental"
+        else:
+            variant = f"assets:{manifest_digest(asset_manifest)}" if asset_manifest else ""
+        cache_key = await _compute_cache_key(upload.file, input_kind, header_text, variant=variant)
+        if _etag_matches(request, cache_key):
+            return Response(status_code=304, headers={"ETag": f"\"{cache_key}\""})
+        # Cópia própria da resposta: uma remoção LRU do cache durante o envio não a interrompe.
+        cached_pdf_path = await run_in_threadpool(
+            _pin_cached_pdf, cache_key, TEMP_DIR / f"response_{secrets.token_hex(8)}.pdf"
+        )
+        if cached_pdf_path:
+            return _pdf_response(cached_pdf_path, output_pdf_filename, cache_key)
 
-        dynamic_css = generate_pdf_css(header_text)
+        if incremental:
+            pdf_bytes = await _render_postman_incremental(upload.file, header_text)
+        else:
+            document = await _read_document(upload.file, input_kind)
+            pdf_bytes = await _render_pdf(document, header_text, asset_manifest)
 
-        try:
-            converter = MarkdownToPDFConverter(
-                md_path=str(input_md_path),
-                pdf_path=str(output_pdf_path),
-                custom_css_string=dynamic_css
-            )
-            converter.convert()
-        except FileNotFoundError as e:
-            raise HTTPException(status_code=404, detail=str(e))
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Erro durante a conversão para PDF: {e}")
-        
-        return FileResponse(
-            path=str(output_pdf_path),
-            filename=output_pdf_filename,
+        # O PDF é enviado direto da memória; a gravação no cache acontece depois da resposta.
+        return Response(
+            content=pdf_bytes,
             media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename=\"{output_pdf_filename}\""}
+            headers=_pdf_headers(output_pdf_filename, cache_key),
+            background=BackgroundTask(result_cache.put, cache_key, pdf_bytes)
         )
 
     except HTTPException as http_e:
         raise http_e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro inesperado no servidor: {e}")
+
+@app.get("/admin/profiles/{profile_id}", summary="Baixa o perfil de uma conversão")
+async def get_profile(profile_id: str, request: Request):
+    """
+    Transmite o ZIP do perfil gerado por `/convert/` com `profile=true`: `profile.pstats`
+    (cProfile), `profile.collapsed` (pilhas para gráfico de chamas) e `stats.json`
+    (estatísticas da entrada, páginas e tempos por etapa). Exige o cabeçalho X-Admin-Token.
+    """
+    _require_admin(request)
+    profile_path = PROFILES_DIR / f"{profile_id}.zip"
+    if not profile_id.isalnum() or not profile_path.exists():
+        raise HTTPException(status_code=404, detail="Perfil não encontrado.")
+    return FileResponse(path=str(profile_path), filename=f"profile_{profile_id}.zip", media_type="application/zip")
+
+async def _stream_preview(sections, header_text: str, title: str, input_kind: str):
+    """
+    Envia o HTML da pré-visualização seção por seção: o cabeçalho com o CSS sai de
+    imediato e cada seção é gerada no threadpool assim que a anterior é enviada.
+    """
+    timings = {}
+    yield preview_head(header_text, title)
+    try:
+        with timed_stage(timings, "preview"):
+            while True:
+                section = await run_in_threadpool(next, sections, None)
+                if section is None:
+                    break
+                yield section
+    except ValueError as e:
+        # JSON inválido ou limites da coleção detectados depois do início da resposta.
+        observe_error(e)
+        yield preview_error(str(e))
+    except Exception as e:
+        observe_error(e)
+        logger.exception("Falha na pré-visualização.")
+        yield preview_error(f"Erro ao gerar a pré-visualização: {e}")
+    yield preview_tail()
+    observe_timings(timings, kind=input_kind)
+
+@app.post("/preview", response_class=HTMLResponse, summary="Pré-visualiza em HTML um arquivo Markdown ou JSON de coleção Postman")
+async def preview(
+    markdown_file: UploadFile = File(None),
+    postman_json_file: UploadFile = File(None),
+    header_text: str = Form("Documentação")
+):
+    """
+    Recebe os mesmos campos de `/convert/` e retorna o documento em HTML, com o CSS do PDF,
+    sem passar pelo layout do WeasyPrint nem ocupar os workers de renderização.
+
+    O HTML é transmitido à medida que as seções (títulos H1/H2 ou pastas de primeiro
+    nível da coleção) ficam prontas. A paginação e o cabeçalho de página só existem no PDF.
+
+    Returns:
+        StreamingResponse: A página HTML da pré-visualização.
+    """
+    upload, input_kind, _ = _select_upload(markdown_file, postman_json_file)
+    _check_input_size(input_kind, upload.size)
+    # O upload é fechado quando o endpoint retorna, antes do fim da resposta em streaming.
+    data = await upload.read()
+
+    if input_kind == "markdown":
+        try:
+            md_content = data.decode("utf-8-sig")
+        except UnicodeDecodeError as e:
+            observe_error(e)
+            raise HTTPException(status_code=400, detail="O arquivo Markdown precisa estar codificado em UTF-8.")
+        sections = iter_markdown_preview(md_content)
+        title = Path(upload.filename).stem
+    else:
+        # O início da coleção é lido aqui para que JSON inválido ainda resulte em um erro HTTP.
+        parser = await _parse_postman("postman_html", _postman_parser, io.BytesIO(data))
+        sections = PostmanHtmlRenderer(parser).iter_sections()
+        title = parser.collection_data["info"].get("name", "Documentação da API")
+
+    return StreamingResponse(
+        _stream_preview(sections, header_text, title, input_kind),
+        media_type="text/html; charset=utf-8",
+        headers={"Content-Security-Policy": PREVIEW_CSP, "X-Content-Type-Options": "nosniff"}
+    )
+
+async def _prepare_batch_entry(upload: UploadFile, index: int, work_dir: Path) -> dict:
+    """
+    Valida um arquivo do lote e copia o upload para o diretório do lote (os uploads são
+    fechados quando o endpoint retorna, antes de a resposta em streaming terminar).
+    A leitura do documento fica para `_render_batch_entry`.
+    """
+    entry = {
+        "filename": upload.filename,
+        "title": Path(upload.filename).stem,
+        "pdf_filename": f"{Path(upload.filename).stem}.pdf",
+        "input_kind": _detect_input_kind(upload.filename),
+        "input_path": None,
+        "pdf_path": None,
+        "error": None,
+    }
+    if entry["input_kind"] is None:
+        entry["error"] = "Extensão não suportada (use .md, .markdown ou .json)."
+        return entry
+
+    try:
+        if upload.size is not None:
+            _check_input_size(entry["input_kind"], upload.size)
+        entry["input_path"] = work_dir / f"{index}.upload"
+        await run_in_threadpool(_copy_upload, upload.file, entry["input_path"])
+    except HTTPException as e:
+        entry["error"] = e.detail
+    except Exception as e:
+        entry["error"] = f"Erro inesperado: {e}"
+    return entry
+
+async def _render_batch_entry(entry: dict, header_text: str, semaphore: asyncio.Semaphore, work_dir: Path) -> dict:
+    """
+    Converte um arquivo do lote: resolve o cache ou lê e renderiza o documento, registrando
+    a falha na própria entrada em vez de abortar o lote. A leitura acontece dentro do
+    semáforo, para que só os documentos em renderização fiquem na memória.
+    """
+    if entry["error"]:
+        return entry
+    try:
+        async with semaphore:
+            with open(entry["input_path"], "rb") as input_file:
+                cache_key = await _compute_cache_key(input_file, entry["input_kind"], header_text)
+                entry["pdf_path"] = await run_in_threadpool(
+                    _pin_cached_pdf, cache_key, work_dir / f"{cache_key}.pdf"
+                )
+                if entry["pdf_path"] is None:
+                    document = await _read_document(input_file, entry["input_kind"])
+            if entry["pdf_path"] is None:
+                pdf_bytes = await _render_pdf(document, header_text)
+                entry["pdf_path"] = await run_in_threadpool(_store_work_pdf, work_dir, cache_key, pdf_bytes)
+    except HTTPException as e:
+        entry["error"] = e.detail
+    except Exception as e:
+        entry["error"] = f"Erro inesperado: {e}"
+    finally:
+        await run_in_threadpool(_remove_files, entry["input_path"])
+    return entry
+
+def _batch_report(entries: list) -> dict:
+    return {
+        "total": len(entries),
+        "converted": sum(1 for entry in entries if not entry["error"]),
+        "failed": sum(1 for entry in entries if entry["error"]),
+        "files": [
+            {
+                "filename": entry["filename"],
+                "status": "error" if entry["error"] else "ok",
+                "error": entry["error"],
+            }
+            for entry in entries
+        ],
+    }
+
+async def _stream_batch_zip(entries: list, header_text: str, work_dir: Path):
+    """
+    Gera o ZIP do lote em streaming: cada PDF é enviado assim que fica pronto
+    e um `relatorio.json` com o status de cada arquivo fecha o pacote.
+    """
+    try:
+        # Limita o lote ao número de workers para não esgotar a fila de admissão compartilhada.
+        semaphore = asyncio.Semaphore(render_executor.max_workers)
+        zip_stream = ZipStream()
+        tasks = [_render_batch_entry(entry, header_text, semaphore, work_dir) for entry in entries]
+        for finished in asyncio.as_completed(tasks):
+            entry = await finished
+            if not entry["error"]:
+                yield await run_in_threadpool(zip_stream.add_file, entry["pdf_path"], entry["pdf_filename"])
+        report = json.dumps(_batch_report(entries), ensure_ascii=False, indent=2)
+        yield zip_stream.add_bytes("relatorio.json", report.encode("utf-8"))
+        yield zip_stream.close()
+    finally:
+        await run_in_threadpool(shutil.rmtree, work_dir, True)
+
+@app.post("/convert/batch", summary="Converte vários arquivos Markdown/Postman em um ZIP ou em um PDF único")
+async def convert_batch(
+    files: List[UploadFile] = File(...),
+    header_text: str = Form("Documentação"),
+    output_format: str = Form("zip")
+):
+    """
+    Converte vários arquivos Markdown e/ou coleções Postman em paralelo.
+
+    Args:
+        files (List[UploadFile]): Arquivos .md/.markdown e/ou coleções Postman .json.
+        header_text (str): O texto a ser exibido no cabeçalho superior central dos PDFs.
+        output_format (str): "zip" para um ZIP em streaming com um PDF por arquivo, ou
+                             "merged" para um único PDF com sumário.
+
+    Returns:
+        StreamingResponse | Response: O ZIP (com `relatorio.json`) ou o PDF combinado.
+                                          Arquivos com erro são relatados sem interromper o lote.
+    """
+    if output_format not in ("zip", "merged"):
+        raise HTTPException(status_code=400, detail="Formato de saída inválido. Use \"zip\" ou \"merged\".")
+    if len(files) > BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"O lote excede o limite de {BATCH_MAX_FILES} arquivos."
+        )
+
+    # Entradas e PDFs do lote (do cache ou recém-renderizados) ficam em um diretório próprio até
+    # o fim da resposta: remoções LRU do cache durante o lote não os afetam.
+    work_dir = _make_work_dir("batch")
+    try:
+        entries = [await _prepare_batch_entry(upload, index, work_dir) for index, upload in enumerate(files)]
+    except BaseException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+
+    if output_format == "zip":
+        return StreamingResponse(
+            _stream_batch_zip(entries, header_text, work_dir),
+            media_type="application/zip",
+            headers={"Content-Disposition": "attachment; filename=\"documentacao.zip\""}
+        )
+
+    try:
+        semaphore = asyncio.Semaphore(render_executor.max_workers)
+        await asyncio.gather(*(_render_batch_entry(entry, header_text, semaphore, work_dir) for entry in entries))
+
+        documents = [(entry["title"], str(entry["pdf_path"])) for entry in entries if not entry["error"]]
+        failures = [(entry["filename"], entry["error"]) for entry in entries if entry["error"]]
+        if not documents:
+            raise HTTPException(status_code=422, detail=_batch_report(entries))
+
+        merged_pdf = await _run_render_job(merge_pdfs_with_toc, documents, failures, header_text)
     finally:
-        if input_md_path and os.path.exists(input_md_path):
-            os.remove(input_md_path)
-        if output_pdf_path and os.path.exists(output_pdf_path):
-            pass
\ No newline at end of file
+        await run_in_threadpool(shutil.rmtree, work_dir, True)
+    return Response(
+        content=merged_pdf,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": "attachment; filename=\"documentacao.pdf\"",
+            "X-Batch-Failed": str(len(failures))
+        }
+    )
+
+def _remove_files(*paths):
+    for path in paths:
+        if path:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass # Já removido (ex.: pela limpeza de outro processo do servidor)
+
+def _recover_unfinished_jobs():
+    """
+    Jobs que estavam na fila ou em execução quando o serviço parou não serão retomados.
+    """
+    for job in job_store.fail_unfinished("Job interrompido pela reinicialização do serviço."):
+        _remove_files(job["input_path"])
+
+async def _sweep_expired_jobs():
+    """
+    Remove periodicamente os jobs finalizados há mais de JOBS_TTL segundos e seus PDFs.
+    """
+    while True:
+        await asyncio.sleep(JOBS_SWEEP_INTERVAL)
+        for job in await run_in_threadpool(job_store.pop_expired, JOBS_TTL):
+            await run_in_threadpool(_remove_files, job["input_path"], job["result_path"])
+
+async def _sweep_scratch_space():
+    """
+    Aplica periodicamente as cotas de idade e de tamanho ao diretório temporário,
+    reconcilia o índice do cache de resultados com o disco (compartilhado entre os processos)
+    e aplica a cota do cache de recursos.
+    """
+    while True:
+        try:
+            await run_in_threadpool(scratch_space.sweep)
+            update_scratch_usage(await run_in_threadpool(scratch_space.usage))
+            await run_in_threadpool(result_cache.refresh)
+            update_cache_stats(result_cache.stats())
+            await run_in_threadpool(asset_store.sweep)
+        except Exception:
+            logger.exception("Falha na limpeza do diretório temporário.")
+        await asyncio.sleep(TEMP_SWEEP_INTERVAL)
+
+async def _render_job_with_retry(document: tuple, header_text: str) -> bytes:
+    """
+    Renderiza o PDF de um job; jobs não falham com a fila cheia, apenas aguardam a vez.
+    """
+    while True:
+        try:
+            return await _render_pdf(document, header_text)
+        except HTTPException as e:
+            if e.status_code != 503:
+                raise
+            await asyncio.sleep(render_executor.retry_after)
+
+async def _run_job(job_id: str):
+    """
+    Executa um job: calcula a chave de cache, lê o documento, renderiza e guarda o
+    PDF em JOBS_DIR, registrando o estado e os tempos no JobStore.
+    """
+    job = await run_in_threadpool(job_store.get, job_id)
+    input_path = job["input_path"]
+    result_path = JOBS_DIR / f"{job_id}.pdf"
+    try:
+        async with job_semaphore:
+            await run_in_threadpool(job_store.mark_rendering, job_id)
+            with open(input_path, "rb") as input_file:
+                cache_key = await _compute_cache_key(input_file, job["input_kind"], job["header_text"])
+                # Cópia própria do job: o resultado precisa sobreviver a remoções LRU do cache até o TTL.
+                pdf_path = await run_in_threadpool(_pin_cached_pdf, cache_key, result_path)
+                if pdf_path is None:
+                    document = await _read_document(input_file, job["input_kind"])
+            if pdf_path is None:
+                pdf_bytes = await _render_job_with_retry(document, job["header_text"])
+                await run_in_threadpool(_write_file, result_path, pdf_bytes)
+                await run_in_threadpool(result_cache.put, cache_key, pdf_bytes)
+        await run_in_threadpool(job_store.mark_done, job_id, str(result_path))
+    except HTTPException as e:
+        await run_in_threadpool(job_store.mark_failed, job_id, str(e.detail))
+    except Exception as e:
+        await run_in_threadpool(job_store.mark_failed, job_id, f"Erro inesperado: {e}")
+    finally:
+        await run_in_threadpool(_remove_files, input_path)
+
+@app.post("/jobs", status_code=202, summary="Cria um job assíncrono de conversão para PDF")
+async def create_job(
+    markdown_file: UploadFile = File(None),
+    postman_json_file: UploadFile = File(None),
+    header_text: str = Form("Documentação")
+):
+    """
+    Recebe os mesmos campos de `/convert/`, enfileira a conversão e retorna imediatamente.
+
+    Returns:
+        dict: O estado inicial do job e as URLs de acompanhamento e de download.
+    """
+    upload, input_kind, output_pdf_filename = _select_upload(markdown_file, postman_json_file)
+    _check_input_size(input_kind, upload.size)
+
+    job_id = secrets.token_hex(16)
+    input_path = JOBS_DIR / f"{job_id}.input"
+    await run_in_threadpool(_copy_upload, upload.file, input_path)
+
+    job = await run_in_threadpool(
+        job_store.create,
+        job_id,
+        input_kind=input_kind,
+        filename=upload.filename,
+        pdf_filename=output_pdf_filename,
+        header_text=header_text,
+        input_path=str(input_path)
+    )
+    task = asyncio.create_task(_run_job(job_id))
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+
+    return {
+        **describe_job(job),
+        "status_url": f"/jobs/{job_id}",
+        "result_url": f"/jobs/{job_id}/result",
+    }
+
+@app.get("/jobs/{job_id}", summary="Consulta o estado de um job de conversão")
+async def get_job(job_id: str):
+    """
+    Retorna o estado (queued, rendering, done ou failed) e os tempos do job.
+    """
+    job = await run_in_threadpool(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado.")
+    return describe_job(job)
+
+@app.get("/jobs/{job_id}/result", summary="Baixa o PDF gerado por um job")
+async def get_job_result(job_id: str):
+    """
+    Transmite o PDF de um job concluído.
+    """
+    job = await run_in_threadpool(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado.")
+    if job["status"] == JOB_FAILED:
+        raise HTTPException(status_code=409, detail=f"O job falhou: {job['error']}")
+    if job["status"] != JOB_DONE:
+        raise HTTPException(status_code=409, detail="O job ainda não foi concluído.")
+    if not os.path.exists(job["result_path"]):
+        raise HTTPException(status_code=410, detail="O PDF do job foi removido pela limpeza do diretório temporário.")
+
+    return FileResponse(
+        path=job["result_path"],
+        filename=job["pdf_filename"],
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename=\"{job['pdf_filename']}\""}
+    )
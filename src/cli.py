@@ -0,0 +1,346 @@
+"""
+Conversão em lote pela linha de comando, sem subir o serviço HTTP.
+
+Uso:
+    python -m src.cli docs/ "api/**/*.json" [-o build/pdf] [-j 4] [--header "Documentação"]
+                      [--force] [--no-cache] [--all-examples]
+
+Aceita diretórios (percorridos recursivamente), globs e arquivos Markdown (.md,
+.markdown) ou coleções Postman (.json). Cada arquivo é convertido em um processo do
+pool (`-j`), com o mesmo conversor e as mesmas folhas de estilo do serviço, e os PDFs
+ficam no mesmo diretório de cache de resultados (TEMP_DIR/cache, CACHE_MAX_BYTES).
+
+O CLI renderiza cada arquivo de uma vez, sem dividir em trechos, e resolve as imagens
+do Markdown no disco, relativas ao arquivo; o serviço divide documentos grandes e só
+resolve imagens enviadas junto. Por isso as chaves de cache do CLI levam a variante
+`CLI_VARIANT` e nunca coincidem com as de `/convert/`.
+
+Cada PDF gerado é registrado em `.pdf-cli-manifest.json`, no diretório de saída, com a
+chave de cache e a chave das opções (cabeçalho, CSS, exemplos). Um arquivo é pulado
+quando o PDF foi gerado com as mesmas opções e é mais recente que a entrada, ou foi
+gerado a partir do mesmo conteúdo. Arquivos .json que não são coleções Postman (ex.:
+package.json) são ignorados com um aviso. Ao final, imprime um resumo com a vazão da
+execução.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+
+from src.core.body_format import BodyFormatter
+from src.core.postman_json_to_markdown import PostmanJsonToMarkdown
+from src.core.postman_stream import PostmanCollectionTooLargeError, StreamingPostmanJsonToMarkdown
+from src.core.render_executor import _warm_worker, available_cpus
+from src.core.result_cache import PDFResultCache, iter_file_chunks
+from src.core.styles import generate_pdf_css
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+MANIFEST_NAME = ".pdf-cli-manifest.json"
+# Variante das chaves de cache: imagens resolvidas no disco, documento renderizado inteiro.
+CLI_VARIANT = "cli:local-files;whole"
+STATUS_LABELS = {"converted": "convertido", "cached": "cache", "skipped": "pulado", "failed": "erro"}
+
+# Mesmas variáveis de ambiente (e padrões) do serviço, para que os limites e a
+# formatação das coleções sejam os de `/convert/`.
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+POSTMAN_MAX_BYTES = int(os.getenv("POSTMAN_MAX_BYTES", str(200 * 1024 * 1024)))
+POSTMAN_MAX_ITEMS = int(os.getenv("POSTMAN_MAX_ITEMS", "50000"))
+POSTMAN_MAX_DEPTH = int(os.getenv("POSTMAN_MAX_DEPTH", "32"))
+POSTMAN_BODY_MAX_CHARS = int(os.getenv("POSTMAN_BODY_MAX_CHARS", "20000"))
+POSTMAN_BODY_OVERFLOW = os.getenv("POSTMAN_BODY_OVERFLOW", "truncate")
+
+
+def _input_kind(path: Path):
+    """Identifica o tipo de entrada pela extensão: "markdown", "postman" ou None."""
+    if path.suffix in (".md", ".markdown"):
+        return "markdown"
+    if path.suffix == ".json":
+        return "postman"
+    return None
+
+
+def _is_postman_collection(path: Path) -> bool:
+    """
+    Lê o início do JSON até a lista `item` para distinguir coleções Postman de outros
+    arquivos .json. Coleções acima de POSTMAN_MAX_BYTES contam como coleções: o erro
+    aparece na conversão.
+    """
+    try:
+        with open(path, "rb") as f:
+            StreamingPostmanJsonToMarkdown(f, max_bytes=POSTMAN_MAX_BYTES)
+    except PostmanCollectionTooLargeError:
+        return True
+    except ValueError:
+        return False
+    return True
+
+
+def discover(inputs: list, output_dir: Path = None) -> list:
+    """
+    Expande diretórios e globs nos arquivos a converter. Arquivos .json que não são
+    coleções Postman são ignorados com um aviso.
+
+    Args:
+        inputs (list): Diretórios, globs ou arquivos.
+        output_dir (Path, optional): Diretório de saída; os PDFs repetem o caminho relativo
+                                     de cada arquivo ao diretório informado. Padrão: ao lado da entrada.
+
+    Returns:
+        list: (entrada, tipo de entrada, PDF de saída), sem repetições.
+    """
+    found = {}
+    for pattern in inputs:
+        path = Path(pattern)
+        if path.is_dir():
+            root = path
+            candidates = sorted(p for p in path.rglob("*") if p.is_file())
+        else:
+            matches = sorted(Path(p) for p in glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [path]
+            root = None
+            candidates = [p for p in matches if p.is_file()]
+            if not candidates:
+                print(f"Aviso: nenhum arquivo encontrado em {pattern!r}.", file=sys.stderr)
+        for candidate in candidates:
+            input_kind = _input_kind(candidate)
+            if input_kind is None or candidate.resolve() in found:
+                continue
+            if input_kind == "postman" and not _is_postman_collection(candidate):
+                print(f"Aviso: {candidate} não é uma coleção Postman; ignorado.", file=sys.stderr)
+                continue
+            relative = candidate.relative_to(root) if root is not None else Path(candidate.name)
+            target_dir = output_dir / relative.parent if output_dir else candidate.parent
+            found[candidate.resolve()] = (candidate, input_kind, target_dir / f"{candidate.stem}.pdf")
+    return list(found.values())
+
+
+def _postman_options(all_examples: bool) -> dict:
+    return {
+        "max_bytes": POSTMAN_MAX_BYTES,
+        "max_items": POSTMAN_MAX_ITEMS,
+        "max_depth": POSTMAN_MAX_DEPTH,
+        "all_examples": all_examples,
+    }
+
+
+def _body_options() -> dict:
+    return {"max_chars": POSTMAN_BODY_MAX_CHARS, "overflow": POSTMAN_BODY_OVERFLOW}
+
+
+def _key_kind(input_kind: str, all_examples: bool) -> str:
+    if input_kind == "postman":
+        options = PostmanJsonToMarkdown.options_signature(BodyFormatter(**_body_options()), all_examples)
+        return f"postman:html;{options}+{CLI_VARIANT}"
+    return f"{input_kind}:{CLI_VARIANT}"
+
+
+def cache_key(input_path: Path, input_kind: str, header_text: str, all_examples: bool) -> str:
+    """
+    Calcula a chave de cache do arquivo, no formato de `/convert/` mas com a variante
+    `CLI_VARIANT`, já que o CLI não renderiza do mesmo modo que o serviço.
+    """
+    with open(input_path, "rb") as f:
+        return PDFResultCache.make_key(
+            _key_kind(input_kind, all_examples), iter_file_chunks(f), header_text, generate_pdf_css(header_text)
+        )
+
+
+def options_key(input_kind: str, header_text: str, all_examples: bool) -> str:
+    """
+    Calcula a parte de `cache_key` que não depende do conteúdo (tipo, opções, cabeçalho,
+    CSS e versões das bibliotecas), sem ler o arquivo.
+    """
+    return PDFResultCache.make_key(_key_kind(input_kind, all_examples), [], header_text, generate_pdf_css(header_text))
+
+
+@lru_cache(maxsize=4)
+def _worker_body_formatter(max_chars: int, overflow: str) -> BodyFormatter:
+    """Formatador de corpos de cada worker, reaproveitado entre as coleções convertidas."""
+    return BodyFormatter(max_chars=max_chars, overflow=overflow)
+
+
+def convert_file(input_path: str, input_kind: str, header_text: str, postman_options: dict, body_options: dict) -> dict:
+    """
+    Job executado nos workers: converte um arquivo em PDF, em memória.
+
+    Markdown é lido do disco pelo `MarkdownToPDFConverter` (imagens relativas ao arquivo);
+    coleções Postman passam pelo `PostmanHtmlRenderer`, como no serviço.
+
+    Returns:
+        dict: `pdf_bytes`, `page_count` e `timings`, como em `render_markdown`.
+    """
+    from src.core.converter import MarkdownToPDFConverter
+
+    if input_kind == "markdown":
+        converter = MarkdownToPDFConverter(md_path=input_path, header_text=header_text)
+    else:
+        from src.core.postman_html import PostmanHtmlRenderer
+        from src.core.postman_stream import StreamingPostmanJsonToMarkdown
+
+        with open(input_path, "rb") as f:
+            parser = StreamingPostmanJsonToMarkdown(
+                f, body_formatter=_worker_body_formatter(**body_options), **postman_options
+            )
+            html_content = PostmanHtmlRenderer(parser).convert_to_html()
+        converter = MarkdownToPDFConverter(html_content=html_content, header_text=header_text)
+    pdf_bytes = converter.convert()
+    return {
+        "pdf_bytes": pdf_bytes,
+        "page_count": converter.page_count,
+        "timings": converter.timings,
+    }
+
+
+def _load_manifest(directory: Path) -> dict:
+    try:
+        return json.loads((directory / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _manifest_entry(manifest: dict, name: str) -> dict:
+    """Retorna o registro de um PDF no manifesto: `key` e `options` (ausentes se desconhecidos)."""
+    entry = manifest.get(name)
+    if isinstance(entry, str):
+        return {"key": entry} # Manifestos antigos guardavam só a chave de cache
+    return entry if isinstance(entry, dict) else {}
+
+
+def _save_manifests(manifests: dict):
+    for directory, entries in manifests.items():
+        directory.mkdir(parents=True, exist_ok=True)
+        temp_path = directory / f".{MANIFEST_NAME}.{os.getpid()}.tmp"
+        temp_path.write_text(json.dumps(entries, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(temp_path, directory / MANIFEST_NAME)
+
+
+def _write_output(target: Path, pdf_bytes: bytes):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    temp_path.write_bytes(pdf_bytes)
+    os.replace(temp_path, target)
+
+
+def run(args) -> int:
+    """
+    Executa a conversão em lote descrita pelos argumentos da linha de comando.
+
+    Returns:
+        int: Código de saída (1 se alguma conversão falhar).
+    """
+    output_dir = Path(args.output_dir) if args.output_dir else None
+    files = discover(args.inputs, output_dir)
+    if not files:
+        print("Nenhum arquivo Markdown ou coleção Postman encontrado.", file=sys.stderr)
+        return 1
+
+    result_cache = None if args.no_cache else PDFResultCache(Path(args.cache_dir), max_bytes=CACHE_MAX_BYTES)
+    manifests = {}
+    counts = {"converted": 0, "cached": 0, "skipped": 0, "failed": 0}
+    pages = 0
+    input_bytes = 0
+    start = time.perf_counter()
+
+    def finish(input_path: Path, output_path: Path, keys: dict, status: str, detail: str):
+        counts[status] += 1
+        manifests.setdefault(output_path.parent, _load_manifest(output_path.parent))[output_path.name] = keys
+        print(f"[{STATUS_LABELS[status]}] {input_path} -> {output_path} {detail}".rstrip())
+
+    pending = []
+    for input_path, input_kind, output_path in files:
+        manifest = manifests.setdefault(output_path.parent, _load_manifest(output_path.parent))
+        entry = _manifest_entry(manifest, output_path.name)
+        options = options_key(input_kind, args.header, args.all_examples)
+        up_to_date = not args.force and output_path.exists()
+        # A data de modificação só vale se o PDF foi gerado com as mesmas opções.
+        if (up_to_date and entry.get("options") == options
+                and output_path.stat().st_mtime >= input_path.stat().st_mtime):
+            counts["skipped"] += 1
+            print(f"[{STATUS_LABELS['skipped']}] {input_path} (saída mais recente que a entrada)")
+            continue
+        key = cache_key(input_path, input_kind, args.header, args.all_examples)
+        keys = {"key": key, "options": options}
+        if up_to_date and entry.get("key") == key:
+            counts["skipped"] += 1
+            manifest[output_path.name] = keys
+            print(f"[{STATUS_LABELS['skipped']}] {input_path} (conteúdo inalterado)")
+            continue
+        cached_path = result_cache.get(key) if result_cache else None
+        if cached_path is not None:
+            _write_output(output_path, cached_path.read_bytes())
+            input_bytes += input_path.stat().st_size
+            finish(input_path, output_path, keys, "cached", "")
+            continue
+        pending.append((input_path, input_kind, output_path, keys))
+
+    if pending:
+        workers = max(1, min(args.jobs, len(pending)))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker
+        ) as pool:
+            futures = {
+                pool.submit(
+                    convert_file, str(input_path), input_kind, args.header,
+                    _postman_options(args.all_examples), _body_options()
+                ): (input_path, output_path, keys)
+                for input_path, input_kind, output_path, keys in pending
+            }
+            for future in as_completed(futures):
+                input_path, output_path, keys = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    counts["failed"] += 1
+                    print(f"[{STATUS_LABELS['failed']}] {input_path}: {e}", file=sys.stderr)
+                    continue
+                _write_output(output_path, result["pdf_bytes"])
+                if result_cache:
+                    result_cache.put(keys["key"], result["pdf_bytes"])
+                pages += result["page_count"]
+                input_bytes += input_path.stat().st_size
+                seconds = sum(result["timings"].values())
+                finish(input_path, output_path, keys, "converted", f"({result['page_count']} páginas, {seconds:.2f}s)")
+    _save_manifests(manifests)
+
+    elapsed = time.perf_counter() - start
+    processed = counts["converted"] + counts["cached"]
+    print(
+        f"\n{len(files)} arquivos em {elapsed:.2f}s: {counts['converted']} convertidos, "
+        f"{counts['cached']} do cache, {counts['skipped']} pulados, {counts['failed']} com erro."
+    )
+    if elapsed > 0 and processed:
+        # Páginas só são conhecidas para os arquivos convertidos nesta execução.
+        page_rate = f", {pages / elapsed:.1f} páginas/s" if pages else ""
+        print(
+            f"Vazão: {processed / elapsed:.2f} arquivos/s{page_rate}, "
+            f"{input_bytes / elapsed / 1024 / 1024:.2f} MB/s de entrada."
+        )
+    return 1 if counts["failed"] else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Converte em lote arquivos Markdown e coleções Postman em PDF."
+    )
+    parser.add_argument("inputs", nargs="+", help="Diretórios, globs ou arquivos (.md, .markdown, .json).")
+    parser.add_argument("-o", "--output-dir", help="Diretório de saída. Padrão: ao lado de cada entrada.")
+    parser.add_argument("-j", "--jobs", type=int, default=available_cpus(), help="Processos de conversão. Padrão: CPUs disponíveis.")
+    parser.add_argument("--header", default="Documentação", help="Texto do cabeçalho dos PDFs.")
+    parser.add_argument("--force", action="store_true", help="Converte mesmo os arquivos cuja saída está atualizada.")
+    parser.add_argument("--cache-dir", default=str(BASE_DIR / "temp" / "cache"), help="Diretório do cache de resultados (o mesmo do serviço).")
+    parser.add_argument("--no-cache", action="store_true", help="Não consulta nem grava o cache de resultados.")
+    parser.add_argument("--all-examples", action="store_true", help="Inclui todos os exemplos de resposta (Postman).")
+    args = parser.parse_args(argv)
+    sys.exit(run(args))
+
+
+if __name__ == "__main__":
+    main()
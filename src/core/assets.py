@@ -0,0 +1,366 @@
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from urllib.parse import unquote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Raiz virtual dos arquivos enviados junto com o documento: `base_url` do HTML é
+# `ASSET_BASE_URL + <manifesto>/`, então `![](img/logo.png)` vira uma URL desta raiz.
+ASSET_BASE_URL = "file:///__assets__/"
+
+_READ_BLOCK = 64 * 1024
+
+
+class AssetFetchError(ValueError):
+    """
+    Recurso externo recusado ou indisponível (arquivo não enviado, modo offline,
+    tempo limite ou tamanho máximo). O WeasyPrint registra o erro e omite o recurso.
+    """
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_asset_path(name: str) -> str:
+    """
+    Normaliza o caminho relativo de um arquivo enviado (ex.: "./img/logo.png" -> "img/logo.png").
+
+    Raises:
+        ValueError: Para caminhos absolutos, vazios ou que saem do diretório do documento.
+    """
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or name.startswith("/") or ".." in parts:
+        raise ValueError(f"Caminho de arquivo inválido: {name!r}.")
+    return "/".join(parts)
+
+
+def manifest_digest(assets: Optional[dict]) -> str:
+    """
+    Identifica um conjunto de arquivos enviados (caminho -> SHA-256 do conteúdo).
+    Entra na chave de cache do PDF e na URL base, de modo que as URLs das imagens só
+    se repetem entre renderizações quando o conteúdo é o mesmo.
+    """
+    if not assets:
+        return "none"
+    return _sha256(json.dumps(sorted(assets.items())).encode("utf-8"))[:32]
+
+
+class AssetStore:
+    """
+    Armazena em disco, endereçados pelo SHA-256 do conteúdo, os arquivos enviados junto
+    com os documentos e as cópias dos recursos remotos (imagens), com um índice
+    URL -> conteúdo para os remotos.
+
+    O diretório é compartilhado pelos processos do servidor e pelos workers de
+    renderização (gravações atômicas); `sweep` remove os conteúdos usados há mais
+    tempo quando o total ultrapassa `max_bytes`.
+    """
+    def __init__(self, directory: Path, max_bytes: int):
+        """
+        Args:
+            directory (Path): Diretório do armazenamento (ex.: TEMP_DIR/assets).
+            max_bytes (int): Tamanho máximo total dos conteúdos, em bytes.
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._blobs = self.directory / "blobs"
+        self._urls = self.directory / "urls"
+        self._blobs.mkdir(parents=True, exist_ok=True)
+        self._urls.mkdir(parents=True, exist_ok=True)
+        self.removed_files = 0
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._blobs / digest
+
+    def _url_path(self, url: str) -> Path:
+        return self._urls / f"{_sha256(url.encode('utf-8'))}.json"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def put(self, data: bytes) -> str:
+        """
+        Grava um conteúdo (se ainda não existir) e retorna seu SHA-256.
+        """
+        digest = _sha256(data)
+        path = self._blob_path(digest)
+        if path.exists():
+            os.utime(path) # Mantém a ordem LRU
+        else:
+            self._write_atomic(path, data)
+        return digest
+
+    def read(self, digest: str) -> Optional[bytes]:
+        """Retorna o conteúdo com o SHA-256 informado, ou None se não existir (ou foi removido)."""
+        path = self._blob_path(digest)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def get_remote(self, url: str, max_age: Optional[float]) -> Optional[dict]:
+        """
+        Retorna a cópia de um recurso remoto já baixado: `data`, `mime_type` e `fetched_at`.
+
+        Args:
+            url (str): A URL do recurso.
+            max_age (float, optional): Idade máxima da cópia, em segundos; None aceita qualquer idade.
+        """
+        try:
+            entry = json.loads(self._url_path(url).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        if max_age is not None and time.time() - entry["fetched_at"] > max_age:
+            return None
+        data = self.read(entry["digest"])
+        if data is None:
+            return None
+        return {"data": data, "mime_type": entry.get("mime_type"), "fetched_at": entry["fetched_at"]}
+
+    def put_remote(self, url: str, data: bytes, mime_type: Optional[str]):
+        """Guarda a cópia de um recurso remoto e a associa à URL."""
+        entry = {"digest": self.put(data), "mime_type": mime_type, "fetched_at": time.time()}
+        self._write_atomic(self._url_path(url), json.dumps(entry).encode("utf-8"))
+
+    def _scan_blobs(self) -> list:
+        """Retorna (mtime, tamanho, caminho) de cada conteúdo armazenado."""
+        blobs = []
+        for entry in os.scandir(self._blobs):
+            try:
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    blobs.append((stat.st_mtime, stat.st_size, entry.path))
+            except FileNotFoundError:
+                continue # Removido por outro processo
+        return blobs
+
+    def usage(self) -> dict:
+        """Retorna conteúdos e bytes armazenados, a cota e o total já removido por `sweep`."""
+        blobs = self._scan_blobs()
+        return {
+            "files": len(blobs),
+            "bytes": sum(size for _, size, _ in blobs),
+            "max_bytes": self.max_bytes,
+            "removed_files": self.removed_files,
+        }
+
+    def sweep(self) -> int:
+        """
+        Remove os conteúdos usados há mais tempo até o total voltar a `max_bytes`.
+        Entradas do índice que apontam para conteúdos removidos são apenas ignoradas.
+
+        Returns:
+            int: Quantidade de conteúdos removidos.
+        """
+        blobs = self._scan_blobs()
+        total = sum(size for _, size, _ in blobs)
+        removed = 0
+        for _, size, path in sorted(blobs):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass # Removido por outro processo
+            total -= size
+            removed += 1
+        self.removed_files += removed
+        return removed
+
+
+class AssetFetcher:
+    """
+    `url_fetcher` do WeasyPrint para os documentos convertidos pelo serviço.
+
+    - URLs da raiz virtual (`ASSET_BASE_URL`) são atendidas pelos arquivos enviados
+      junto com o documento; qualquer outro `file://` é recusado.
+    - URLs `data:` são decodificadas normalmente.
+    - URLs http(s) são servidas do `AssetStore` enquanto a cópia tiver menos de
+      `remote_ttl` segundos; caso contrário, são baixadas com tempo limite e tamanho
+      máximo. No modo offline, nada é baixado: só as cópias já existentes são usadas.
+
+    Cada URL é resolvida uma única vez por renderização. `fetch_seconds` e `fetches`
+    acumulam o tempo gasto e o número de resoluções, para as métricas.
+    """
+    def __init__(self, store: AssetStore, assets: Optional[dict] = None, allow_remote: bool = True,
+                 timeout: float = 10.0, max_bytes: int = 10 * 1024 * 1024, remote_ttl: float = 86400.0):
+        """
+        Args:
+            store (AssetStore): Armazenamento dos arquivos enviados e das cópias remotas.
+            assets (dict, optional): Arquivos enviados com o documento (caminho relativo -> SHA-256).
+            allow_remote (bool): Permite baixar recursos http(s); False ativa o modo offline.
+            timeout (float): Tempo máximo de cada download, em segundos.
+            max_bytes (int): Tamanho máximo de cada recurso remoto, em bytes.
+            remote_ttl (float): Idade máxima de uma cópia remota antes de baixá-la novamente.
+        """
+        self.store = store
+        self.assets = assets or {}
+        # Navegadores enviam só o nome do arquivo, sem os diretórios: "img/logo.png" também é
+        # encontrado como "logo.png" quando nenhum outro arquivo enviado tem esse nome.
+        names = {}
+        for asset_path, digest in self.assets.items():
+            names.setdefault(asset_path.rsplit("/", 1)[-1], []).append(digest)
+        self._by_name = {name: digests[0] for name, digests in names.items() if len(digests) == 1}
+        self.base_url = f"{ASSET_BASE_URL}{manifest_digest(assets)}/"
+        self.allow_remote = allow_remote
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.remote_ttl = remote_ttl
+        self._resolved = {}
+        self.fetch_seconds = 0.0
+        self.fetches = 0
+
+    def __call__(self, url: str) -> dict:
+        result = self._resolved.get(url)
+        if result is None:
+            start = time.perf_counter()
+            try:
+                result = self._resolved[url] = self._fetch(url)
+            finally:
+                self.fetch_seconds += time.perf_counter() - start
+                self.fetches += 1
+        return dict(result)
+
+    def _fetch(self, url: str) -> dict:
+        scheme = urlsplit(url).scheme.lower()
+        if url.startswith(self.base_url):
+            return self._uploaded(unquote(url[len(self.base_url):].split("?")[0].split("#")[0]))
+        if scheme == "data":
+            from weasyprint import default_url_fetcher # Só é necessário nos workers
+
+            return default_url_fetcher(url)
+        if scheme in ("http", "https"):
+            return self._remote(url)
+        raise AssetFetchError(f"Recurso não permitido: {url}")
+
+    def _uploaded(self, path: str) -> dict:
+        digest = self.assets.get(path) or self._by_name.get(path.rsplit("/", 1)[-1])
+        data = self.store.read(digest) if digest else None
+        if data is None:
+            raise AssetFetchError(f"Arquivo não enviado junto com o documento: {path}")
+        return {"string": data, "mime_type": mimetypes.guess_type(path)[0], "filename": Path(path).name}
+
+    def _remote(self, url: str) -> dict:
+        cached = self.store.get_remote(url, self.remote_ttl if self.allow_remote else None)
+        if cached is not None:
+            return {"string": cached["data"], "mime_type": cached["mime_type"]}
+        if not self.allow_remote:
+            raise AssetFetchError(f"Modo offline: recurso remoto não disponível no cache: {url}")
+
+        data, mime_type = self._download(url)
+        self.store.put_remote(url, data, mime_type)
+        return {"string": data, "mime_type": mime_type}
+
+    def _download(self, url: str):
+        from weasyprint import default_url_fetcher # Só é necessário nos workers
+
+        deadline = time.monotonic() + self.timeout
+        result = default_url_fetcher(url, timeout=self.timeout)
+        data = result.get("string")
+        file_obj = result.get("file_obj")
+        if file_obj is not None:
+            # O tempo limite do socket vale por leitura; o prazo total é verificado a cada bloco.
+            blocks, size = [], 0
+            try:
+                while True:
+                    block = file_obj.read(_READ_BLOCK)
+                    if not block:
+                        break
+                    blocks.append(block)
+                    size += len(block)
+                    if size > self.max_bytes:
+                        raise AssetFetchError(f"Recurso remoto excede {self.max_bytes} bytes: {url}")
+                    if time.monotonic() > deadline:
+                        raise AssetFetchError(f"Tempo limite excedido ao baixar: {url}")
+            finally:
+                file_obj.close()
+            data = b"".join(blocks)
+        elif len(data) > self.max_bytes:
+            raise AssetFetchError(f"Recurso remoto excede {self.max_bytes} bytes: {url}")
+        return data, result.get("mime_type")
+
+
+# Configuração dos workers de renderização (ver `configure`), e cache de imagens já
+# decodificadas pelo WeasyPrint, reaproveitado entre as renderizações do processo.
+_settings = None
+_image_cache = {}
+_image_cache_created = 0.0
+
+
+def configure(directory: str, max_bytes: int, allow_remote: bool = True, timeout: float = 10.0,
+              max_fetch_bytes: int = 10 * 1024 * 1024, remote_ttl: float = 86400.0,
+              image_cache_entries: int = 256):
+    """
+    Ativa a resolução de recursos no processo (chamada na inicialização de cada worker).
+
+    Args:
+        directory (str): Diretório do `AssetStore` compartilhado.
+        max_bytes (int): Cota do `AssetStore`, em bytes.
+        allow_remote (bool): Permite baixar recursos http(s); False ativa o modo offline.
+        timeout (float): Tempo máximo de cada download, em segundos.
+        max_fetch_bytes (int): Tamanho máximo de cada recurso remoto, em bytes.
+        remote_ttl (float): Idade máxima de uma cópia remota, em segundos.
+        image_cache_entries (int): Entradas mantidas no cache de imagens decodificadas; 0 desativa.
+    """
+    global _settings
+    _settings = {
+        "store": AssetStore(Path(directory), max_bytes),
+        "allow_remote": allow_remote,
+        "timeout": timeout,
+        "max_bytes": max_fetch_bytes,
+        "remote_ttl": remote_ttl,
+        "image_cache_entries": image_cache_entries,
+    }
+
+
+def fetcher_for(assets: Optional[dict] = None) -> Optional[AssetFetcher]:
+    """
+    Cria o `url_fetcher` de uma renderização, ou None se `configure` não foi chamada
+    (uso fora do serviço, com o comportamento padrão do WeasyPrint).
+    """
+    if _settings is None:
+        return None
+    return AssetFetcher(
+        _settings["store"],
+        assets,
+        allow_remote=_settings["allow_remote"],
+        timeout=_settings["timeout"],
+        max_bytes=_settings["max_bytes"],
+        remote_ttl=_settings["remote_ttl"]
+    )
+
+
+def image_cache() -> Optional[dict]:
+    """
+    Retorna o cache de imagens decodificadas para a próxima renderização (opção `cache`
+    do WeasyPrint, indexado por URL). É esvaziado ao exceder o número de entradas ou
+    a idade das cópias remotas, sempre entre renderizações: o WeasyPrint lê os dados
+    das imagens do cache até o fim da escrita do PDF.
+    """
+    global _image_cache, _image_cache_created
+    if _settings is None or not _settings["image_cache_entries"]:
+        return None
+    expired = time.monotonic() - _image_cache_created > _settings["remote_ttl"]
+    if expired or len(_image_cache) > _settings["image_cache_entries"]:
+        _image_cache = {}
+        _image_cache_created = time.monotonic()
+    else:
+        # Imagens que falharam ficam no cache como None; devem ser buscadas de novo.
+        for url in [url for url, image in _image_cache.items() if image is None]:
+            del _image_cache[url]
+    return _image_cache
@@ -0,0 +1,117 @@
+import io
+import os
+import zipfile
+from pathlib import Path
+
+
+class _ChunkBuffer:
+    """
+    Destino de escrita não posicionável para o `zipfile`: acumula os bytes escritos
+    até que sejam drenados e enviados ao cliente.
+    """
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStream:
+    """
+    Monta um arquivo ZIP incrementalmente, devolvendo os bytes de cada entrada assim
+    que ela é adicionada, para que a resposta possa ser transmitida sem buffer completo.
+    """
+    def __init__(self):
+        self._buffer = _ChunkBuffer()
+        self._zip = zipfile.ZipFile(self._buffer, "w", compression=zipfile.ZIP_DEFLATED)
+        self._names = set()
+
+    def _unique_name(self, arcname: str) -> str:
+        stem, suffix = os.path.splitext(arcname)
+        candidate, counter = arcname, 1
+        while candidate in self._names:
+            counter += 1
+            candidate = f"{stem}_{counter}{suffix}"
+        self._names.add(candidate)
+        return candidate
+
+    def add_file(self, path: Path, arcname: str) -> bytes:
+        """Adiciona um arquivo do disco e retorna os bytes ZIP produzidos."""
+        self._zip.write(path, self._unique_name(arcname))
+        return self._buffer.drain()
+
+    def add_bytes(self, arcname: str, data: bytes) -> bytes:
+        """Adiciona um conteúdo em memória e retorna os bytes ZIP produzidos."""
+        self._zip.writestr(self._unique_name(arcname), data)
+        return self._buffer.drain()
+
+    def close(self) -> bytes:
+        """Finaliza o ZIP e retorna o diretório central."""
+        self._zip.close()
+        return self._buffer.drain()
+
+
+def _build_toc_markdown(documents: list, failures: list, first_page: int) -> str:
+    lines = ["# Sumário\n\n", "| Documento | Página |\n", "|---|---|\n"]
+    page = first_page
+    for title, _, page_count in documents:
+        lines.append(f"| {title} | {page} |\n")
+        page += page_count
+    if failures:
+        lines.append("\n## Arquivos não convertidos\n\n")
+        lines.append("| Arquivo | Erro |\n|---|---|\n")
+        for filename, error in failures:
+            error = str(error).replace("\n", " ").replace("|", "\\|")
+            lines.append(f"| {filename} | {error} |\n")
+    return "".join(lines)
+
+
+def merge_pdfs_with_toc(documents: list, failures: list, header_text: str) -> bytes:
+    """
+    Job executado nos workers: gera um sumário e junta os PDFs em um único documento,
+    com um marcador (outline) por arquivo.
+
+    Args:
+        documents (list): Pares (título, caminho do PDF), na ordem do documento final.
+        failures (list): Pares (nome do arquivo, mensagem de erro) a listar no sumário.
+        header_text (str): Texto do cabeçalho usado no sumário.
+
+    Returns:
+        bytes: O PDF final.
+    """
+    # Importados aqui: a junção só roda nos workers, que já carregaram o WeasyPrint.
+    from pypdf import PdfReader, PdfWriter
+
+    from src.core.converter import MarkdownToPDFConverter
+
+    documents = [(title, path, len(PdfReader(path).pages)) for title, path in documents]
+
+    # As páginas de cada documento dependem do tamanho do próprio sumário:
+    # renderiza de novo até o número de páginas do sumário se estabilizar.
+    toc_pages = 1
+    for _ in range(3):
+        toc_pdf = MarkdownToPDFConverter(
+            md_content=_build_toc_markdown(documents, failures, first_page=toc_pages + 1),
+            header_text=header_text
+        ).convert()
+        rendered_pages = len(PdfReader(io.BytesIO(toc_pdf)).pages)
+        if rendered_pages == toc_pages:
+            break
+        toc_pages = rendered_pages
+
+    writer = PdfWriter()
+    writer.append(io.BytesIO(toc_pdf), outline_item="Sumário")
+    for title, path, _ in documents:
+        writer.append(path, outline_item=title)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
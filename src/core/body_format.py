@@ -0,0 +1,155 @@
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+
+try:
+    import orjson # Opcional: serialização de JSON bem mais rápida
+except ImportError:
+    orjson = None
+
+# Modos de exibição de corpos acima de `max_chars`.
+OVERFLOW_TRUNCATE = "truncate" # Mantém o início do corpo
+OVERFLOW_FOLD = "fold" # Mantém o início e o fim, omitindo o meio
+OVERFLOW_MODES = (OVERFLOW_TRUNCATE, OVERFLOW_FOLD)
+
+
+def _pretty_json(body: str):
+    """
+    Reindenta um corpo JSON com 2 espaços, ou retorna None se não for JSON válido.
+
+    O parse fica com o módulo json (o orjson converteria inteiros acima de 64 bits em
+    float); a serialização indentada, a parte lenta do módulo json, usa o orjson quando
+    instalado. Os caracteres não ASCII são mantidos (acentos legíveis no PDF). Corpos com
+    NaN/Infinity, ou com números que estouram o float (ex.: 1e400), ficam com o módulo
+    json, que os preserva como Infinity (o orjson os grava como null).
+    """
+    non_finite = []
+
+    def _constant(name: str) -> float:
+        non_finite.append(name)
+        return float(name)
+
+    def _float(text: str) -> float:
+        value = float(text)
+        if not math.isfinite(value):
+            non_finite.append(text)
+        return value
+
+    try:
+        value = json.loads(body, parse_float=_float, parse_constant=_constant)
+    except json.JSONDecodeError:
+        return None
+    if orjson is not None and not non_finite:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode("utf-8")
+        except TypeError:
+            pass # Ex.: inteiros acima de 64 bits, que o módulo json serializa
+    return json.dumps(value, indent=2, ensure_ascii=False)
+
+
+class BodyFormatter:
+    """
+    Formata os corpos de requisição e resposta das coleções Postman, com cache.
+
+    Coleções reais repetem os mesmos exemplos em muitos endpoints; o resultado de cada
+    corpo distinto é guardado em um cache LRU indexado pelo hash do conteúdo (o texto
+    original não fica retido na memória). Corpos acima de `max_chars` são truncados
+    ou dobrados antes de entrar no documento. Seguro para uso entre threads.
+    """
+    def __init__(self, max_chars: int = 0, overflow: str = OVERFLOW_TRUNCATE, cache_chars: int = 16 * 1024 * 1024):
+        """
+        Args:
+            max_chars (int): Tamanho máximo de um corpo formatado, em caracteres; 0 desativa o limite.
+            overflow (str): "truncate" mantém o início do corpo; "fold" mantém o início e o fim.
+            cache_chars (int): Total de caracteres mantidos no cache; 0 desativa o cache.
+        """
+        if overflow not in OVERFLOW_MODES:
+            raise ValueError(f"Modo inválido para corpos grandes: {overflow!r} (use \"truncate\" ou \"fold\").")
+        self.max_chars = max_chars
+        self.overflow = overflow
+        self.cache_chars = cache_chars
+        self._cache = OrderedDict()
+        self._cached_chars = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def signature(self) -> str:
+        """Identifica as opções que alteram o texto gerado (entra nas chaves de cache dos PDFs)."""
+        return f"{self.max_chars}:{self.overflow}" if self.max_chars else "full"
+
+    def _shorten(self, text: str) -> str:
+        """Aplica `max_chars`, cortando em fins de linha e indicando o que foi omitido."""
+        if not self.max_chars or len(text) <= self.max_chars:
+            return text
+        if self.overflow == OVERFLOW_TRUNCATE:
+            head = text[:self.max_chars].rsplit("\n", 1)[0] or text[:self.max_chars]
+            omitted = len(text) - len(head)
+            return f"{head}\n… ({omitted} caracteres omitidos)"
+
+        half = self.max_chars // 2
+        head = text[:half].rsplit("\n", 1)[0] or text[:half]
+        tail = text[-half:].split("\n", 1)[-1] or text[-half:]
+        omitted = len(text) - len(head) - len(tail)
+        return f"{head}\n… ({omitted} caracteres omitidos) …\n{tail}"
+
+    def _format(self, body: str):
+        pretty = _pretty_json(body)
+        if pretty is None:
+            return "", self._shorten(body)
+        return "json", self._shorten(pretty)
+
+    def format(self, body: str):
+        """
+        Formata um corpo: JSON válido é reindentado; o resultado respeita `max_chars`.
+
+        Args:
+            body (str): O corpo como aparece na coleção.
+
+        Returns:
+            tuple: (linguagem do bloco de código, texto), com linguagem "json" ou "".
+        """
+        if not isinstance(body, str):
+            body = str(body)
+        if not self.cache_chars:
+            return self._format(body)
+
+        key = hashlib.blake2b(body.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        result = self._format(body)
+        size = len(result[1])
+        if size > self.cache_chars:
+            return result
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = result
+                self._cached_chars += size
+                while self._cached_chars > self.cache_chars:
+                    _, (_, evicted) = self._cache.popitem(last=False)
+                    self._cached_chars -= len(evicted)
+        return result
+
+    def stats(self) -> dict:
+        """Retorna o uso do cache: entradas, caracteres, acertos e falhas."""
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "chars": self._cached_chars,
+                "max_chars": self.cache_chars,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Formatador compartilhado pelos parsers criados sem um formatador próprio.
+default_body_formatter = BodyFormatter()
@@ -0,0 +1,139 @@
+import io
+import re
+
+# Prefixo dos links para âncoras de outro trecho do documento: o conversor os gera no lugar
+# dos links internos que o WeasyPrint descartaria, e `merge_pdf_chunks` os religa após a junção.
+CHUNK_LINK_PREFIX = "chunk-anchor:"
+
+# Títulos ATX de nível 1 e 2 ("# Título", "## Título"): pontos de corte do documento.
+# Nas coleções Postman, são o título da coleção e as pastas de primeiro nível.
+_SPLIT_HEADING = re.compile(r"^#{1,2}(?!#)[ \t]")
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+# Definições de links por referência ("[id]: url"), repetidas em todos os trechos.
+_LINK_DEFINITION = re.compile(r"^ {0,3}\[[^\]]+\]:[ \t]*\S")
+
+
+def split_sections(md_content: str):
+    """
+    Divide o Markdown antes de cada título H1/H2 que não esteja dentro de um bloco de código.
+
+    Returns:
+        tuple: (lista de seções, definições de links por referência encontradas).
+    """
+    sections, current, definitions = [], [], []
+    fence = None
+    for line in md_content.splitlines(keepends=True):
+        match = _FENCE.match(line)
+        if fence:
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                fence = None
+        elif match:
+            fence = match.group(1)
+        elif _SPLIT_HEADING.match(line) and current:
+            sections.append("".join(current))
+            current = []
+        elif _LINK_DEFINITION.match(line):
+            definitions.append(line if line.endswith("\n") else line + "\n")
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+    return sections, definitions
+
+
+def pack_sections(sections: list, max_chunks: int, min_chunk_chars: int) -> list:
+    """
+    Agrupa seções consecutivas em trechos que podem ser renderizados em paralelo, até que
+    cada trecho tenha ao menos `max(min_chunk_chars, tamanho / max_chunks)` caracteres.
+
+    Args:
+        sections (list): As seções do documento (strings), na ordem do documento.
+        max_chunks (int): Número máximo de trechos (normalmente, o número de workers).
+        min_chunk_chars (int): Tamanho mínimo de cada trecho; 0 desativa a divisão.
+
+    Returns:
+        list: Os trechos, na ordem do documento (um único item se não houver divisão).
+    """
+    total = sum(len(section) for section in sections)
+    if max_chunks < 2 or min_chunk_chars <= 0 or total < 2 * min_chunk_chars:
+        return ["".join(sections)]
+
+    target = max(min_chunk_chars, total // max_chunks)
+    chunks, current, size = [], [], 0
+    for section in sections:
+        current.append(section)
+        size += len(section)
+        if size >= target:
+            chunks.append("".join(current))
+            current, size = [], 0
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def split_markdown(md_content: str, max_chunks: int, min_chunk_chars: int) -> list:
+    """
+    Divide um documento grande em trechos que podem ser renderizados em paralelo.
+
+    Os cortes acontecem apenas em títulos H1/H2, e seções consecutivas são agrupadas
+    por `pack_sections`.
+
+    Args:
+        md_content (str): O documento Markdown completo.
+        max_chunks (int): Número máximo de trechos (normalmente, o número de workers).
+        min_chunk_chars (int): Tamanho mínimo de cada trecho; 0 desativa a divisão.
+
+    Returns:
+        list: Os trechos, na ordem do documento (um único item se não houver divisão).
+    """
+    if max_chunks < 2 or min_chunk_chars <= 0 or len(md_content) < 2 * min_chunk_chars:
+        return [md_content]
+
+    sections, definitions = split_sections(md_content)
+    chunks = pack_sections(sections, max_chunks, min_chunk_chars)
+
+    if len(chunks) > 1 and definitions:
+        shared = "\n" + "".join(definitions)
+        chunks = [chunk + shared for chunk in chunks]
+    return chunks
+
+
+def merge_pdf_chunks(chunks: list) -> bytes:
+    """
+    Job executado nos workers: junta os PDFs dos trechos, mantendo os marcadores de
+    cada trecho e religando os links entre trechos aos destinos internos do documento final.
+
+    Args:
+        chunks (list): Os bytes do PDF de cada trecho, na ordem do documento.
+
+    Returns:
+        bytes: O PDF final.
+    """
+    from pypdf import PdfWriter # Só é necessário nos workers
+    from pypdf.generic import ArrayObject, NameObject, TextStringObject
+
+    writer = PdfWriter()
+    for pdf_bytes in chunks:
+        writer.append(io.BytesIO(pdf_bytes))
+
+    named_destinations = writer.get_named_dest_root()
+    destinations = {str(name) for name in named_destinations[::2]}
+    for page in writer.pages:
+        if "/Annots" not in page:
+            continue
+        annotations = ArrayObject()
+        for reference in page["/Annots"]:
+            annotation = reference.get_object()
+            action = annotation.get("/A")
+            uri = str(action.get_object().get("/URI", "")) if action is not None else ""
+            if uri.startswith(CHUNK_LINK_PREFIX):
+                anchor = uri[len(CHUNK_LINK_PREFIX):]
+                if anchor not in destinations:
+                    continue # Âncora inexistente no documento inteiro: o WeasyPrint também descartaria o link
+                del annotation["/A"]
+                annotation[NameObject("/Dest")] = TextStringObject(anchor)
+            annotations.append(reference)
+        page[NameObject("/Annots")] = annotations
+
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
@@ -1,49 +1,143 @@
-from markdown2 import markdown
+import logging
 from weasyprint import HTML, CSS
 from os import path
+from typing import Optional
+
+from src.core import assets as asset_resolution
+from src.core.chunking import CHUNK_LINK_PREFIX
+from src.core.markdown_html import markdown_to_html
+from src.core.timing import timed_stage
+from src.core.stylesheets import get_stylesheets
+
+logger = logging.getLogger(__name__)
 
 class MarkdownToPDFConverter:
     """
-    Converte um arquivo Markdown para PDF usando markdown2 e WeasyPrint.
+    Converte Markdown para PDF usando markdown2 e WeasyPrint.
+
+    A entrada pode ser um arquivo (`md_path`), o próprio conteúdo (`md_content`,
+    string ou objeto com `read()`) ou HTML já gerado (`html_content`, que dispensa
+    o markdown2); a saída pode ser um arquivo (`pdf_path`) ou,
+    sem `pdf_path`, os bytes do PDF retornados por `convert`.
+
+    Imagens e demais recursos são obtidos pelo `AssetFetcher` quando o processo foi
+    configurado com `assets.configure` (workers do serviço); caso contrário, pelo
+    WeasyPrint, relativos ao diretório de `md_path`.
     """
-    def __init__(self, md_path: str, pdf_path: str, custom_css_string: str = ""):
+    def __init__(self, md_path: Optional[str] = None, pdf_path: Optional[str] = None,
+                 custom_css_string: str = "", header_text: Optional[str] = None, md_content=None,
+                 chunk_links: bool = False, html_content: Optional[str] = None, assets: Optional[dict] = None):
         """
         Inicializa o conversor.
 
         Args:
-            md_path (str): Caminho para o arquivo Markdown de entrada.
-            pdf_path (str): Caminho para o arquivo PDF de saída.
+            md_path (str, optional): Caminho para o arquivo Markdown de entrada.
+            pdf_path (str, optional): Caminho para o arquivo PDF de saída. Se omitido,
+                                      `convert` retorna o PDF em memória.
             custom_css_string (str, optional): String CSS a ser aplicada.
                                                Se não fornecida, espera-se que o CSS seja tratado externamente.
+            header_text (str, optional): Texto do cabeçalho. Quando informado, usa as folhas de
+                                         estilo de `styles.py` já interpretadas (ver `stylesheets.py`).
+            md_content (str | stream, optional): Conteúdo Markdown, alternativa a `md_path`.
+            chunk_links (bool): O conteúdo é um trecho de um documento maior; links para âncoras
+                                que não estão no trecho são preservados (ver CHUNK_LINK_PREFIX)
+                                em vez de descartados pelo WeasyPrint.
+            html_content (str, optional): Fragmento HTML já gerado (ex.: `PostmanHtmlRenderer`),
+                                          alternativa a `md_path` e `md_content`.
+            assets (dict, optional): Arquivos enviados junto com o documento (caminho relativo ->
+                                     SHA-256 no `AssetStore`), referenciados por caminhos relativos.
         """
-        if not path.exists(md_path):
+        if sum(source is not None for source in (md_path, md_content, html_content)) != 1:
+            raise ValueError("Informe exatamente um entre md_path, md_content e html_content.")
+        if md_path is not None and not path.exists(md_path):
             raise FileNotFoundError(f"Arquivo Markdown não encontrado: {md_path}")
+        if assets and asset_resolution.fetcher_for() is None:
+            raise ValueError("Arquivos anexos exigem a resolução de recursos configurada (assets.configure).")
         
         self.md_path = md_path
+        self.md_content = md_content
+        self.html_content = html_content
         self.pdf_path = pdf_path
         self.custom_css_string = custom_css_string
+        self.header_text = header_text
+        self.chunk_links = chunk_links
+        self.assets = assets
+        self.timings = {} # Duração de cada etapa da última conversão, em segundos
+        self.page_count = None
+
+    def _read_markdown(self) -> str:
+        if self.md_path is not None:
+            with open(self.md_path, "r", encoding="utf-8-sig") as f:
+                return f.read()
+        if isinstance(self.md_content, str):
+            return self.md_content
+        content = self.md_content.read()
+        return content.decode("utf-8-sig") if isinstance(content, bytes) else content
+
+    @staticmethod
+    def _externalize_missing_anchors(document):
+        """Reescreve os links internos cuja âncora está em outro trecho do documento."""
+        anchors = set()
+        for page in document.pages:
+            anchors.update(page.anchors)
+        for page in document.pages:
+            page.links = [
+                ("external", CHUNK_LINK_PREFIX + target, rectangle, box)
+                if link_type == "internal" and target not in anchors
+                else (link_type, target, rectangle, box)
+                for link_type, target, rectangle, box in page.links
+            ]
 
     def convert(self):
         """
         Executa a conversão do Markdown para PDF.
+
+        Após a conversão, `timings` contém a duração das etapas (markdown, css,
+        layout, asset_fetch, pdf_write) e `page_count` o número de páginas geradas.
+
+        Returns:
+            str | bytes: O caminho do PDF gerado ou, sem `pdf_path`, os bytes do PDF.
         """
-        print(f"Iniciando conversão de '{self.md_path}' para '{self.pdf_path}'...")
+        source = self.md_path or "<memória>"
+        target = self.pdf_path or "<memória>"
+        logger.info("Iniciando conversão de '%s' para '%s'...", source, target)
+        self.timings = {}
         try:
-            with open(self.md_path, "r", encoding="utf-8") as f:
-                md_content = f.read()
+            html_content = self.html_content
+            if html_content is None:
+                with timed_stage(self.timings, "markdown"):
+                    md_content = self._read_markdown()
 
-            html_content = markdown(md_content, extras=["fenced-code-blocks", "tables", "code-friendly"])
+                    html_content = markdown_to_html(md_content)
 
-            stylesheets = []
-            if self.custom_css_string:
-                stylesheets.append(CSS(string=self.custom_css_string))
+            with timed_stage(self.timings, "css"):
+                stylesheets = []
+                if self.header_text is not None:
+                    stylesheets.extend(get_stylesheets(self.header_text))
+                if self.custom_css_string:
+                    stylesheets.append(CSS(string=self.custom_css_string))
             
-            HTML(string=html_content).write_pdf(self.pdf_path, stylesheets=stylesheets)
-            print(f"PDF gerado com sucesso em: {self.pdf_path}")
-            return self.pdf_path
+            fetcher = asset_resolution.fetcher_for(self.assets)
+            with timed_stage(self.timings, "layout"):
+                if fetcher is not None:
+                    html = HTML(string=html_content, base_url=fetcher.base_url, url_fetcher=fetcher)
+                    document = html.render(stylesheets=stylesheets, cache=asset_resolution.image_cache())
+                else:
+                    base_url = path.dirname(path.abspath(self.md_path)) + path.sep if self.md_path else None
+                    document = HTML(string=html_content, base_url=base_url).render(stylesheets=stylesheets)
+                if self.chunk_links:
+                    self._externalize_missing_anchors(document)
+            if fetcher is not None and fetcher.fetches:
+                self.timings["asset_fetch"] = fetcher.fetch_seconds
+            self.page_count = len(document.pages)
+
+            with timed_stage(self.timings, "pdf_write"):
+                pdf_bytes = document.write_pdf(self.pdf_path)
+            logger.info("PDF gerado com sucesso em: %s (%d páginas)", target, self.page_count)
+            return self.pdf_path or pdf_bytes
         except FileNotFoundError:
-            print(f"Erro: O arquivo de entrada Markdown '{self.md_path}' não foi encontrado.")
+            logger.error("Erro: O arquivo de entrada Markdown '%s' não foi encontrado.", self.md_path)
             raise
         except Exception as e:
-            print(f"Ocorreu um erro inesperado durante a conversão: {e}")
+            logger.exception("Ocorreu um erro inesperado durante a conversão: %s", e)
             raise
\ No newline at end of file
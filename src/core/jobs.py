@@ -0,0 +1,158 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+JOB_QUEUED = "queued"
+JOB_RENDERING = "rendering"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    input_kind TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    pdf_filename TEXT NOT NULL,
+    header_text TEXT NOT NULL,
+    input_path TEXT,
+    result_path TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    worker_pid INTEGER
+)
+"""
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True # Existe, mas pertence a outro usuário
+    return True
+
+
+class JobStore:
+    """
+    Armazena o estado dos jobs de conversão assíncronos em um banco SQLite local.
+
+    O banco pode ser compartilhado por vários processos do servidor: cada job registra
+    o processo que o executa (`worker_pid`), e o modo WAL permite leituras simultâneas.
+    """
+    def __init__(self, db_path: Path):
+        """
+        Abre (ou cria) o banco de jobs.
+
+        Args:
+            db_path (Path): Caminho do arquivo SQLite.
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(_SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "worker_pid" not in columns: # Bancos criados antes da coluna existir
+                try:
+                    self._conn.execute("ALTER TABLE jobs ADD COLUMN worker_pid INTEGER")
+                except sqlite3.OperationalError:
+                    pass # Outro processo do servidor acabou de adicioná-la
+
+    def create(self, job_id: str, input_kind: str, filename: str, pdf_filename: str,
+               header_text: str, input_path: str) -> dict:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, input_kind, filename, pdf_filename, header_text, input_path,"
+                " created_at, worker_pid) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, JOB_QUEUED, input_kind, filename, pdf_filename, header_text, input_path,
+                 time.time(), os.getpid())
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _update(self, job_id: str, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def mark_rendering(self, job_id: str):
+        self._update(job_id, status=JOB_RENDERING, started_at=time.time())
+
+    def mark_done(self, job_id: str, result_path: str):
+        self._update(job_id, status=JOB_DONE, result_path=result_path, input_path=None, finished_at=time.time())
+
+    def mark_failed(self, job_id: str, error: str):
+        self._update(job_id, status=JOB_FAILED, error=error, input_path=None, finished_at=time.time())
+
+    def fail_unfinished(self, error: str) -> list:
+        """
+        Marca como falhos os jobs que ficaram pendentes (ex.: após reinicialização do serviço).
+        Jobs de outros processos do servidor ainda em execução não são afetados.
+
+        Returns:
+            list: Os jobs afetados, antes da atualização.
+        """
+        with self._lock, self._conn:
+            rows = [
+                row for row in self._conn.execute(
+                    "SELECT * FROM jobs WHERE status IN (?, ?)", (JOB_QUEUED, JOB_RENDERING)
+                ).fetchall()
+                if row["worker_pid"] is None or row["worker_pid"] == os.getpid()
+                or not _process_alive(row["worker_pid"])
+            ]
+            self._conn.executemany(
+                "UPDATE jobs SET status = ?, error = ?, input_path = NULL, finished_at = ? WHERE id = ?",
+                [(JOB_FAILED, error, time.time(), row["id"]) for row in rows]
+            )
+        return [dict(row) for row in rows]
+
+    def pop_expired(self, ttl_seconds: float) -> list:
+        """
+        Remove do banco os jobs finalizados há mais de `ttl_seconds`.
+
+        Returns:
+            list: Os jobs removidos, para que seus arquivos sejam apagados.
+        """
+        cutoff = time.time() - ttl_seconds
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,)
+            ).fetchall()
+            self._conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,))
+        return [dict(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def describe_job(job: dict) -> dict:
+    """
+    Monta a representação pública de um job, com os tempos de fila e de renderização.
+    """
+    now = time.time()
+    started_at, finished_at = job["started_at"], job["finished_at"]
+    queue_end = started_at or finished_at or now
+    return {
+        "id": job["id"],
+        "status": job["status"],
+        "filename": job["filename"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": started_at,
+        "finished_at": finished_at,
+        "queue_seconds": round(queue_end - job["created_at"], 3),
+        "render_seconds": round((finished_at or now) - started_at, 3) if started_at else None,
+    }
@@ -0,0 +1,14 @@
+# Extensões do markdown2 usadas em todo o projeto (PDF, descrições das coleções e pré-visualização).
+MARKDOWN_EXTRAS = ["fenced-code-blocks", "tables", "code-friendly"]
+
+
+def markdown_to_html(md_content: str) -> str:
+    """
+    Etapa markdown2 do pipeline: converte Markdown no HTML entregue ao WeasyPrint.
+
+    Não depende do WeasyPrint, para que o processo da API também possa usá-la
+    (ex.: pré-visualização) sem carregar a pilha de renderização.
+    """
+    from markdown2 import markdown
+
+    return markdown(md_content, extras=MARKDOWN_EXTRAS)
@@ -0,0 +1,123 @@
+import logging
+import os
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+from src.core.timing import timed_stage # Reexportado para a API
+
+logger = logging.getLogger("src.pipeline")
+
+# Etapas do pipeline: upload_read, cache_key, postman_html, postman_fragments, preview, markdown, css, layout,
+# asset_fetch (parte do layout gasta obtendo imagens), pdf_write.
+STAGE_DURATION = Histogram(
+    "pdf_stage_duration_seconds",
+    "Duração de cada etapa do pipeline de conversão.",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+INPUT_BYTES = Histogram(
+    "pdf_input_bytes",
+    "Tamanho da entrada recebida, por tipo.",
+    ["kind"],
+    buckets=(1e3, 1e4, 1e5, 1e6, 1e7, 5e7, 1e8, 2e8)
+)
+PAGE_COUNT = Histogram(
+    "pdf_page_count",
+    "Número de páginas dos PDFs gerados.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+OUTPUT_BYTES = Histogram(
+    "pdf_output_bytes",
+    "Tamanho dos PDFs gerados.",
+    buckets=(1e4, 5e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7)
+)
+ERRORS = Counter(
+    "pdf_conversion_errors_total",
+    "Falhas de conversão, por tipo de erro.",
+    ["error_type"]
+)
+# Com vários processos (PROMETHEUS_MULTIPROC_DIR), os estados de recursos compartilhados
+# (cache de resultados, diretório temporário) mostram a leitura mais recente entre os
+# processos vivos; os caches próprios de cada processo são somados.
+CACHE_STATS = Gauge(
+    "pdf_result_cache",
+    "Estado do cache de resultados (hits, misses, entries, bytes_stored, evictions).",
+    ["field"],
+    multiprocess_mode="livemostrecent"
+)
+POSTMAN_FRAGMENTS = Counter(
+    "pdf_postman_fragments_total",
+    "Fragmentos da renderização incremental de coleções Postman, reaproveitados ou renderizados.",
+    ["result"]
+)
+BODY_CACHE_STATS = Gauge(
+    "pdf_postman_body_cache",
+    "Estado do cache de corpos formatados das coleções Postman (hits, misses, entries, chars).",
+    ["field"],
+    multiprocess_mode="livesum"
+)
+SCRATCH_USAGE = Gauge(
+    "pdf_temp_dir",
+    "Uso do diretório temporário (files, bytes, removed_files, removed_bytes).",
+    ["field"],
+    multiprocess_mode="livemostrecent"
+)
+
+
+def observe_timings(timings: dict, **context):
+    """
+    Publica as durações medidas nos histogramas e registra um log estruturado.
+
+    Args:
+        timings (dict): Durações por etapa, como preenchidas por `timed_stage`.
+        **context: Campos adicionais para o log (ex.: tipo de entrada, páginas).
+    """
+    for stage, seconds in timings.items():
+        STAGE_DURATION.labels(stage=stage).observe(seconds)
+    logger.info(
+        "pipeline stages %s",
+        " ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in timings.items()),
+        extra={"stages": timings, **context}
+    )
+
+
+def observe_render(page_count: int, output_bytes: int):
+    PAGE_COUNT.observe(page_count)
+    OUTPUT_BYTES.observe(output_bytes)
+
+
+def observe_error(error: BaseException):
+    ERRORS.labels(error_type=type(error).__name__).inc()
+
+
+def update_cache_stats(stats: dict):
+    for field in ("hits", "misses", "entries", "bytes_stored", "evictions"):
+        CACHE_STATS.labels(field=field).set(stats[field])
+
+
+def update_body_cache_stats(stats: dict):
+    for field in ("hits", "misses", "entries", "chars"):
+        BODY_CACHE_STATS.labels(field=field).set(stats[field])
+
+
+def update_scratch_usage(usage: dict):
+    for field in ("files", "bytes", "removed_files", "removed_bytes"):
+        SCRATCH_USAGE.labels(field=field).set(usage[field])
+
+
+def render_latest() -> bytes:
+    """
+    Exporta as métricas no formato do Prometheus. Com vários processos do servidor
+    (PROMETHEUS_MULTIPROC_DIR definido), agrega os valores gravados por todos eles.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
+
+
+def mark_process_exit():
+    """Descarta as métricas "vivas" deste processo ao encerrá-lo (modo multiprocesso)."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,126 @@
+from functools import lru_cache
+from pathlib import Path
+
+from src.core.markdown_html import markdown_to_html
+from src.core.postman_json_to_markdown import PostmanJsonToMarkdown
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates" / "postman"
+
+# Descrições distintas mantidas já convertidas para HTML (coleções repetem muitas descrições).
+DESCRIPTION_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+def _description_html(text: str):
+    """
+    Converte uma descrição (escrita em Markdown no Postman) em HTML. É o único uso
+    do markdown2 neste caminho, limitado a textos curtos e em cache.
+    """
+    from markupsafe import Markup
+
+    return Markup(markdown_to_html(text))
+
+
+@lru_cache(maxsize=1)
+def _templates() -> dict:
+    """
+    Carrega e compila os templates uma única vez por processo.
+    """
+    from jinja2 import Environment, FileSystemLoader
+
+    environment = Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR)),
+        autoescape=True,
+        trim_blocks=True,
+        lstrip_blocks=True
+    )
+    environment.filters["description_text"] = PostmanJsonToMarkdown._description_text
+    environment.filters["description_html"] = _description_html
+    return {
+        "header": environment.get_template("header.html"),
+        "item": environment.get_template("item.html"),
+    }
+
+
+class PostmanHtmlRenderer:
+    """
+    Gera o HTML da documentação diretamente da árvore da coleção, com templates Jinja2,
+    sem passar por um documento Markdown intermediário.
+
+    O conteúdo é o mesmo de `PostmanJsonToMarkdown` (títulos, tabelas de parâmetros e
+    corpos), e o HTML segue a estrutura produzida pelo markdown2 para o mesmo documento,
+    de modo que o tema de `styles.py` se aplica sem alterações.
+    """
+    def __init__(self, parser: PostmanJsonToMarkdown):
+        """
+        Args:
+            parser (PostmanJsonToMarkdown): Parser da coleção (inclusive a variante em fluxo),
+                                            usado para percorrer os itens e formatar os corpos.
+        """
+        self.parser = parser
+
+    def header_html(self) -> str:
+        """Retorna o título e a descrição da coleção em HTML."""
+        info = self.parser.collection_data.get('info', {})
+        return _templates()["header"].render(
+            name=info.get('name', 'Documentação da API'),
+            description=PostmanJsonToMarkdown._description_text(info.get('description'))
+        )
+
+    def _render_item(self, item: dict, level: int) -> str:
+        """Gera o HTML de uma pasta ou requisição (sem os filhos da pasta)."""
+        if "item" in item:
+            return _templates()["item"].render(item=item, level=level, is_folder=True)
+        if "request" not in item:
+            return ""
+
+        request = item.get('request', {})
+        request_body = self.parser._request_body(request.get('body'))
+        bodies = [("Corpo da Requisição:", request_body)] if request_body is not None else []
+        bodies.extend(self.parser._response_examples(item.get('response')))
+        return _templates()["item"].render(
+            item=item,
+            level=level,
+            is_folder=False,
+            request=request,
+            url_raw=request.get('url', {}).get('raw', ''),
+            parameters=[
+                (param_type, self.parser._parameter_rows(params))
+                for param_type, params in self.parser._parameter_groups(request)
+            ],
+            bodies=bodies
+        )
+
+    def items_html(self, items: list, level: int = 2) -> str:
+        """
+        Retorna o HTML de uma lista de pastas e/ou requisições, incluindo seus descendentes.
+        """
+        return "".join(
+            self._render_item(node, node_level)
+            for node_level, node in self.parser._iter_tree(items, level)
+        )
+
+    def iter_sections(self):
+        """
+        Gera o documento em seções: o cabeçalho da coleção e, depois, uma seção por item
+        de primeiro nível com todos os seus descendentes (pontos de corte para a
+        renderização em paralelo).
+
+        Yields:
+            str: O HTML de cada seção, na ordem do documento.
+        """
+        yield self.header_html()
+        section = []
+        for level, item in self.parser._iter_nodes():
+            if level == 2 and section:
+                yield "".join(section)
+                section = []
+            section.append(self._render_item(item, level))
+        if section:
+            yield "".join(section)
+
+    def convert_to_html(self) -> str:
+        """
+        Converte a coleção em um fragmento HTML pronto para o WeasyPrint.
+        """
+        return "".join(self.iter_sections())
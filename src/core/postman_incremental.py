@@ -0,0 +1,106 @@
+import io
+import json
+from typing import Callable
+
+from src.core.postman_html import PostmanHtmlRenderer
+from src.core.postman_stream import StreamingPostmanJsonToMarkdown
+from src.core.result_cache import PDFResultCache
+
+
+def _canonical_json(value) -> bytes:
+    """Serialização estável de um item: a mesma subárvore sempre gera os mesmos bytes."""
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _fingerprint_chunks(parts: list):
+    """Blocos com prefixo de tamanho, para que a divisão entre as partes também entre na chave."""
+    for part in parts:
+        yield len(part).to_bytes(8, "big")
+        yield part
+
+
+class PostmanFragmentPlanner:
+    """
+    Divide uma coleção Postman em fragmentos renderizados de forma independente: cada
+    pasta de primeiro nível é um fragmento, e as requisições soltas no primeiro nível são
+    agrupadas com as vizinhas (o primeiro fragmento inclui o título da coleção).
+
+    Cada fragmento é identificado pelo SHA-256 do JSON canônico de sua subárvore, do
+    cabeçalho, do CSS, das opções de formatação e das versões das bibliotecas. Só os fragmentos ausentes do cache
+    de resultados têm o HTML gerado e precisam ser renderizados de novo.
+    """
+    def __init__(self, parser: StreamingPostmanJsonToMarkdown, header_text: str, css: str, lookup: Callable):
+        """
+        Args:
+            parser (StreamingPostmanJsonToMarkdown): Parser já posicionado na lista `item` da coleção.
+            header_text (str): Texto do cabeçalho do PDF.
+            css (str): CSS final aplicado ao documento.
+            lookup (Callable): Função que recebe a chave de um fragmento e retorna o caminho
+                               do PDF em cache ou None (ex.: `PDFResultCache.get`).
+        """
+        self.parser = parser
+        self.renderer = PostmanHtmlRenderer(parser)
+        options = parser.options_signature(parser.body_formatter, parser.all_examples)
+        self.kind = f"postman-fragment:html;{options}"
+        self.header_text = header_text
+        self.css = css
+        self.lookup = lookup
+
+    def _make_fragment(self, title: str, preamble: str, items: list) -> dict:
+        parts = [preamble.encode("utf-8")] + [_canonical_json(item) for item in items]
+        cache_key = PDFResultCache.make_key(
+            self.kind, _fingerprint_chunks(parts), self.header_text, self.css
+        )
+        pdf_path = self.lookup(cache_key)
+        html_content = None
+        if pdf_path is None:
+            html_content = preamble + self.renderer.items_html(items)
+        return {"title": title, "cache_key": cache_key, "pdf_path": pdf_path, "html_content": html_content}
+
+    def plan(self) -> list:
+        """
+        Lê a coleção e monta a lista de fragmentos, na ordem do documento.
+
+        Returns:
+            list: Dicionários com `title`, `cache_key`, `pdf_path` (PDF em cache ou None)
+                  e `html_content` (HTML a renderizar, apenas quando não há cache).
+        """
+        info = self.parser.collection_data["info"]
+        fragments = []
+        title = info.get("name", "Documentação da API")
+        preamble = self.renderer.header_html()
+        loose_requests = []
+        for item in self.parser.iter_top_level_items():
+            if "item" not in item:
+                if not loose_requests and not preamble:
+                    title = item.get("name", "Endpoint sem nome")
+                loose_requests.append(item)
+                continue
+            if preamble or loose_requests:
+                fragments.append(self._make_fragment(title, preamble, loose_requests))
+                preamble, loose_requests = "", []
+            fragments.append(self._make_fragment(item.get("name", ""), "", [item]))
+        if preamble or loose_requests:
+            fragments.append(self._make_fragment(title, preamble, loose_requests))
+        return fragments
+
+
+def merge_pdf_fragments(documents: list) -> bytes:
+    """
+    Job executado nos workers: junta os PDFs dos fragmentos em um único documento,
+    com um marcador (outline) por fragmento.
+
+    Args:
+        documents (list): Pares (título, caminho do PDF), na ordem do documento final.
+
+    Returns:
+        bytes: O PDF final.
+    """
+    from pypdf import PdfWriter # Só é necessário nos workers
+
+    writer = PdfWriter()
+    for title, path in documents:
+        writer.append(path, outline_item=title)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
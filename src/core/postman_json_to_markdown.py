@@ -1,106 +1,251 @@
-import json
+from src.core.body_format import BodyFormatter, default_body_formatter
+
+_END = object() # Sentinela para o fim de uma lista de itens no percurso iterativo
 
 class PostmanJsonToMarkdown:
-    def __init__(self, postman_collection_json: dict):
+    def __init__(self, postman_collection_json: dict, body_formatter: BodyFormatter = None,
+                 all_examples: bool = False):
+        """
+        Args:
+            postman_collection_json (dict): A coleção exportada do Postman.
+            body_formatter (BodyFormatter, optional): Formatação (e cache) dos corpos.
+                                                      Padrão: o formatador compartilhado, sem limite de tamanho.
+            all_examples (bool): Inclui todos os exemplos de `response`, não apenas o primeiro.
+        """
         if not isinstance(postman_collection_json, dict) or "item" not in postman_collection_json:
             raise ValueError("O JSON fornecido não parece ser uma coleção Postman válida.")
         self.collection_data = postman_collection_json
+        self.body_formatter = body_formatter or default_body_formatter
+        self.all_examples = all_examples
 
-    def _format_request_body(self, body_data: dict) -> str:
-        """Formata o corpo da requisição para Markdown."""
+    @staticmethod
+    def options_signature(body_formatter: BodyFormatter, all_examples: bool) -> str:
+        """Identifica as opções que alteram o documento gerado, para compor chaves de cache."""
+        return f"body={body_formatter.signature};examples={'all' if all_examples else 'first'}"
+
+    def _format_body(self, body: str):
+        """
+        Formata um corpo de requisição/resposta (ver `BodyFormatter.format`).
+
+        Returns:
+            tuple: (linguagem do bloco de código, texto), com linguagem "json" ou "".
+        """
+        return self.body_formatter.format(body)
+
+    def _request_body(self, body_data: dict):
+        """Retorna o corpo da requisição como (linguagem, texto), ou None se não houver."""
         if body_data and body_data.get("mode") == "raw" and "raw" in body_data:
-            try:
-                raw_content = json.loads(body_data["raw"])
-                return "```json\n" + json.dumps(raw_content, indent=2) + "\n```"
-            except json.JSONDecodeError:
-                return "```\n" + body_data["raw"] + "\n```"
-        return ""
+            return self._format_body(body_data["raw"])
+        return None
 
-    def _format_response_body(self, response_data: list) -> str:
-        """Formata o corpo da primeira resposta para Markdown."""
-        if response_data and isinstance(response_data, list) and len(response_data) > 0:
+    def _response_examples(self, response_data: list) -> list:
+        """
+        Retorna os exemplos de resposta como (título, (linguagem, texto)): apenas o primeiro
+        ou, com `all_examples`, todos os que têm corpo (identificados pelo nome no título).
+        """
+        if not response_data or not isinstance(response_data, list):
+            return []
+        if not self.all_examples:
             first_response = response_data[0]
             if "body" in first_response:
-                try:
-                    body_content = json.loads(first_response["body"])
-                    return "```json\n" + json.dumps(body_content, indent=2) + "\n```"
-                except json.JSONDecodeError:
-                    return "```\n" + first_response["body"] + "\n```"
-        return ""
-    
+                return [("Exemplo de Resposta:", self._format_body(first_response["body"]))]
+            return []
+
+        examples = [response for response in response_data if "body" in response]
+        if len(examples) == 1:
+            return [("Exemplo de Resposta:", self._format_body(examples[0]["body"]))]
+        return [
+            (
+                f"Exemplo de Resposta ({response.get('name') or index}):",
+                self._format_body(response["body"])
+            )
+            for index, response in enumerate(examples, start=1)
+        ]
+
+    @staticmethod
+    def _code_block(body) -> str:
+        if body is None:
+            return ""
+        language, text = body
+        return f"```{language}\n{text}\n```"
+
+    def _format_request_body(self, body_data: dict) -> str:
+        """Formata o corpo da requisição para Markdown."""
+        return self._code_block(self._request_body(body_data))
+
+    def _format_response_body(self, response_data: list) -> str:
+        """Formata os exemplos de resposta para Markdown, cada um com seu título."""
+        return "\n\n".join(
+            f"### {title}\n{self._code_block(body)}"
+            for title, body in self._response_examples(response_data)
+        )
+
+    @staticmethod
+    def _description_text(description) -> str:
+        """
+        Normaliza uma descrição: no formato v2.1 ela pode ser um objeto
+        `{"content": ..., "type": ...}` em vez de texto.
+        """
+        if isinstance(description, dict):
+            description = description.get('content', '')
+        return "" if description is None else str(description)
+
+    @staticmethod
+    def _parameter_rows(params: list) -> list:
+        """Extrai (nome, valor exemplo, descrição) de cada parâmetro."""
+        return [
+            (
+                param.get('key', param.get('name', '')),
+                param.get('value', ''),
+                PostmanJsonToMarkdown._description_text(param.get('description')).replace('\n', ' ').strip() # Remove quebras de linha
+            )
+            for param in params
+        ]
+
+    @staticmethod
+    def _parameter_groups(request: dict) -> list:
+        """Retorna os parâmetros da requisição como (tipo, lista), na ordem do documento."""
+        url = request.get('url', {})
+        groups = [
+            ('Query', url.get('query')),
+            ('Path', url.get('variable')),
+            ('Header', request.get('header')),
+            ('Cookie', request.get('cookie')),
+        ]
+        return [(param_type, params) for param_type, params in groups if params]
+
     def _format_parameters(self, params: list, param_type: str) -> str:
         """Formata parâmetros (query, path, header, cookie) para uma tabela Markdown."""
         if not params:
             return ""
         
-        md_table = f"#### Parâmetros de {param_type}:\n\n"
-        md_table += "| Nome | Valor Exemplo | Descrição |\n"
-        md_table += "|---|---|---|\n"
-        
-        for param in params:
-            name = param.get('key', param.get('name', ''))
-            value = param.get('value', '')
-            description = param.get('description', '').replace('\n', ' ').strip() # Remove quebras de linha
-            md_table += f"| `{name}` | `{value}` | {description} |\n"
-        md_table += "\n"
-        return md_table
+        rows = [
+            f"#### Parâmetros de {param_type}:\n\n",
+            "| Nome | Valor Exemplo | Descrição |\n",
+            "|---|---|---|\n",
+        ]
+        for name, value, description in self._parameter_rows(params):
+            rows.append(f"| `{name}` | `{value}` | {description} |\n")
+        rows.append("\n")
+        return "".join(rows)
+
+    def _iter_nodes(self):
+        """
+        Percorre a árvore `item` da coleção em ordem de documento.
+
+        Yields:
+            tuple: (nível do título, item) para cada pasta ou requisição.
+        """
+        return self._iter_tree(self.collection_data.get("item", []), 2)
+
+    @staticmethod
+    def _iter_tree(items: list, level: int):
+        """
+        Percorre uma lista de itens e seus descendentes em ordem de documento, usando uma
+        pilha explícita em vez de recursão (pastas profundamente aninhadas não estouram a pilha).
+        """
+        stack = [(level, iter(items))]
+        while stack:
+            level, items = stack[-1]
+            item = next(items, _END)
+            if item is _END:
+                stack.pop()
+                continue
+            yield level, item
+            if "item" in item:
+                stack.append((level + 1, iter(item["item"])))
+
+    def _iter_header(self):
+        """Gera o título e a descrição da coleção."""
+        info = self.collection_data.get('info', {})
+        yield f"# {info.get('name', 'Documentação da API')}\n\n"
+        description = self._description_text(info.get('description'))
+        if description:
+            yield f"{description}\n\n"
+
+    def _iter_item(self, item: dict, level: int):
+        """Gera os blocos Markdown de uma pasta ou requisição (sem os filhos da pasta)."""
+        if "item" in item:
+            yield f"{'#' * level} {item['name']}\n\n"
+            description = self._description_text(item.get('description'))
+            if description:
+                yield f"{description}\n\n"
+        elif "request" in item:
+            yield f"{'#' * level} {item.get('name', 'Endpoint sem nome')}\n\n"
+            
+            request = item.get('request', {})
+            description = self._description_text(request.get('description'))
+            if description:
+                yield f"{description}\n\n"
+            
+            yield f"**Método:** `{request.get('method', 'GET')}`\n"
+            
+            url_raw = request.get('url', {}).get('raw', '')
+            if url_raw:
+                yield f"**URL:** `{url_raw}`\n\n"
+            
+            for param_type, params in self._parameter_groups(request):
+                yield self._format_parameters(params, param_type)
+
+            request_body_md = self._format_request_body(request.get('body'))
+            if request_body_md:
+                yield "### Corpo da Requisição:\n"
+                yield request_body_md + "\n\n"
+
+            response_body_md = self._format_response_body(item.get('response'))
+            if response_body_md:
+                yield response_body_md + "\n\n"
+
+    def iter_markdown(self):
+        """
+        Gera o documento Markdown em blocos, em uma única passada pela coleção.
+        O consumo de memória não cresce com o tamanho do documento gerado.
+
+        Yields:
+            str: Trechos consecutivos do documento Markdown.
+        """
+        yield from self._iter_header()
+        for level, item in self._iter_nodes():
+            yield from self._iter_item(item, level)
+
+    def header_markdown(self) -> str:
+        """Retorna o título e a descrição da coleção em Markdown."""
+        return "".join(self._iter_header())
+
+    def items_markdown(self, items: list, level: int = 2) -> str:
+        """
+        Retorna o Markdown de uma lista de pastas e/ou requisições, incluindo seus descendentes.
+
+        Args:
+            items (list): Itens da árvore `item` da coleção.
+            level (int): Nível de título dos itens da lista.
+        """
+        return "".join(
+            chunk for node_level, node in self._iter_tree(items, level)
+            for chunk in self._iter_item(node, node_level)
+        )
+
+    def write_markdown(self, output) -> int:
+        """
+        Escreve o documento Markdown diretamente em um arquivo (ou socket) de texto.
+
+        Args:
+            output: Objeto com método `write(str)`, ex.: arquivo aberto em modo texto.
+
+        Returns:
+            int: Número de caracteres escritos.
+        """
+        written = 0
+        for chunk in self.iter_markdown():
+            output.write(chunk)
+            written += len(chunk)
+        return written
 
     def convert_to_markdown(self) -> str:
         """
         Converte os dados da coleção Postman (JSON) para uma string Markdown.
         """
-        collection = self.collection_data
-        
-        markdown_output = f"# {collection.get('info', {}).get('name', 'Documentação da API')}\n\n"
-        
-        description = collection.get('info', {}).get('description', '')
-        if description:
-            markdown_output += f"{description}\n\n"
-
-
-        def process_items(items, level=2):
-            nonlocal markdown_output
-            for item in items:
-                if "item" in item:
-                    markdown_output += f"{'#' * level} {item['name']}\n\n"
-                    if item.get('description'):
-                        markdown_output += f"{item['description']}\n\n"
-                    process_items(item["item"], level + 1)
-                elif "request" in item:
-                    markdown_output += f"{'#' * level} {item.get('name', 'Endpoint sem nome')}\n\n"
-                    
-                    request = item.get('request', {})
-                    if request.get('description'):
-                        markdown_output += f"{request['description']}\n\n"
-                    
-                    markdown_output += f"**Método:** `{request.get('method', 'GET')}`\n"
-                    
-                    url_raw = request.get('url', {}).get('raw', '')
-                    if url_raw:
-                        markdown_output += f"**URL:** `{url_raw}`\n\n"
-                    
-                    if request.get('url', {}).get('query'):
-                        markdown_output += self._format_parameters(request['url']['query'], 'Query')
-                    if request.get('url', {}).get('variable'):
-                        markdown_output += self._format_parameters(request['url']['variable'], 'Path')
-                    if request.get('header'):
-                        markdown_output += self._format_parameters(request['header'], 'Header')
-                    if request.get('cookie'):
-                        markdown_output += self._format_parameters(request['cookie'], 'Cookie')
-
-                    request_body_md = self._format_request_body(request.get('body'))
-                    if request_body_md:
-                        markdown_output += "### Corpo da Requisição:\n"
-                        markdown_output += request_body_md + "\n\n"
-
-                    response_body_md = self._format_response_body(item.get('response'))
-                    if response_body_md:
-                        markdown_output += "### Exemplo de Resposta:\n"
-                        markdown_output += response_body_md + "\n\n"
-        
-        process_items(collection.get("item", []))
-        
-        return markdown_output
+        return "".join(self.iter_markdown())
 
 if __name__ == '__main__':
     sample_postman_json = {
@@ -180,10 +325,8 @@ if __name__ == '__main__':
 
     try:
         parser = PostmanJsonToMarkdown(sample_postman_json)
-        markdown_doc = parser.convert_to_markdown()
-        
         with open("postman_json_doc.md", "w", encoding="utf-8") as f:
-            f.write(markdown_doc)
+            parser.write_markdown(f)
         print("Documentação Markdown do Postman JSON gerada com sucesso em postman_json_doc.md")
         
     except Exception as e:
@@ -0,0 +1,274 @@
+from src.core.body_format import BodyFormatter, default_body_formatter
+from src.core.postman_json_to_markdown import PostmanJsonToMarkdown
+
+_CONTAINER_START = ("start_map", "start_array")
+_CONTAINER_END = ("end_map", "end_array")
+
+INVALID_JSON_MESSAGE = "Arquivo JSON do Postman inválido. Verifique a formatação."
+
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+
+class PostmanCollectionTooLargeError(ValueError):
+    """
+    Levantada quando o arquivo da coleção excede o tamanho máximo permitido.
+    """
+
+
+class PostmanCollectionTooComplexError(ValueError):
+    """
+    Levantada quando a coleção excede o número máximo de itens ou de níveis de pastas.
+    """
+
+
+class _LimitedReader:
+    """
+    Envolve um arquivo binário e interrompe a leitura ao ultrapassar `max_bytes`.
+
+    Um BOM UTF-8 no início do arquivo é descartado (o ijson o rejeitaria), como no
+    cálculo da chave de cache (ver `result_cache._normalized_chunks`).
+    """
+    def __init__(self, fileobj, max_bytes: int = None):
+        self._fileobj = fileobj
+        self._max_bytes = max_bytes
+        self._read = 0
+        self._at_start = True
+
+    def _read_limited(self, size: int) -> bytes:
+        data = self._fileobj.read(size)
+        self._read += len(data)
+        if self._max_bytes is not None and self._read > self._max_bytes:
+            raise PostmanCollectionTooLargeError(
+                f"A coleção Postman excede o tamanho máximo permitido de {self._max_bytes} bytes."
+            )
+        return data
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._read_limited(size)
+        if self._at_start and data: # O ijson lê 0 bytes antes, para detectar o tipo do arquivo
+            self._at_start = False
+            while data and len(data) < len(_UTF8_BOM) and _UTF8_BOM.startswith(data):
+                more = self._read_limited(len(_UTF8_BOM) - len(data))
+                if not more:
+                    break
+                data += more
+            if data.startswith(_UTF8_BOM):
+                data = data[len(_UTF8_BOM):] or self._read_limited(size)
+        return data
+
+
+class StreamingPostmanJsonToMarkdown(PostmanJsonToMarkdown):
+    """
+    Variante de `PostmanJsonToMarkdown` que lê a coleção como um fluxo de eventos JSON
+    (ijson), sem carregar o arquivo inteiro nem a árvore completa de dicionários.
+
+    Apenas uma requisição por vez é materializada em memória. Como o documento é gerado
+    em uma única passada, campos de uma pasta que aparecem depois da sua lista `item`
+    no JSON (raro nas exportações do Postman) não são incluídos no título da pasta.
+    """
+    def __init__(self, fileobj, max_bytes: int = None, max_items: int = None, max_depth: int = None,
+                 body_formatter: BodyFormatter = None, all_examples: bool = False):
+        """
+        Inicializa o parser e lê o início da coleção até a lista `item`.
+
+        Args:
+            fileobj: Arquivo binário com o JSON da coleção (ex.: `UploadFile.file`).
+            max_bytes (int, optional): Tamanho máximo aceito para o arquivo, em bytes.
+            max_items (int, optional): Número máximo de pastas e requisições na coleção.
+            max_depth (int, optional): Número máximo de níveis de pastas aninhadas.
+            body_formatter (BodyFormatter, optional): Formatação (e cache) dos corpos.
+            all_examples (bool): Inclui todos os exemplos de `response`, não apenas o primeiro.
+
+        Raises:
+            PostmanCollectionTooLargeError: Se o arquivo exceder `max_bytes`.
+            ValueError: Se o JSON for inválido ou não parecer uma coleção Postman.
+
+        Os limites de itens e de profundidade são verificados durante a leitura da lista
+        `item` e levantam `PostmanCollectionTooComplexError`.
+        """
+        self.max_items = max_items
+        self.max_depth = max_depth
+        self.body_formatter = body_formatter or default_body_formatter
+        self.all_examples = all_examples
+        self._item_count = 0
+        import ijson # Adiado: só as conversões de coleções Postman precisam dele
+
+        self._events = ijson.parse(_LimitedReader(fileobj, max_bytes), use_float=True)
+        try:
+            info = self._read_until_items()
+        except ijson.JSONError:
+            raise ValueError(INVALID_JSON_MESSAGE)
+        if info is None:
+            raise ValueError("O JSON fornecido não parece ser uma coleção Postman válida.")
+        self.collection_data = {"info": info}
+
+    def _next_event(self):
+        _, event, value = next(self._events)
+        return event, value
+
+    def _build_value(self, event: str, value, item_level: int = None):
+        """
+        Materializa o valor JSON que começa no evento dado.
+
+        Com `item_level`, o valor é um item da coleção nesse nível: ele e as pastas e
+        requisições aninhadas nas suas listas `item` são contabilizados à medida que os
+        eventos chegam, e os limites interrompem a leitura antes de a pasta inteira
+        ficar em memória.
+        """
+        import ijson
+
+        builder = ijson.ObjectBuilder()
+        builder.event(event, value)
+        if event not in _CONTAINER_START:
+            return builder.value
+        # Quadros da pilha: [nível do item ou None, última chave] para objetos e
+        # [nível dos itens ou None] para listas.
+        if item_level is not None:
+            self._count_item()
+        stack = [[item_level, None] if event == "start_map" else [None]]
+        while stack:
+            event, value = self._next_event()
+            builder.event(event, value)
+            parent = stack[-1]
+            if event == "map_key":
+                parent[1] = value
+            elif event == "start_map":
+                level = parent[0] if len(parent) == 1 else None
+                if level is not None:
+                    self._count_item()
+                stack.append([level, None])
+            elif event == "start_array":
+                is_items = len(parent) == 2 and parent[0] is not None and parent[1] == "item"
+                if is_items:
+                    self._check_folder_depth(parent[0])
+                stack.append([parent[0] + 1 if is_items else None])
+            elif event in _CONTAINER_END:
+                stack.pop()
+        return builder.value
+
+    def _skip_value(self, event: str):
+        """Descarta o valor JSON que começa no evento dado, sem materializá-lo."""
+        depth = 1 if event in _CONTAINER_START else 0
+        while depth:
+            event, _ = self._next_event()
+            if event in _CONTAINER_START:
+                depth += 1
+            elif event in _CONTAINER_END:
+                depth -= 1
+
+    def _read_until_items(self):
+        """
+        Consome as chaves de primeiro nível até o início da lista `item`.
+
+        Returns:
+            dict: O objeto `info` da coleção (vazio se ausente), ou None se não houver `item`.
+        """
+        try:
+            event, _ = self._next_event()
+        except StopIteration:
+            return None
+        if event != "start_map":
+            return None
+
+        info = {}
+        while True:
+            event, key = self._next_event()
+            if event == "end_map":
+                return None
+            event, value = self._next_event()
+            if key == "item" and event == "start_array":
+                return info
+            if key == "info" and event == "start_map":
+                info = self._build_value(event, value)
+            else:
+                self._skip_value(event)
+
+    def _count_item(self):
+        """Contabiliza uma pasta ou requisição lida e aplica o limite de itens da coleção."""
+        self._item_count += 1
+        if self.max_items is not None and self._item_count > self.max_items:
+            raise PostmanCollectionTooComplexError(
+                f"A coleção Postman excede o limite de {self.max_items} pastas e requisições."
+            )
+
+    def _check_folder_depth(self, level: int):
+        """Aplica o limite de pastas aninhadas a uma pasta cujo título tem o nível dado."""
+        # Pastas de primeiro nível têm título de nível 2; requisições não contam como nível.
+        if self.max_depth is not None and level - 1 > self.max_depth:
+            raise PostmanCollectionTooComplexError(
+                f"A coleção Postman excede o limite de {self.max_depth} níveis de pastas aninhadas."
+            )
+
+    def _iter_nodes(self):
+        """
+        Percorre a lista `item` diretamente do fluxo de eventos, com pilha explícita.
+
+        Yields:
+            tuple: (nível do título, item) para cada pasta ou requisição.
+        """
+        import ijson
+
+        try:
+            for level, item in self._iter_stream_nodes():
+                self._count_item()
+                if "item" in item:
+                    self._check_folder_depth(level)
+                yield level, item
+        except ijson.JSONError:
+            raise ValueError(INVALID_JSON_MESSAGE)
+
+    def iter_top_level_items(self):
+        """
+        Lê a lista `item` da coleção materializando uma pasta ou requisição de primeiro
+        nível por vez, com todos os seus descendentes.
+
+        Yields:
+            dict: Cada item de primeiro nível, na ordem do documento.
+        """
+        import ijson
+
+        try:
+            while True:
+                event, value = self._next_event()
+                if event == "end_array":
+                    return
+                if event == "start_map":
+                    yield self._build_value(event, value, item_level=2)
+                else:
+                    self._skip_value(event)
+        except ijson.JSONError:
+            raise ValueError(INVALID_JSON_MESSAGE)
+
+    def _iter_stream_nodes(self):
+        # Quadros da pilha: ["array", nível] ou ["map", nível, campos lidos, é_pasta]
+        stack = [["array", 2]]
+        while stack:
+            event, value = self._next_event()
+            frame = stack[-1]
+
+            if frame[0] == "array":
+                if event == "end_array":
+                    stack.pop()
+                elif event == "start_map":
+                    stack.append(["map", frame[1], {}, False])
+                else:
+                    self._skip_value(event)
+                continue
+
+            _, level, fields, is_folder = frame
+            if event == "end_map":
+                stack.pop()
+                if not is_folder:
+                    yield level, fields
+                continue
+
+            key = value
+            event, value = self._next_event()
+            if is_folder:
+                self._skip_value(event)
+            elif key == "item" and event == "start_array":
+                frame[3] = True
+                yield level, dict(fields, item=[])
+                stack.append(["array", level + 1])
+            else:
+                fields[key] = self._build_value(event, value)
@@ -0,0 +1,77 @@
+from html import escape
+
+from src.core.chunking import split_sections
+from src.core.markdown_html import markdown_to_html
+from src.core.styles import get_base_css
+
+# Ajustes apenas para a tela: largura útil de uma página A4 e o cabeçalho, que no PDF
+# fica na margem da página (@top-center) e não existe no navegador.
+PREVIEW_CSS = """
+body {
+    max-width: 170mm;
+    margin: 0 auto;
+    padding: 16px 24px 48px;
+}
+
+.preview-header {
+    text-align: center;
+    font-size: 10px;
+    font-style: italic;
+    color: #555;
+    border-bottom: 1px dashed #ccc;
+    padding-bottom: 6px;
+}
+
+.preview-error {
+    margin-top: 16px;
+    padding: 8px 12px;
+    border: 1px solid #c0392b;
+    border-radius: 4px;
+    background: #fdecea;
+    color: #c0392b;
+}
+"""
+
+
+# O HTML da pré-visualização vem de conteúdo enviado pelo usuário (Markdown e descrições
+# do Postman aceitam HTML bruto) e é servido na origem do serviço: nenhum script ou
+# recurso externo além de imagens pode ser carregado.
+PREVIEW_CSP = "default-src 'none'; style-src 'unsafe-inline'; img-src data: https:"
+
+
+def preview_head(header_text: str, title: str) -> str:
+    """
+    Retorna o início do documento de pré-visualização: o CSS de `styles.py` embutido
+    e o texto do cabeçalho. É enviado antes de qualquer seção ficar pronta.
+    """
+    return (
+        "<!DOCTYPE html>\n<html lang=\"pt-BR\">\n<head>\n<meta charset=\"UTF-8\">\n"
+        "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">\n"
+        f"<title>Pré-visualização: {escape(title)}</title>\n"
+        f"<style>{get_base_css()}{PREVIEW_CSS}</style>\n</head>\n<body>\n"
+        f"<div class=\"preview-header\">{escape(header_text)}</div>\n"
+    )
+
+
+def preview_error(message: str) -> str:
+    """Bloco exibido quando a geração falha depois que o documento começou a ser enviado."""
+    return f"<div class=\"preview-error\">{escape(message)}</div>\n"
+
+
+def preview_tail() -> str:
+    return "</body>\n</html>\n"
+
+
+def iter_markdown_preview(md_content: str):
+    """
+    Converte o Markdown seção por seção (cortes nos títulos H1/H2, ver `chunking`),
+    para que o navegador exiba o início do documento antes do fim da conversão.
+
+    Yields:
+        str: O HTML de cada seção, na ordem do documento.
+    """
+    sections, definitions = split_sections(md_content)
+    # As definições de links por referência valem para o documento inteiro.
+    shared = "\n" + "".join(definitions) if definitions else ""
+    for section in sections:
+        yield markdown_to_html(section + shared)
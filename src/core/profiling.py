@@ -0,0 +1,241 @@
+"""
+Perfil de uma única conversão, para investigar documentos que renderizam devagar.
+
+A conversão inteira (leitura da entrada, geração do HTML e layout/escrita do PDF pelo
+WeasyPrint) roda sob o cProfile e, em paralelo, sob um amostrador de pilhas. O
+resultado vira um ZIP com:
+
+- `profile.pstats`: o perfil do cProfile (`python -m pstats`, snakeviz etc.);
+- `profile.collapsed`: pilhas amostradas no formato "collapsed" (flamegraph.pl, speedscope);
+- `stats.json`: estatísticas da entrada (tamanho, títulos, tabelas, blocos de código,
+  imagens), páginas geradas e duração de cada etapa.
+
+Usado por `/convert/` com `profile=true` (ver ADMIN_TOKEN) e pela linha de comando:
+
+    python -m src.core.profiling documento.md -o perfil.zip
+"""
+import argparse
+import cProfile
+import io
+import json
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+import zipfile
+from collections import Counter
+from typing import Optional
+
+# Intervalo entre as amostras de pilha, em segundos.
+SAMPLE_INTERVAL = 0.005
+
+_TAG_PATTERNS = {
+    "headings": re.compile(r"<h[1-6][\s>]"),
+    "tables": re.compile(r"<table[\s>]"),
+    "code_blocks": re.compile(r"<pre[\s>]"),
+    "images": re.compile(r"<img[\s>]"),
+    "links": re.compile(r"<a[\s>]"),
+}
+
+
+def document_stats(html_content: str) -> dict:
+    """
+    Conta os elementos do HTML que mais pesam no layout (títulos, tabelas, blocos de
+    código, imagens e links).
+    """
+    stats = {name: len(pattern.findall(html_content)) for name, pattern in _TAG_PATTERNS.items()}
+    stats["html_chars"] = len(html_content)
+    return stats
+
+
+class StackSampler:
+    """
+    Amostra periodicamente a pilha de uma thread (via `sys._current_frames`) e conta
+    as pilhas no formato "collapsed": funções da raiz até a folha, separadas por ";".
+
+    Complementa o cProfile, que não registra pilhas completas: o gráfico de chamas mostra
+    por qual caminho o tempo foi gasto dentro do WeasyPrint.
+    """
+    def __init__(self, thread_id: Optional[int] = None, interval: float = SAMPLE_INTERVAL):
+        """
+        Args:
+            thread_id (int, optional): Thread amostrada. Padrão: a thread que cria o amostrador.
+            interval (float): Intervalo entre as amostras, em segundos.
+        """
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._sample, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """Retorna as pilhas amostradas, uma por linha, seguidas do número de amostras."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _convert(input_kind: str, data: bytes, header_text: str, assets: Optional[dict],
+             postman_options: Optional[dict], body_options: Optional[dict]):
+    from src.core.converter import MarkdownToPDFConverter
+
+    if input_kind == "markdown":
+        converter = MarkdownToPDFConverter(md_content=data.decode("utf-8-sig"), header_text=header_text, assets=assets)
+        pdf_bytes = converter.convert()
+        return converter, pdf_bytes, None
+
+    from src.core.body_format import BodyFormatter
+    from src.core.postman_html import PostmanHtmlRenderer
+    from src.core.postman_stream import StreamingPostmanJsonToMarkdown
+
+    timings = {}
+    start = time.perf_counter()
+    parser = StreamingPostmanJsonToMarkdown(
+        io.BytesIO(data), body_formatter=BodyFormatter(**(body_options or {})), **(postman_options or {})
+    )
+    html_content = PostmanHtmlRenderer(parser).convert_to_html()
+    timings["postman_html"] = time.perf_counter() - start
+    converter = MarkdownToPDFConverter(html_content=html_content, header_text=header_text)
+    pdf_bytes = converter.convert()
+    converter.timings = {**timings, **converter.timings}
+    return converter, pdf_bytes, html_content
+
+
+def profile_conversion(input_kind: str, data: bytes, header_text: str, assets: Optional[dict] = None,
+                       postman_options: Optional[dict] = None, body_options: Optional[dict] = None,
+                       interval: float = SAMPLE_INTERVAL) -> dict:
+    """
+    Converte uma entrada em PDF sob o cProfile e o `StackSampler`, de ponta a ponta e
+    sem divisão em trechos. Pode rodar nos workers de renderização (é um job do pool).
+
+    Args:
+        input_kind (str): "markdown" ou "postman".
+        data (bytes): O conteúdo do arquivo enviado.
+        header_text (str): O texto do cabeçalho.
+        assets (dict, optional): Arquivos enviados junto com o Markdown (ver `MarkdownToPDFConverter`).
+        postman_options (dict, optional): Argumentos de `StreamingPostmanJsonToMarkdown` (limites, exemplos).
+        body_options (dict, optional): Argumentos do `BodyFormatter` usado na coleção.
+        interval (float): Intervalo entre as amostras de pilha, em segundos.
+
+    Returns:
+        dict: `pdf_bytes`, `page_count` e `timings`, como em `render_markdown`, além de
+              `pstats` (bytes no formato de `pstats.Stats.dump_stats`), `collapsed` e `stats`.
+    """
+    from src.core.markdown_html import markdown_to_html
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    with StackSampler(interval=interval) as sampler:
+        profiler.enable()
+        try:
+            converter, pdf_bytes, html_content = _convert(
+                input_kind, data, header_text, assets, postman_options, body_options
+            )
+        finally:
+            profiler.disable()
+    wall_seconds = time.perf_counter() - start
+    profiler.create_stats()
+
+    if html_content is None:
+        html_content = markdown_to_html(data.decode("utf-8-sig")) # Fora do perfil: só para as estatísticas
+    stats = {
+        "input_kind": input_kind,
+        "input_bytes": len(data),
+        **document_stats(html_content),
+        "assets": len(assets or {}),
+        "page_count": converter.page_count,
+        "pdf_bytes": len(pdf_bytes),
+        "wall_seconds": round(wall_seconds, 6),
+        "timings": {stage: round(seconds, 6) for stage, seconds in converter.timings.items()},
+        "samples": sum(sampler.stacks.values()),
+        "sample_interval": interval,
+    }
+    return {
+        "pdf_bytes": pdf_bytes,
+        "page_count": converter.page_count,
+        "timings": converter.timings,
+        "pstats": marshal.dumps(profiler.stats),
+        "collapsed": sampler.collapsed(),
+        "stats": stats,
+    }
+
+
+def write_artifact(target, result: dict, include_pdf: bool = False):
+    """
+    Grava o resultado de `profile_conversion` em um ZIP (caminho ou arquivo binário).
+
+    Args:
+        target: Caminho do ZIP ou objeto de arquivo aberto para escrita.
+        result (dict): O retorno de `profile_conversion`.
+        include_pdf (bool): Inclui também o PDF gerado (`document.pdf`).
+    """
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("profile.pstats", result["pstats"])
+        archive.writestr("profile.collapsed", result["collapsed"])
+        archive.writestr("stats.json", json.dumps(result["stats"], indent=2, ensure_ascii=False))
+        if include_pdf:
+            archive.writestr("document.pdf", result["pdf_bytes"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.core.profiling",
+        description="Gera o perfil (cProfile + gráfico de chamas) da conversão de um arquivo Markdown ou coleção Postman."
+    )
+    parser.add_argument("input", help="Arquivo Markdown (.md, .markdown) ou coleção Postman (.json).")
+    parser.add_argument("-o", "--output", help="ZIP de saída. Padrão: <entrada>.profile.zip.")
+    parser.add_argument("--header", default="Documentação", help="Texto do cabeçalho do PDF.")
+    parser.add_argument("--interval", type=float, default=SAMPLE_INTERVAL, help="Intervalo entre as amostras de pilha (s).")
+    parser.add_argument("--all-examples", action="store_true", help="Inclui todos os exemplos de resposta (Postman).")
+    parser.add_argument("--no-pdf", action="store_true", help="Não inclui o PDF gerado no ZIP.")
+    args = parser.parse_args(argv)
+
+    if args.input.endswith((".md", ".markdown")):
+        input_kind = "markdown"
+    elif args.input.endswith(".json"):
+        input_kind = "postman"
+    else:
+        parser.error("a entrada deve ser um arquivo .md, .markdown ou .json")
+    with open(args.input, "rb") as f:
+        data = f.read()
+
+    result = profile_conversion(
+        input_kind, data, args.header,
+        postman_options={"all_examples": args.all_examples},
+        interval=args.interval
+    )
+    output = args.output or f"{args.input}.profile.zip"
+    write_artifact(output, result, include_pdf=not args.no_pdf)
+
+    stats = result["stats"]
+    print(f"{args.input}: {stats['page_count']} páginas em {stats['wall_seconds']:.2f}s ({stats['samples']} amostras)")
+    print(" ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in stats["timings"].items()))
+    print(f"Perfil gravado em {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+# Documento pequeno, mas com os elementos do tema (títulos, tabela, código, cabeçalho),
+# renderizado em cada worker na inicialização para carregar fontes e caches do Pango.
+WARMUP_DOCUMENT = """# Aquecimento
+
+Texto com **negrito**, *itálico* e `código`.
+
+| Campo | Valor |
+|---|---|
+| a | 1 |
+
+```json
+{"ok": true}
+```
+"""
+
+
+class RenderQueueFullError(Exception):
+    """
+    Levantada quando a fila de admissão de renderizações está cheia.
+    """
+    def __init__(self, retry_after: int):
+        super().__init__("Fila de renderização cheia. Tente novamente em instantes.")
+        self.retry_after = retry_after
+
+
+class RenderTimeoutError(Exception):
+    """
+    Levantada quando um job de renderização excede o tempo limite configurado.
+    """
+
+
+class RenderWorkerCrashedError(Exception):
+    """
+    Levantada quando um worker morre durante o job (ex.: teto de memória); o pool é recriado.
+    """
+
+
+def available_cpus() -> int:
+    """Número de CPUs que o processo pode usar (respeita a afinidade definida pelo contêiner)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def _limit_memory(memory_limit: int):
+    """
+    Limita o espaço de endereçamento do processo (RLIMIT_AS): uma renderização que
+    ultrapasse o teto falha com MemoryError em vez de crescer até o OOM killer do contêiner.
+    """
+    try:
+        import resource
+    except ImportError: # Windows
+        return
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def _warm_worker(warmed=None, memory_limit: Optional[int] = None, asset_settings: Optional[dict] = None):
+    """
+    Inicializador dos processos do pool: carrega a pilha de renderização
+    (markdown2 + WeasyPrint/Pango), interpreta o CSS base e renderiza um documento
+    pequeno, para que a descoberta de fontes não recaia sobre o primeiro job real.
+
+    Args:
+        warmed: Semáforo liberado ao fim do aquecimento, aguardado por `RenderExecutor.warm_up`.
+        memory_limit (int, optional): Teto de memória do worker, em bytes (ver `_limit_memory`).
+        asset_settings (dict, optional): Argumentos de `assets.configure` (resolução de imagens e
+                                         recursos remotos); sem eles, vale o padrão do WeasyPrint.
+    """
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    # Os workers não publicam métricas (os tempos voltam no resultado de cada job); sem a
+    # variável, um import acidental do prometheus_client não cria arquivos por processo.
+    os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    if memory_limit:
+        _limit_memory(memory_limit)
+    if asset_settings:
+        from src.core import assets
+
+        assets.configure(**asset_settings)
+    start = time.perf_counter()
+    render_markdown(WARMUP_DOCUMENT, "Aquecimento")
+    logging.getLogger(__name__).info(
+        "Worker de renderização %d aquecido em %.2fs.", os.getpid(), time.perf_counter() - start
+    )
+    if warmed is not None:
+        warmed.release()
+
+
+def _worker_ping() -> int:
+    return os.getpid()
+
+
+def _raise_timeout(signum, frame):
+    raise RenderTimeoutError("Tempo limite de renderização excedido.")
+
+
+def _run_with_deadline(timeout: Optional[float], fn, *args):
+    """
+    Executa `fn` dentro do processo worker, interrompendo-o via SIGALRM se
+    ultrapassar `timeout` segundos. Assim o worker é liberado para o próximo job
+    em vez de continuar ocupado com uma renderização já abandonada.
+    """
+    use_alarm = bool(timeout) and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+
+
+def render_markdown(md_content: str, header_text: str, chunk_links: bool = False, assets: Optional[dict] = None) -> dict:
+    """
+    Job executado nos workers: converte Markdown em PDF inteiramente em memória,
+    usando as folhas de estilo já interpretadas no processo.
+
+    Args:
+        md_content (str): O Markdown (ou um trecho dele, ver `chunking.split_markdown`).
+        header_text (str): O texto do cabeçalho.
+        chunk_links (bool): Preserva links para âncoras de outros trechos (ver `MarkdownToPDFConverter`).
+        assets (dict, optional): Arquivos enviados junto com o documento (caminho relativo -> SHA-256).
+
+    Returns:
+        dict: `pdf_bytes`, `page_count` e `timings` (duração de cada etapa), para que
+              as métricas sejam publicadas pelo processo da API.
+    """
+    from src.core.converter import MarkdownToPDFConverter # WeasyPrint só é importado nos workers
+
+    converter = MarkdownToPDFConverter(
+        md_content=md_content, header_text=header_text, chunk_links=chunk_links, assets=assets
+    )
+    pdf_bytes = converter.convert()
+    return {
+        "pdf_bytes": pdf_bytes,
+        "page_count": converter.page_count,
+        "timings": converter.timings,
+    }
+
+
+def render_html(html_content: str, header_text: str, chunk_links: bool = False, assets: Optional[dict] = None) -> dict:
+    """
+    Job executado nos workers: converte um fragmento HTML já gerado (ex.: coleções
+    Postman, ver `PostmanHtmlRenderer`) em PDF, sem a etapa do markdown2.
+
+    Args:
+        html_content (str): O HTML do documento (ou de um trecho dele).
+        header_text (str): O texto do cabeçalho.
+        chunk_links (bool): Preserva links para âncoras de outros trechos (ver `MarkdownToPDFConverter`).
+        assets (dict, optional): Arquivos enviados junto com o documento (caminho relativo -> SHA-256).
+
+    Returns:
+        dict: `pdf_bytes`, `page_count` e `timings`, como em `render_markdown`.
+    """
+    from src.core.converter import MarkdownToPDFConverter # WeasyPrint só é importado nos workers
+
+    converter = MarkdownToPDFConverter(
+        html_content=html_content, header_text=header_text, chunk_links=chunk_links, assets=assets
+    )
+    pdf_bytes = converter.convert()
+    return {
+        "pdf_bytes": pdf_bytes,
+        "page_count": converter.page_count,
+        "timings": converter.timings,
+    }
+
+
+class RenderExecutor:
+    """
+    Pool de processos com workers WeasyPrint pré-carregados, fila de admissão
+    limitada e tempo limite por job.
+
+    Para conter o crescimento de memória do WeasyPrint/Pango, os workers podem ser
+    substituídos após, em média, `max_tasks_per_child` jobs cada e ter um teto de memória
+    (`memory_limit`). Se um worker morrer (ex.: estouro do teto em código nativo), o pool
+    é recriado.
+
+    A substituição é feita pelo executor, e não pelo `max_tasks_per_child` do
+    `ProcessPoolExecutor`: no Python 3.11 o pool trava quando um worker se aposenta com
+    jobs na fila. Ao atingir o limite, um pool novo passa a receber os jobs e o anterior
+    termina os que já recebeu antes de encerrar seus processos.
+    """
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: int = 16,
+        timeout: Optional[float] = 120.0,
+        retry_after: int = 5,
+        max_tasks_per_child: Optional[int] = None,
+        memory_limit: Optional[int] = None,
+        asset_settings: Optional[dict] = None
+    ):
+        """
+        Inicializa o executor (o pool só é criado em `start`).
+
+        Args:
+            max_workers (int, optional): Número de processos de renderização.
+                                         Padrão: número de CPUs disponíveis.
+            max_queue (int): Jobs que podem aguardar além dos que estão em execução.
+            timeout (float, optional): Tempo limite por job, em segundos.
+            retry_after (int): Valor sugerido no cabeçalho Retry-After quando a fila está cheia.
+            max_tasks_per_child (int, optional): Jobs por worker, em média, antes de o pool ser
+                                                 substituído por processos novos. Padrão: sem limite.
+            memory_limit (int, optional): Teto de memória (espaço de endereçamento) de cada
+                                          worker, em bytes. Padrão: sem limite.
+            asset_settings (dict, optional): Argumentos de `assets.configure`, aplicados em cada worker.
+        """
+        self.max_workers = max_workers or available_cpus()
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self.memory_limit = memory_limit or None
+        self.asset_settings = asset_settings
+        self._pool = None
+        self._pool_jobs = 0 # Jobs submetidos ao pool atual
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._warmed = None
+        self.ready = False
+        self.warmup_seconds = None
+        self.warmup_error = None
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self):
+        """
+        Cria o pool de processos. O contexto "spawn" evita herdar o event loop
+        e as threads do servidor via fork.
+        """
+        if self._pool is None:
+            context = multiprocessing.get_context("spawn")
+            self._warmed = context.Semaphore(0)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=context,
+                initializer=_warm_worker,
+                initargs=(self._warmed, self.memory_limit, self.asset_settings)
+            )
+            self._pool_jobs = 0
+
+    def _pool_for_job(self) -> ProcessPoolExecutor:
+        """
+        Retorna o pool que recebe o próximo job, substituindo o atual quando ele já recebeu
+        `max_tasks_per_child` jobs por worker. Roda no event loop, sem pontos de espera.
+        """
+        if self._pool is None:
+            self.start()
+        if self.max_tasks_per_child and self._pool_jobs >= self.max_tasks_per_child * self.max_workers:
+            retired = self._pool
+            self._pool = None
+            self.start()
+            # Os processos novos iniciam (e aquecem) enquanto o pool anterior termina seus jobs.
+            for _ in range(self.max_workers):
+                self._pool.submit(_worker_ping)
+            retired.shutdown(wait=False)
+            logging.getLogger(__name__).info("Pool de renderização substituído após %d jobs.", self._pool_jobs)
+        self._pool_jobs += 1
+        return self._pool
+
+    def _wait_warmed(self, timeout: float):
+        deadline = time.monotonic() + timeout
+        for _ in range(self.max_workers):
+            remaining = max(0.0, deadline - time.monotonic())
+            if not self._warmed.acquire(timeout=remaining):
+                raise RenderTimeoutError("Tempo limite excedido no aquecimento dos workers de renderização.")
+
+    async def warm_up(self, timeout: float = 120.0) -> float:
+        """
+        Cria todos os workers de uma vez e aguarda que cada um termine o aquecimento
+        (`_warm_worker`). Até lá, `ready` permanece falso.
+
+        Args:
+            timeout (float): Tempo máximo de espera pelo aquecimento, em segundos.
+
+        Returns:
+            float: Duração do aquecimento, em segundos.
+        """
+        if self._pool is None:
+            self.start()
+        start = time.perf_counter()
+        try:
+            # Sem workers ociosos, cada submissão inicia um novo processo (contexto spawn).
+            # Se um worker falhar ao iniciar, o pool quebra e os pings falham antes do tempo limite.
+            pings = [asyncio.wrap_future(self._pool.submit(_worker_ping)) for _ in range(self.max_workers)]
+            await asyncio.gather(asyncio.to_thread(self._wait_warmed, timeout), *pings)
+        except Exception as e:
+            self.warmup_error = str(e) or type(e).__name__
+            raise
+        self.warmup_seconds = time.perf_counter() - start
+        self.ready = True
+        return self.warmup_seconds
+
+    def shutdown(self):
+        """
+        Encerra o pool, cancelando os jobs que ainda não começaram.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            self._warmed = None
+            self.ready = False
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def _replace_broken_pool(self, pool: ProcessPoolExecutor):
+        """Descarta um pool quebrado pela morte de um worker e cria outro no lugar."""
+        with self._lock:
+            if self._pool is not pool:
+                return # Outro job já recriou o pool
+            self._pool = None
+        logging.getLogger(__name__).error("Worker de renderização morreu; recriando o pool.")
+        pool.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+    async def run(self, fn, *args):
+        """
+        Submete `fn(*args)` ao pool e aguarda o resultado sem bloquear o event loop.
+
+        Raises:
+            RenderQueueFullError: Se a fila de admissão estiver cheia.
+            RenderTimeoutError: Se o job exceder o tempo limite.
+            RenderWorkerCrashedError: Se o worker morrer durante o job.
+        """
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise RenderQueueFullError(self.retry_after)
+            self._pending += 1
+
+        pool = self._pool_for_job()
+        try:
+            future = pool.submit(_run_with_deadline, self.timeout, fn, *args)
+        except BrokenProcessPool:
+            self._release(None)
+            self._replace_broken_pool(pool)
+            raise RenderWorkerCrashedError("Worker de renderização indisponível. Tente novamente.")
+        except Exception:
+            self._release(None)
+            raise
+        # A vaga só é liberada quando o job termina de fato no worker,
+        # mesmo que o cliente já tenha desistido de esperar.
+        future.add_done_callback(self._release)
+
+        # Margem para o worker interromper o job por conta própria antes do event loop desistir.
+        wait_timeout = self.timeout + 5 if self.timeout else None
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), wait_timeout)
+        except asyncio.TimeoutError:
+            raise RenderTimeoutError("Tempo limite de renderização excedido.")
+        except BrokenProcessPool:
+            self._replace_broken_pool(pool)
+            raise RenderWorkerCrashedError(
+                "O worker de renderização foi encerrado durante a conversão (possivelmente por falta de memória)."
+            )
@@ -0,0 +1,219 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import Iterable, Optional
+
+# Bibliotecas cuja versão altera o PDF gerado e, portanto, invalida o cache.
+_VERSIONED_LIBRARIES = ("markdown2", "weasyprint")
+
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+
+@lru_cache(maxsize=1)
+def _library_versions() -> str:
+    versions = []
+    for name in _VERSIONED_LIBRARIES:
+        try:
+            versions.append(f"{name}={metadata.version(name)}")
+        except metadata.PackageNotFoundError:
+            versions.append(f"{name}=unknown")
+    return ";".join(versions)
+
+
+def _normalized_chunks(chunks: Iterable[bytes]):
+    """
+    Normaliza a entrada para o cálculo da chave: remove o BOM UTF-8 e converte
+    quebras de linha CRLF em LF, inclusive quando o CRLF cai entre dois blocos.
+
+    A renderização precisa enxergar a mesma entrada: o Markdown é decodificado com
+    "utf-8-sig" e o parser das coleções descarta o BOM (o markdown2 já trata CRLF como LF).
+    """
+    first = True
+    pending_cr = b""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if first:
+            if chunk.startswith(_UTF8_BOM):
+                chunk = chunk[len(_UTF8_BOM):]
+            first = False
+        chunk = pending_cr + chunk
+        pending_cr = b""
+        if chunk.endswith(b"\r"):
+            chunk, pending_cr = chunk[:-1], b"\r"
+        yield chunk.replace(b"\r\n", b"\n")
+    if pending_cr:
+        yield pending_cr
+
+
+def iter_file_chunks(fileobj, chunk_size: int = 1024 * 1024):
+    """
+    Lê um arquivo binário em blocos e volta o cursor para o início ao final,
+    para que o mesmo upload possa ser lido novamente pela conversão.
+    """
+    fileobj.seek(0)
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+    fileobj.seek(0)
+
+
+class PDFResultCache:
+    """
+    Cache em disco, endereçado por conteúdo, dos PDFs já gerados.
+
+    A chave é o SHA-256 da entrada normalizada, do texto do cabeçalho, do CSS final
+    e das versões de markdown2/WeasyPrint. As entradas são removidas por LRU quando
+    o total armazenado ultrapassa `max_bytes`.
+
+    O diretório pode ser compartilhado por vários processos (workers do servidor): os
+    arquivos são gravados de forma atômica, PDFs gravados por outro processo são
+    encontrados em `get` e `refresh` reconcilia o índice local com o disco.
+    """
+    def __init__(self, directory: Path, max_bytes: int):
+        """
+        Inicializa o cache, reconstruindo o índice a partir dos arquivos já existentes.
+
+        Args:
+            directory (Path): Diretório onde os PDFs em cache são armazenados.
+            max_bytes (int): Tamanho máximo total do cache, em bytes.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes_stored = 0
+        self._load_index()
+
+    def _load_index(self):
+        self._entries.clear()
+        self._bytes_stored = 0
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".pdf"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue # Removido por outro processo durante a listagem
+                files.append((stat.st_mtime, entry.name[:-len(".pdf")], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._bytes_stored += size
+
+    def _path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.pdf"
+
+    @staticmethod
+    def make_key(kind: str, input_chunks: Iterable[bytes], header_text: str, css: str) -> str:
+        """
+        Calcula a chave de cache de uma conversão.
+
+        Args:
+            kind (str): Tipo da entrada ("markdown" ou "postman").
+            input_chunks (Iterable[bytes]): Conteúdo da entrada, em blocos.
+            header_text (str): Texto do cabeçalho do PDF.
+            css (str): CSS final aplicado ao documento.
+
+        Returns:
+            str: O digest hexadecimal que identifica o resultado.
+        """
+        digest = hashlib.sha256()
+        for part in (kind, header_text, css, _library_versions()):
+            encoded = part.encode("utf-8")
+            digest.update(len(encoded).to_bytes(8, "big"))
+            digest.update(encoded)
+        for chunk in _normalized_chunks(input_chunks):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        Retorna o caminho do PDF em cache para `key`, ou None se não existir.
+        """
+        with self._lock:
+            path = self._path_for(key)
+            try:
+                os.utime(path) # Mantém a ordem LRU ao reconstruir o índice
+                size = path.stat().st_size
+            except FileNotFoundError:
+                # Ausente, ou removido por outro processo.
+                if key in self._entries:
+                    self._bytes_stored -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            if key not in self._entries: # Gravado por outro processo
+                self._entries[key] = size
+                self._bytes_stored += size
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return path
+
+    def put(self, key: str, pdf_bytes: bytes) -> Path:
+        """
+        Grava o PDF gerado no cache (escrita atômica) e aplica a política de remoção LRU.
+
+        Returns:
+            Path: O caminho do PDF dentro do cache.
+        """
+        target = self._path_for(key)
+        temp_path = self.directory / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(pdf_bytes)
+        with self._lock:
+            os.replace(temp_path, target)
+            size = len(pdf_bytes)
+            if key in self._entries:
+                self._bytes_stored -= self._entries.pop(key)
+            self._entries[key] = size
+            self._bytes_stored += size
+            self._evict(keep=key)
+            return target
+
+    def _evict(self, keep: str):
+        while self._bytes_stored > self.max_bytes and len(self._entries) > 1:
+            key, size = next(iter(self._entries.items()))
+            if key == keep:
+                break
+            del self._entries[key]
+            self._bytes_stored -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path_for(key))
+            except FileNotFoundError:
+                pass
+
+    def refresh(self):
+        """
+        Reconstrói o índice a partir do disco e reaplica a cota: com vários processos,
+        cada um só conhece as gravações e remoções feitas pelos demais ao reconciliar.
+        """
+        with self._lock:
+            self._load_index()
+            if self._entries:
+                self._evict(keep=next(reversed(self._entries)))
+
+    def stats(self) -> dict:
+        """
+        Retorna as métricas do cache para monitoramento.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes_stored": self._bytes_stored,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,127 @@
+import fnmatch
+import logging
+import os
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class ScratchSpace:
+    """
+    Gerencia o diretório temporário do serviço: mede o uso de disco e remove arquivos
+    antigos ou excedentes, para que o serviço rode indefinidamente sem intervenção.
+    """
+    def __init__(self, directory: Path, max_age: float, max_bytes: int,
+                 exclude_dirs: tuple = (), protected_patterns: tuple = ()):
+        """
+        Inicializa o gerenciador.
+
+        Args:
+            directory (Path): Diretório temporário (TEMP_DIR).
+            max_age (float): Idade máxima de um arquivo, em segundos.
+            max_bytes (int): Cota total para os arquivos gerenciados, em bytes.
+            exclude_dirs (tuple): Subdiretórios com política própria de remoção (ex.: o cache
+                                  de resultados); entram no relatório de uso, mas não na limpeza.
+            protected_patterns (tuple): Padrões de nome (fnmatch) que nunca são removidos.
+        """
+        self.directory = Path(directory)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.exclude_dirs = {Path(d).resolve() for d in exclude_dirs}
+        self.protected_patterns = protected_patterns
+        self.removed_files = 0
+        self.removed_bytes = 0
+        self.last_sweep = None
+
+    def _iter_files(self):
+        """Gera (caminho, stat) de todos os arquivos, sem seguir links simbólicos."""
+        stack = [self.directory]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        yield Path(entry.path), entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+
+    def _is_managed(self, path: Path) -> bool:
+        if any(fnmatch.fnmatch(path.name, pattern) for pattern in self.protected_patterns):
+            return False
+        resolved = path.resolve()
+        return not any(excluded in resolved.parents for excluded in self.exclude_dirs)
+
+    def usage(self) -> dict:
+        """
+        Retorna o uso atual de disco, total e por subdiretório de primeiro nível.
+        """
+        total_files, total_bytes, by_dir = 0, 0, {}
+        for path, stat in self._iter_files():
+            relative = path.relative_to(self.directory)
+            top = relative.parts[0] if len(relative.parts) > 1 else "."
+            bucket = by_dir.setdefault(top, {"files": 0, "bytes": 0})
+            bucket["files"] += 1
+            bucket["bytes"] += stat.st_size
+            total_files += 1
+            total_bytes += stat.st_size
+        return {
+            "files": total_files,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "max_age_seconds": self.max_age,
+            "directories": by_dir,
+            "removed_files": self.removed_files,
+            "removed_bytes": self.removed_bytes,
+            "last_sweep": self.last_sweep,
+        }
+
+    def _remove(self, path: Path, size: int) -> bool:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        self.removed_files += 1
+        self.removed_bytes += size
+        return True
+
+    def sweep(self) -> dict:
+        """
+        Remove os arquivos gerenciados mais antigos que `max_age` e, se o total ainda
+        exceder `max_bytes`, remove os mais antigos até voltar à cota.
+
+        Returns:
+            dict: Quantidade de arquivos e bytes removidos nesta passada.
+        """
+        now = time.time()
+        removed_files, removed_bytes = 0, 0
+        managed = []
+        for path, stat in self._iter_files():
+            if not self._is_managed(path):
+                continue
+            if now - stat.st_mtime > self.max_age:
+                if self._remove(path, stat.st_size):
+                    removed_files += 1
+                    removed_bytes += stat.st_size
+            else:
+                managed.append((stat.st_mtime, path, stat.st_size))
+
+        total = sum(size for _, _, size in managed)
+        for _, path, size in sorted(managed):
+            if total <= self.max_bytes:
+                break
+            if self._remove(path, size):
+                removed_files += 1
+                removed_bytes += size
+            total -= size
+
+        self.last_sweep = now
+        if removed_files:
+            logger.info("Limpeza do diretório temporário: %d arquivos, %d bytes removidos.",
+                        removed_files, removed_bytes)
+        return {"removed_files": removed_files, "removed_bytes": removed_bytes}
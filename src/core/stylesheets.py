@@ -0,0 +1,38 @@
+from functools import lru_cache
+
+from weasyprint import CSS
+
+from src.core.styles import get_base_css, get_header_css
+
+# Quantidade de cabeçalhos distintos mantidos já interpretados em cada worker.
+HEADER_STYLESHEET_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=1)
+def get_base_stylesheet() -> CSS:
+    """
+    Retorna as regras estáticas de `styles.py` interpretadas pelo WeasyPrint.
+    O parse acontece uma única vez por processo.
+    """
+    return CSS(string=get_base_css())
+
+
+@lru_cache(maxsize=HEADER_STYLESHEET_CACHE_SIZE)
+def get_header_stylesheet(header_text: str) -> CSS:
+    """
+    Retorna a pequena regra @page com o cabeçalho, em cache LRU por texto do cabeçalho.
+    """
+    return CSS(string=get_header_css(header_text))
+
+
+def get_stylesheets(header_text: str) -> list:
+    """
+    Retorna a lista de folhas de estilo prontas para `HTML.write_pdf`.
+
+    Args:
+        header_text (str): O texto a ser exibido no cabeçalho superior central do PDF.
+
+    Returns:
+        list: As folhas de estilo base e do cabeçalho, já interpretadas.
+    """
+    return [get_base_stylesheet(), get_header_stylesheet(header_text)]
@@ -0,0 +1,18 @@
+import time
+from contextlib import contextmanager
+
+
+@contextmanager
+def timed_stage(timings: dict, stage: str):
+    """
+    Mede a duração de uma etapa e a acumula em `timings[stage]` (segundos).
+
+    O dicionário é serializável, então etapas medidas nos workers de renderização
+    voltam ao processo da API junto com o resultado do job. Este módulo não importa o
+    prometheus_client: os workers medem as etapas sem criar métricas próprias.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
@@ -0,0 +1,45 @@
+"""
+Ponto de entrada do servidor: `python -m src.serve`.
+
+Inicia o uvicorn com WEB_CONCURRENCY processos. Cada processo tem seu próprio pool de
+renderização (ver RENDER_WORKERS em `src/api/main.py`) e todos compartilham o TEMP_DIR:
+cache de resultados, banco de jobs e arquivos temporários. Com mais de um processo,
+as métricas do Prometheus são agregadas via PROMETHEUS_MULTIPROC_DIR.
+"""
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import uvicorn
+
+
+def _prepare_metrics_dir() -> Path:
+    """
+    Define (se ainda não definido) e esvazia o diretório das métricas multiprocesso.
+    Precisa acontecer antes de os processos do servidor importarem o prometheus_client.
+    """
+    directory = Path(os.environ.setdefault(
+        "PROMETHEUS_MULTIPROC_DIR", str(Path(tempfile.gettempdir()) / "pdf-api-metrics")
+    ))
+    shutil.rmtree(directory, ignore_errors=True) # Valores de uma execução anterior
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def main():
+    workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    if workers > 1:
+        _prepare_metrics_dir()
+    uvicorn.run(
+        "src.api.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=workers,
+        # Renderizações em andamento têm até RENDER_TIMEOUT segundos para terminar.
+        timeout_graceful_shutdown=int(float(os.getenv("RENDER_TIMEOUT", "120"))) + 5
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ const jsonFileInput = document.getElementById('postman_json_file');
 const jsonFileNameSpan = document.getElementById('json-file-name');
 
 const uploadForm = document.getElementById('uploadForm');
+const previewButton = document.getElementById('previewButton');
 const messageBox = document.getElementById('messageBox');
 const loadingOverlay = document.getElementById('loading-overlay');
 
@@ -98,8 +99,6 @@ function updateJsonFileName() {
 }
 
 uploadForm.addEventListener('submit', async (e) => {
-    e.preventDefault();
-
     messageBox.style.display = 'none';
     messageBox.classList.remove('success', 'error');
 
@@ -107,14 +106,23 @@ uploadForm.addEventListener('submit', async (e) => {
     const hasJsonFile = jsonFileInput.files.length > 0;
 
     if (!hasMarkdownFile && !hasJsonFile) {
+        e.preventDefault();
         showMessage('Por favor, selecione ou arraste um arquivo Markdown ou um arquivo JSON da Coleção Postman.', 'error');
         return;
     }
     if (hasMarkdownFile && hasJsonFile) {
+        e.preventDefault();
         showMessage('Por favor, escolha APENAS UMA opção: upload de arquivo Markdown OU arquivo JSON da Coleção Postman.', 'error');
         return;
     }
 
+    // Pré-visualização: envio normal do formulário para /preview em uma nova aba,
+    // que exibe o HTML à medida que ele chega.
+    if (e.submitter === previewButton) {
+        return;
+    }
+
+    e.preventDefault();
     showLoading();
 
     const formData = new FormData(uploadForm);
@@ -0,0 +1,97 @@
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.core.render_executor import RenderExecutor
+
+
+def fake_pdf(text: str = "", pages: int = 1) -> bytes:
+    """PDF em branco com `text` no campo Subject, para identificar o que foi renderizado."""
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    writer.add_metadata({"/Subject": text})
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def pdf_subject(pdf_bytes: bytes) -> str:
+    from pypdf import PdfReader
+
+    return PdfReader(io.BytesIO(pdf_bytes)).metadata.subject
+
+
+def pdf_page_count(pdf_bytes: bytes) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+
+
+def fake_render(content: str, header_text: str, chunk_links: bool = False, assets: dict = None) -> dict:
+    """Substitui `render_markdown`/`render_html`: um PDF de uma página com o documento recebido."""
+    return {"pdf_bytes": fake_pdf(content), "page_count": 1, "timings": {"render": 0.0}}
+
+
+class InlineRenderExecutor(RenderExecutor):
+    """
+    `RenderExecutor` com threads no lugar dos processos: admissão, fila e tradução de
+    erros são as mesmas, sem carregar o WeasyPrint nos testes.
+    """
+    def start(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.max_workers)
+            self._pool_jobs = 0
+
+    async def warm_up(self, timeout: float = 120.0) -> float:
+        self.start()
+        self.warmup_seconds = 0.0
+        self.ready = True
+        return self.warmup_seconds
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """
+    Cliente da API com diretórios temporários próprios e renderização falsa
+    (`fake_render`), executada em threads.
+    """
+    from fastapi.testclient import TestClient
+
+    from src.api import main
+    from src.core.assets import AssetStore
+    from src.core.jobs import JobStore
+    from src.core.result_cache import PDFResultCache
+    from src.core.scratch import ScratchSpace
+
+    result_cache = PDFResultCache(tmp_path / "cache", max_bytes=main.CACHE_MAX_BYTES)
+    asset_store = AssetStore(tmp_path / "assets", max_bytes=main.ASSETS_CACHE_MAX_BYTES)
+    jobs_dir = tmp_path / "jobs"
+    jobs_dir.mkdir()
+    profiles_dir = tmp_path / "profiles"
+    profiles_dir.mkdir()
+    job_store = JobStore(jobs_dir / "jobs.sqlite3")
+
+    monkeypatch.setattr(main, "TEMP_DIR", tmp_path)
+    monkeypatch.setattr(main, "JOBS_DIR", jobs_dir)
+    monkeypatch.setattr(main, "PROFILES_DIR", profiles_dir)
+    monkeypatch.setattr(main, "result_cache", result_cache)
+    monkeypatch.setattr(main, "asset_store", asset_store)
+    monkeypatch.setattr(main, "job_store", job_store)
+    monkeypatch.setattr(main, "job_semaphore", asyncio.Semaphore(main.JOBS_CONCURRENCY))
+    monkeypatch.setattr(main, "scratch_space", ScratchSpace(
+        tmp_path, max_age=main.TEMP_MAX_AGE, max_bytes=main.TEMP_MAX_BYTES,
+        exclude_dirs=(result_cache.directory, asset_store.directory),
+        protected_patterns=("jobs.sqlite3*", "*.input")
+    ))
+    monkeypatch.setattr(main, "render_executor", InlineRenderExecutor(max_workers=2, max_queue=2, timeout=None))
+    monkeypatch.setattr(main, "render_markdown", fake_render)
+    monkeypatch.setattr(main, "render_html", fake_render)
+
+    with TestClient(main.app) as client:
+        yield client
+    job_store.close()
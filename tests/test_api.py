@@ -0,0 +1,354 @@
+import asyncio
+import io
+import json
+import os
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from src.api import main
+from src.core.render_executor import RenderTimeoutError
+from tests.conftest import fake_pdf, fake_render, pdf_page_count, pdf_subject
+
+
+def _convert_markdown(client, content: bytes, **data):
+    return client.post("/convert/", files={"markdown_file": ("doc.md", content)}, data=data)
+
+
+class TestRenderPool:
+    def test_converts_markdown_in_the_pool(self, api):
+        response = _convert_markdown(api, "# Título\n\nTexto.\n".encode("utf-8"), header_text="Cabeçalho")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert pdf_subject(response.content) == "# Título\n\nTexto.\n"
+        assert main.render_executor.pending == 0
+
+    def test_full_queue_returns_503_with_retry_after(self, api, monkeypatch):
+        monkeypatch.setattr(main.render_executor, "_pending", main.render_executor.capacity)
+        response = _convert_markdown(api, b"# Fila cheia\n")
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == str(main.render_executor.retry_after)
+
+    def test_render_timeout_returns_504(self, api, monkeypatch):
+        def slow_render(*args):
+            raise RenderTimeoutError("Tempo limite de renderização excedido.")
+
+        monkeypatch.setattr(main, "render_markdown", slow_render)
+        response = _convert_markdown(api, b"# Lento\n")
+
+        assert response.status_code == 504
+        assert main.render_executor.pending == 0
+
+
+class TestResultCache:
+    def test_second_request_is_served_from_cache(self, api, monkeypatch):
+        first = _convert_markdown(api, b"# Cache\n")
+        monkeypatch.setattr(main, "render_markdown", None) # Uma nova renderização falharia
+
+        second = _convert_markdown(api, b"# Cache\n")
+        assert second.status_code == 200
+        assert second.headers["etag"] == first.headers["etag"]
+        assert second.content == first.content
+        assert _convert_markdown(api, b"# Cache\n", header_text="Outro").status_code == 500
+
+    def test_if_none_match_returns_304(self, api):
+        etag = _convert_markdown(api, b"# ETag\n").headers["etag"]
+        response = api.post(
+            "/convert/", files={"markdown_file": ("doc.md", b"# ETag\n")}, headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+
+    def test_bom_and_crlf_variants_render_what_the_key_sees(self, api):
+        variant = _convert_markdown(api, "﻿# Título\r\n\r\nTexto.\r\n".encode("utf-8"))
+        assert pdf_subject(variant.content) == "# Título\r\n\r\nTexto.\r\n"
+
+        plain = _convert_markdown(api, "# Título\n\nTexto.\n".encode("utf-8"))
+        assert plain.headers["etag"] == variant.headers["etag"]
+
+    def test_postman_collection_with_bom(self, api):
+        collection = b'{"info": {"name": "API"}, "item": [{"name": "Status", "request": {"method": "GET", "url": {"raw": "x"}}}]}'
+        response = api.post("/convert/", files={"postman_json_file": ("api.json", b"\xef\xbb\xbf" + collection)})
+
+        assert response.status_code == 200
+        assert "Status" in pdf_subject(response.content)
+
+    def test_cache_hit_survives_eviction_during_the_response(self, api, tmp_path, monkeypatch):
+        first = _convert_markdown(api, b"# Fixado\n")
+        cached = main.result_cache.get(first.headers["etag"].strip('"'))
+        sent = []
+
+        def evict_then_send(pdf_path, *args, **kwargs):
+            # O arquivo enviado não é o do cache: removê-lo do cache não afeta a resposta.
+            assert pdf_path != str(cached)
+            cached.unlink()
+            sent.append(pdf_path)
+            return original(pdf_path, *args, **kwargs)
+
+        original = main.FileResponse
+        monkeypatch.setattr(main, "FileResponse", lambda path, **kwargs: evict_then_send(path, **kwargs))
+        second = _convert_markdown(api, b"# Fixado\n")
+
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert not Path(sent[0]).exists() # Removido ao fim da resposta
+        assert not list(tmp_path.glob("response_*.pdf"))
+
+
+def _batch(client, files: list, **data):
+    return client.post(
+        "/convert/batch", files=[("files", (name, content)) for name, content in files], data=data
+    )
+
+
+class TestBatch:
+    def test_zip_contains_one_pdf_per_file_and_a_report(self, api):
+        response = _batch(api, [
+            ("a.md", b"# A\n"),
+            ("b.md", b"# B\n"),
+            ("b.md", b"# Outro B\n"),
+            ("notas.txt", b"texto"),
+            ("quebrado.json", b"{nada"),
+        ])
+
+        assert response.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            names = set(archive.namelist())
+            report = json.loads(archive.read("relatorio.json"))
+            assert names == {"a.pdf", "b.pdf", "b_2.pdf", "relatorio.json"}
+            assert {pdf_subject(archive.read(name)) for name in ("b.pdf", "b_2.pdf")} == {"# B\n", "# Outro B\n"}
+        assert report["total"] == 5
+        assert report["converted"] == 3
+        assert report["failed"] == 2
+        errors = {item["filename"]: item["error"] for item in report["files"] if item["status"] == "error"}
+        assert "Extensão não suportada" in errors["notas.txt"]
+        assert "inválido" in errors["quebrado.json"]
+
+    def test_zip_reuses_cached_pdfs(self, api, monkeypatch):
+        _convert_markdown(api, b"# Em cache\n")
+        monkeypatch.setattr(main, "render_markdown", None)
+        response = _batch(api, [("doc.md", b"# Em cache\n")])
+
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert pdf_subject(archive.read("doc.pdf")) == "# Em cache\n"
+
+    def test_documents_are_read_only_while_rendering(self, api, monkeypatch):
+        live, peak = [0], [0]
+        read_document, render = main._read_document, main.render_markdown
+
+        async def tracked_read(*args):
+            document = await read_document(*args)
+            live[0] += 1
+            peak[0] = max(peak[0], live[0])
+            return document
+
+        def tracked_render(*args):
+            live[0] -= 1
+            return render(*args)
+
+        monkeypatch.setattr(main, "_read_document", tracked_read)
+        monkeypatch.setattr(main, "render_markdown", tracked_render)
+        response = _batch(api, [(f"doc{i}.md", f"# Documento {i}\n".encode()) for i in range(8)])
+
+        assert json.loads(zipfile.ZipFile(io.BytesIO(response.content)).read("relatorio.json"))["converted"] == 8
+        assert peak[0] <= main.render_executor.max_workers
+
+    def test_work_dir_is_removed(self, api, tmp_path):
+        _batch(api, [("a.md", b"# A\n"), ("b.json", b"{")])
+        _batch(api, [("a.md", b"# A\n")], output_format="merged")
+
+        assert not list(tmp_path.glob("batch_*"))
+
+    def test_merged_pdf_lists_failures(self, api, monkeypatch):
+        merged = {}
+
+        def fake_merge(documents, failures, header_text):
+            merged.update(documents=[title for title, _ in documents], failures=failures, header_text=header_text)
+            return fake_pdf("mesclado", pages=len(documents) + 1)
+
+        monkeypatch.setattr(main, "merge_pdfs_with_toc", fake_merge)
+        response = _batch(
+            api, [("a.md", b"# A\n"), ("b.md", b"# B\n"), ("c.yaml", b"x: 1")],
+            output_format="merged", header_text="Lote"
+        )
+
+        assert response.status_code == 200
+        assert response.headers["x-batch-failed"] == "1"
+        assert pdf_page_count(response.content) == 3
+        assert merged["documents"] == ["a", "b"]
+        assert [filename for filename, _ in merged["failures"]] == ["c.yaml"]
+        assert merged["header_text"] == "Lote"
+
+    def test_merged_without_any_document_returns_422(self, api):
+        response = _batch(api, [("c.yaml", b"x: 1")], output_format="merged")
+
+        assert response.status_code == 422
+        assert response.json()["detail"]["failed"] == 1
+
+    def test_rejects_unknown_format_and_too_many_files(self, api, monkeypatch):
+        assert _batch(api, [("a.md", b"# A\n")], output_format="tar").status_code == 400
+        monkeypatch.setattr(main, "BATCH_MAX_FILES", 1)
+        assert _batch(api, [("a.md", b"# A\n"), ("b.md", b"# B\n")]).status_code == 400
+
+
+def _wait_for_job(client, status_url: str, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(status_url).json()
+        if job["status"] in ("done", "failed") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def fast_job_sweep(monkeypatch):
+    monkeypatch.setattr(main, "JOBS_SWEEP_INTERVAL", 0.05)
+    monkeypatch.setattr(main, "JOBS_TTL", 0)
+
+
+class TestJobs:
+    def test_job_lifecycle(self, api):
+        response = api.post("/jobs", files={"markdown_file": ("doc.md", b"# Job\n")}, data={"header_text": "H"})
+
+        assert response.status_code == 202
+        created = response.json()
+        assert created["status"] == "queued"
+        job = _wait_for_job(api, created["status_url"])
+        assert job["status"] == "done"
+        assert job["render_seconds"] is not None
+
+        result = api.get(created["result_url"])
+        assert result.status_code == 200
+        assert pdf_subject(result.content) == "# Job\n"
+        assert 'filename="doc.pdf"' in result.headers["content-disposition"]
+        assert not list(main.JOBS_DIR.glob("*.input"))
+
+    def test_failed_job(self, api):
+        created = api.post("/jobs", files={"postman_json_file": ("api.json", b"{quebrado")}).json()
+        job = _wait_for_job(api, created["status_url"])
+
+        assert job["status"] == "failed"
+        assert "inválido" in job["error"]
+        assert api.get(created["result_url"]).status_code == 409
+
+    def test_unknown_job(self, api):
+        assert api.get("/jobs/nada").status_code == 404
+        assert api.get("/jobs/nada/result").status_code == 404
+
+    def test_removed_result_returns_410(self, api):
+        created = api.post("/jobs", files={"markdown_file": ("doc.md", b"# Removido\n")}).json()
+        _wait_for_job(api, created["status_url"])
+        os.remove(main.job_store.get(created["id"])["result_path"])
+
+        assert api.get(created["result_url"]).status_code == 410
+
+    def test_expired_jobs_are_swept(self, fast_job_sweep, api):
+        created = api.post("/jobs", files={"markdown_file": ("doc.md", b"# Expira\n")}).json()
+        result_path = main.JOBS_DIR / f"{created['id']}.pdf"
+        deadline = time.monotonic() + 5
+        while api.get(created["status_url"]).status_code != 404 and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        assert api.get(created["status_url"]).status_code == 404
+        assert not result_path.exists()
+
+    def test_markdown_is_read_off_the_event_loop(self):
+        readers = []
+
+        class Upload(io.BytesIO):
+            def read(self, *args):
+                readers.append(threading.current_thread())
+                return super().read(*args)
+
+        document = asyncio.run(main._read_document(Upload("﻿# Título\n".encode("utf-8")), "markdown"))
+
+        assert document == ("markdown", "# Título\n")
+        assert readers and threading.main_thread() not in readers
+
+
+class TestTempUsage:
+    def test_reports_usage_and_quotas(self, api, tmp_path):
+        (tmp_path / "sobra.pdf").write_bytes(b"x" * 7)
+        usage = api.get("/temp/usage").json()
+
+        assert usage["max_bytes"] == main.TEMP_MAX_BYTES
+        assert usage["max_age_seconds"] == main.TEMP_MAX_AGE
+        assert usage["directories"]["."]["bytes"] >= 7
+
+
+class TestIncrementalPostman:
+    def _collection(self, *folders) -> bytes:
+        items = [
+            {"name": name, "item": [{"name": f"{name} {i}", "request": {"method": "GET", "url": {"raw": "x"}}}
+                                    for i in range(size)]}
+            for name, size in folders
+        ]
+        return json.dumps({"info": {"name": "API"}, "item": items}).encode("utf-8")
+
+    def _convert(self, client, collection: bytes):
+        return client.post(
+            "/convert/", files={"postman_json_file": ("api.json", collection)}, data={"incremental": "true"}
+        )
+
+    def test_reuses_unchanged_folders(self, api, monkeypatch, tmp_path):
+        rendered = []
+
+        def counting_render(content, *args):
+            rendered.append(content)
+            return fake_render(content, *args)
+
+        monkeypatch.setattr(main, "render_html", counting_render)
+        first = self._convert(api, self._collection(("Usuários", 2), ("Pedidos", 1)))
+        assert first.status_code == 200
+        assert pdf_page_count(first.content) == 3 # Cabeçalho e uma página por pasta
+        assert len(rendered) == 3
+
+        rendered.clear()
+        second = self._convert(api, self._collection(("Usuários", 2), ("Pedidos", 2)))
+        assert second.status_code == 200
+        assert pdf_page_count(second.content) == 3
+        assert len(rendered) == 1
+        assert "Pedidos 1" in rendered[0]
+        assert not list(tmp_path.glob("fragments_*"))
+
+    def test_reused_fragments_survive_cache_eviction(self, api, monkeypatch):
+        assert self._convert(api, self._collection(("A", 1), ("B", 1))).status_code == 200
+        # Daqui em diante, cada gravação no cache remove todas as entradas anteriores.
+        monkeypatch.setattr(main.result_cache, "max_bytes", 1)
+        response = self._convert(api, self._collection(("A", 1), ("B", 1), ("C", 1)))
+
+        assert response.status_code == 200
+        assert pdf_page_count(response.content) == 4
+        assert main.result_cache.stats()["evictions"] > 0
+
+
+class TestChunkedRendering:
+    def test_large_markdown_is_rendered_in_chunks(self, api, monkeypatch):
+        chunks = []
+
+        def recording_render(content, header_text, chunk_links=False, assets=None):
+            chunks.append((content, chunk_links))
+            return fake_render(content, header_text, chunk_links, assets)
+
+        monkeypatch.setattr(main, "RENDER_CHUNK_CHARS", 50)
+        monkeypatch.setattr(main, "render_markdown", recording_render)
+        md = "".join(f"# Seção {i}\n\n{'texto ' * 20}\n\n" for i in range(4)) + "[ref]: https://exemplo.com\n"
+        response = _convert_markdown(api, md.encode("utf-8"))
+
+        assert response.status_code == 200
+        assert len(chunks) == main.render_executor.max_workers
+        assert pdf_page_count(response.content) == len(chunks)
+        assert all(chunk_links for _, chunk_links in chunks)
+        assert all(content.endswith("[ref]: https://exemplo.com\n") for content, _ in chunks)
+
+    def test_small_markdown_is_rendered_whole(self, api, monkeypatch):
+        monkeypatch.setattr(main, "RENDER_CHUNK_CHARS", 10_000)
+        response = _convert_markdown(api, b"# A\n\n# B\n")
+
+        assert pdf_page_count(response.content) == 1
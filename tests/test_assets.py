@@ -0,0 +1,166 @@
+import os
+import time
+
+import pytest
+
+from src.api import main
+from src.core.assets import (
+    ASSET_BASE_URL,
+    AssetFetcher,
+    AssetFetchError,
+    AssetStore,
+    manifest_digest,
+    normalize_asset_path,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AssetStore(tmp_path / "assets", max_bytes=1024)
+
+
+class TestNormalizeAssetPath:
+    @pytest.mark.parametrize("name, expected", [
+        ("logo.png", "logo.png"),
+        ("./img/logo.png", "img/logo.png"),
+        ("img//logo.png", "img/logo.png"),
+        ("img\\logo.png", "img/logo.png"),
+    ])
+    def test_valid_paths(self, name, expected):
+        assert normalize_asset_path(name) == expected
+
+    @pytest.mark.parametrize("name", ["", "/etc/passwd", "../segredo.png", "img/../../x.png", "./"])
+    def test_invalid_paths(self, name):
+        with pytest.raises(ValueError):
+            normalize_asset_path(name)
+
+
+class TestManifestDigest:
+    def test_depends_on_paths_and_contents_not_order(self):
+        assert manifest_digest(None) == manifest_digest({}) == "none"
+        assert manifest_digest({"a.png": "1", "b.png": "2"}) == manifest_digest({"b.png": "2", "a.png": "1"})
+        assert manifest_digest({"a.png": "1"}) != manifest_digest({"a.png": "2"})
+        assert manifest_digest({"a.png": "1"}) != manifest_digest({"b.png": "1"})
+
+
+class TestAssetStore:
+    def test_put_and_read(self, store):
+        digest = store.put(b"imagem")
+
+        assert store.put(b"imagem") == digest
+        assert store.read(digest) == b"imagem"
+        assert store.read("0" * 64) is None
+        assert store.usage()["files"] == 1
+
+    def test_sweep_removes_the_least_recently_used(self, store):
+        old = store.put(b"a" * 600)
+        past = time.time() - 60
+        os.utime(store._blob_path(old), (past, past))
+        new = store.put(b"b" * 600)
+
+        assert store.sweep() == 1
+        assert store.read(old) is None
+        assert store.read(new) == b"b" * 600
+        assert store.usage()["removed_files"] == 1
+
+    def test_remote_copies_expire(self, store):
+        store.put_remote("https://x/logo.png", b"png", "image/png")
+
+        assert store.get_remote("https://x/logo.png", max_age=60)["mime_type"] == "image/png"
+        assert store.get_remote("https://x/logo.png", max_age=-1) is None
+        assert store.get_remote("https://x/logo.png", max_age=None)["data"] == b"png"
+        assert store.get_remote("https://x/outro.png", max_age=None) is None
+
+
+class TestAssetFetcher:
+    def test_uploaded_files_by_relative_path(self, store):
+        assets = {"img/logo.png": store.put(b"png")}
+        fetcher = AssetFetcher(store, assets)
+
+        result = fetcher(f"{fetcher.base_url}img/logo.png")
+        assert result["string"] == b"png"
+        assert result["mime_type"] == "image/png"
+        assert fetcher.base_url == f"{ASSET_BASE_URL}{manifest_digest(assets)}/"
+
+    def test_basename_fallback_only_when_unique(self, store):
+        fetcher = AssetFetcher(store, {"img/logo.png": store.put(b"png")})
+        assert fetcher(f"{fetcher.base_url}logo.png")["string"] == b"png"
+
+        ambiguous = AssetFetcher(store, {"a/logo.png": store.put(b"1"), "b/logo.png": store.put(b"2")})
+        with pytest.raises(AssetFetchError):
+            ambiguous(f"{ambiguous.base_url}logo.png")
+
+    def test_missing_upload(self, store):
+        fetcher = AssetFetcher(store, {})
+
+        with pytest.raises(AssetFetchError):
+            fetcher(f"{fetcher.base_url}img/logo.png")
+
+    @pytest.mark.parametrize("url", [
+        "file:///etc/passwd",
+        f"{ASSET_BASE_URL}outro-manifesto/logo.png",
+        "ftp://x/logo.png",
+    ])
+    def test_other_urls_are_refused(self, store, url):
+        fetcher = AssetFetcher(store, {"logo.png": store.put(b"png")})
+
+        with pytest.raises(AssetFetchError):
+            fetcher(url)
+
+    def test_offline_mode_uses_only_cached_copies(self, store, monkeypatch):
+        def _download(url):
+            raise AssertionError("nada deve ser baixado no modo offline")
+
+        store.put_remote("https://x/antigo.png", b"png", "image/png")
+        fetcher = AssetFetcher(store, allow_remote=False, remote_ttl=0)
+        monkeypatch.setattr(fetcher, "_download", _download)
+
+        assert fetcher("https://x/antigo.png")["string"] == b"png"
+        with pytest.raises(AssetFetchError):
+            fetcher("https://x/novo.png")
+
+    def test_remote_resources_are_downloaded_once(self, store, monkeypatch):
+        downloads = []
+
+        def _download(url):
+            downloads.append(url)
+            return b"png", "image/png"
+
+        fetcher = AssetFetcher(store)
+        monkeypatch.setattr(fetcher, "_download", _download)
+        fetcher("https://x/logo.png")
+        fetcher("https://x/logo.png")
+        assert downloads == ["https://x/logo.png"]
+
+        other = AssetFetcher(store)
+        monkeypatch.setattr(other, "_download", _download)
+        assert other("https://x/logo.png")["string"] == b"png"
+        assert downloads == ["https://x/logo.png"]
+
+
+class TestConvertWithAssets:
+    def _convert(self, client, assets):
+        files = [("markdown_file", ("doc.md", b"![logo](img/logo.png)\n"))]
+        files += [("assets", (name, data)) for name, data in assets]
+        return client.post("/convert/", files=files)
+
+    def test_assets_change_the_cache_key(self, api, monkeypatch):
+        rendered = []
+
+        def _render(content, header_text, chunk_links=False, assets=None):
+            rendered.append(assets)
+            return {"pdf_bytes": b"%PDF-1.4\n", "page_count": 1, "timings": {}}
+
+        monkeypatch.setattr(main, "render_markdown", _render)
+        assert self._convert(api, [("img/logo.png", b"1")]).status_code == 200
+        assert self._convert(api, [("img/logo.png", b"1")]).status_code == 200
+        assert self._convert(api, [("img/logo.png", b"2")]).status_code == 200
+
+        assert len(rendered) == 2
+        assert list(rendered[0]) == ["img/logo.png"]
+        assert rendered[0] != rendered[1]
+
+    def test_invalid_asset_path(self, api):
+        response = self._convert(api, [("../logo.png", b"1")])
+
+        assert response.status_code == 400
@@ -0,0 +1,37 @@
+import io
+import zipfile
+
+from src.core.batch import ZipStream, _build_toc_markdown
+
+
+class TestZipStream:
+    def test_streams_entries_with_unique_names(self, tmp_path):
+        pdf_path = tmp_path / "a.pdf"
+        pdf_path.write_bytes(b"%PDF-a")
+        stream = ZipStream()
+        parts = [
+            stream.add_file(pdf_path, "doc.pdf"),
+            stream.add_bytes("doc.pdf", b"%PDF-b"),
+            stream.add_bytes("doc.pdf", b"%PDF-c"),
+            stream.close(),
+        ]
+
+        assert all(parts)
+        with zipfile.ZipFile(io.BytesIO(b"".join(parts))) as archive:
+            assert archive.namelist() == ["doc.pdf", "doc_2.pdf", "doc_3.pdf"]
+            assert archive.read("doc_3.pdf") == b"%PDF-c"
+
+
+class TestTableOfContents:
+    def test_page_numbers_follow_the_documents(self):
+        toc = _build_toc_markdown([("a", "a.pdf", 3), ("b", "b.pdf", 2), ("c", "c.pdf", 1)], [], first_page=2)
+
+        assert "| a | 2 |" in toc
+        assert "| b | 5 |" in toc
+        assert "| c | 7 |" in toc
+        assert "não convertidos" not in toc
+
+    def test_failures_are_escaped_for_the_table(self):
+        toc = _build_toc_markdown([], [("x.json", "linha 1\nA | B")], first_page=2)
+
+        assert "| x.json | linha 1 A \\| B |" in toc
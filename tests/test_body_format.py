@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from src.core import body_format
+from src.core.body_format import BodyFormatter, _pretty_json
+
+
+class TestPrettyJson:
+    def test_reindents_and_keeps_accents(self):
+        assert _pretty_json('{"nome":"João","itens":[1,2]}') == json.dumps(
+            {"nome": "João", "itens": [1, 2]}, indent=2, ensure_ascii=False
+        )
+
+    def test_invalid_json_returns_none(self):
+        assert _pretty_json("não é json") is None
+
+    @pytest.mark.parametrize("body, expected", [
+        ('{"a": NaN}', "NaN"),
+        ('{"a": -Infinity}', "-Infinity"),
+        ('{"a": 1e400}', "Infinity"),
+        ('{"a": -1e400}', "-Infinity"),
+    ])
+    def test_non_finite_numbers_are_preserved(self, body, expected):
+        pretty = _pretty_json(body)
+
+        assert f'"a": {expected}' in pretty
+        assert "null" not in pretty
+
+    def test_big_integers_are_kept_exact(self):
+        assert "123456789012345678901234567890" in _pretty_json('{"id": 123456789012345678901234567890}')
+
+    def test_same_output_without_orjson(self, monkeypatch):
+        body = '{"a": [1, 2.5, "ç"], "b": {"c": null}}'
+        expected = _pretty_json(body)
+        monkeypatch.setattr(body_format, "orjson", None)
+
+        assert _pretty_json(body) == expected
+
+
+class TestBodyFormatter:
+    def test_json_and_plain_bodies(self):
+        formatter = BodyFormatter()
+
+        assert formatter.format('{"a":1}') == ("json", '{\n  "a": 1\n}')
+        assert formatter.format("texto") == ("", "texto")
+        assert formatter.format(42) == ("json", "42")
+
+    def test_truncate_keeps_the_start_at_a_line_break(self):
+        text = "\n".join(f"linha {i}" for i in range(100))
+        _, shortened = BodyFormatter(max_chars=50).format(text)
+
+        assert shortened.startswith("linha 0\nlinha 1\n")
+        head, note = shortened.rsplit("\n", 1)
+        assert text.startswith(head + "\n")
+        assert note == f"… ({len(text) - len(head)} caracteres omitidos)"
+
+    def test_fold_keeps_the_start_and_the_end(self):
+        text = "\n".join(f"linha {i}" for i in range(100))
+        _, shortened = BodyFormatter(max_chars=50, overflow="fold").format(text)
+
+        assert shortened.startswith("linha 0\n")
+        assert shortened.endswith("linha 99")
+        assert "caracteres omitidos) …" in shortened
+        assert len(shortened) < len(text)
+
+    def test_short_bodies_are_not_changed(self):
+        assert BodyFormatter(max_chars=50).format("curto") == ("", "curto")
+
+    def test_invalid_overflow_mode(self):
+        with pytest.raises(ValueError):
+            BodyFormatter(overflow="cortar")
+
+    def test_signature_follows_the_options(self):
+        assert BodyFormatter().signature == "full"
+        assert BodyFormatter(max_chars=10).signature == "10:truncate"
+        assert BodyFormatter(max_chars=10, overflow="fold").signature == "10:fold"
+
+    def test_cache_hits_and_eviction(self):
+        formatter = BodyFormatter(cache_chars=20)
+
+        formatter.format("a" * 10)
+        formatter.format("a" * 10)
+        assert formatter.stats()["hits"] == 1
+        assert formatter.stats()["misses"] == 1
+
+        formatter.format("b" * 10)
+        formatter.format("c" * 10)
+        stats = formatter.stats()
+        assert stats["entries"] == 2
+        assert stats["chars"] <= 20
+
+        formatter.format("a" * 10)
+        assert formatter.stats()["misses"] == 4
+
+    def test_bodies_larger_than_the_cache_are_not_kept(self):
+        formatter = BodyFormatter(cache_chars=5)
+
+        assert formatter.format("x" * 10) == ("", "x" * 10)
+        assert formatter.stats()["entries"] == 0
@@ -0,0 +1,64 @@
+from src.core.chunking import merge_pdf_chunks, pack_sections, split_markdown, split_sections
+from tests.conftest import fake_pdf, pdf_page_count
+
+
+class TestSplitSections:
+    def test_splits_on_h1_and_h2_only(self):
+        sections, definitions = split_sections("# A\ntexto\n## B\n### C\nmais\n# D\n")
+
+        assert sections == ["# A\ntexto\n", "## B\n### C\nmais\n", "# D\n"]
+        assert definitions == []
+
+    def test_ignores_headings_inside_fenced_code(self):
+        md = (
+            "# Início\n"
+            "```bash\n# comentário\n## outro\n~~~\n```\n"
+            "~~~~\n# dentro\n```\n~~~\n# ainda dentro\n~~~~\n"
+            "## Fim\n"
+        )
+        sections, _ = split_sections(md)
+
+        assert len(sections) == 2
+        assert sections[1] == "## Fim\n"
+        assert "".join(sections) == md
+
+    def test_collects_link_definitions_outside_code(self):
+        md = (
+            "# A\nVeja [docs][d].\n"
+            "[d]: https://exemplo.com/docs\n"
+            "```\n[falso]: https://exemplo.com/codigo\n```\n"
+            "## B\n   [e]: https://exemplo.com/e \"Título\""
+        )
+        sections, definitions = split_sections(md)
+
+        assert len(sections) == 2
+        assert definitions == ["[d]: https://exemplo.com/docs\n", "   [e]: https://exemplo.com/e \"Título\"\n"]
+
+    def test_split_markdown_repeats_definitions_in_every_chunk(self):
+        md = "# A\n" + "a" * 50 + " [x][d]\n\n[d]: https://exemplo.com\n## B\n" + "b" * 50 + " [x][d]\n"
+        chunks = split_markdown(md, max_chunks=2, min_chunk_chars=20)
+
+        assert len(chunks) == 2
+        assert all(chunk.endswith("\n[d]: https://exemplo.com\n") for chunk in chunks)
+
+
+class TestPackSections:
+    def test_small_documents_are_not_split(self):
+        assert pack_sections(["a" * 10, "b" * 10], max_chunks=4, min_chunk_chars=15) == ["a" * 10 + "b" * 10]
+        assert pack_sections(["a" * 100, "b" * 100], max_chunks=1, min_chunk_chars=10) == ["a" * 100 + "b" * 100]
+        assert pack_sections(["a" * 100, "b" * 100], max_chunks=4, min_chunk_chars=0) == ["a" * 100 + "b" * 100]
+
+    def test_groups_consecutive_sections_up_to_the_target_size(self):
+        sections = [str(i) * 10 for i in range(10)]
+        chunks = pack_sections(sections, max_chunks=4, min_chunk_chars=20)
+
+        assert "".join(chunks) == "".join(sections)
+        assert len(chunks) <= 5
+        assert all(len(chunk) >= 20 for chunk in chunks[:-1])
+
+
+class TestMergePdfChunks:
+    def test_keeps_pages_in_order(self):
+        merged = merge_pdf_chunks([fake_pdf("a", pages=2), fake_pdf("b", pages=1)])
+
+        assert pdf_page_count(merged) == 3
@@ -0,0 +1,169 @@
+import json
+import os
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src import cli
+from tests.conftest import fake_pdf, pdf_subject
+
+COLLECTION = {"info": {"name": "API"}, "item": [{"name": "Saúde", "request": {"method": "GET", "url": {"raw": "x"}}}]}
+
+
+def _threads(max_workers, mp_context=None, initializer=None):
+    return ThreadPoolExecutor(max_workers)
+
+
+@pytest.fixture
+def converted(monkeypatch):
+    """Substitui o pool de processos e a renderização; registra os arquivos convertidos."""
+    calls = []
+
+    def _convert_file(input_path, input_kind, header_text, postman_options, body_options):
+        calls.append((os.path.basename(input_path), header_text, postman_options["all_examples"]))
+        return {"pdf_bytes": fake_pdf(header_text), "page_count": 1, "timings": {"render": 0.0}}
+
+    monkeypatch.setattr(cli, "ProcessPoolExecutor", _threads)
+    monkeypatch.setattr(cli, "convert_file", _convert_file)
+    return calls
+
+
+def _run(tmp_path, *inputs, header="Documentação", force=False, all_examples=False, no_cache=True) -> int:
+    args = Namespace(
+        inputs=[str(tmp_path / "docs" / name) for name in inputs] or [str(tmp_path / "docs")],
+        output_dir=str(tmp_path / "out"), jobs=2, header=header, force=force,
+        cache_dir=str(tmp_path / "cache"), no_cache=no_cache, all_examples=all_examples
+    )
+    return cli.run(args)
+
+
+@pytest.fixture
+def docs(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "api").mkdir(parents=True)
+    (docs / "guia.md").write_text("# Guia\n", encoding="utf-8")
+    (docs / "api" / "loja.json").write_text(json.dumps(COLLECTION), encoding="utf-8")
+    (docs / "package.json").write_text('{"name": "site", "version": "1.0.0"}', encoding="utf-8")
+    (docs / "notas.txt").write_text("não é documento", encoding="utf-8")
+    return docs
+
+
+class TestDiscover:
+    def test_directories_keep_the_relative_layout(self, docs, tmp_path, capsys):
+        files = cli.discover([str(docs)], tmp_path / "out")
+
+        assert [(path.name, kind, output.relative_to(tmp_path / "out").as_posix()) for path, kind, output in files] == [
+            ("loja.json", "postman", "api/loja.pdf"),
+            ("guia.md", "markdown", "guia.pdf"),
+        ]
+        assert "package.json não é uma coleção Postman" in capsys.readouterr().err
+
+    def test_globs_and_repeated_inputs(self, docs):
+        files = cli.discover([str(docs / "**" / "*.md"), str(docs / "guia.md")])
+
+        assert [(path.name, output) for path, _, output in files] == [("guia.md", docs / "guia.pdf")]
+
+    def test_invalid_json_is_skipped(self, docs):
+        (docs / "quebrado.json").write_text("{", encoding="utf-8")
+
+        assert cli.discover([str(docs / "quebrado.json")]) == []
+
+
+class TestRun:
+    def test_package_json_does_not_fail_the_run(self, docs, tmp_path, converted):
+        assert _run(tmp_path) == 0
+        assert sorted(name for name, _, _ in converted) == ["guia.md", "loja.json"]
+        assert pdf_subject((tmp_path / "out" / "guia.pdf").read_bytes()) == "Documentação"
+
+    def test_unchanged_files_are_skipped(self, docs, tmp_path, converted):
+        _run(tmp_path)
+        converted.clear()
+
+        assert _run(tmp_path) == 0
+        assert converted == []
+
+    def test_newer_input_with_the_same_content_is_skipped(self, docs, tmp_path, converted):
+        _run(tmp_path)
+        converted.clear()
+        future = os.stat(tmp_path / "out" / "guia.pdf").st_mtime + 60
+        os.utime(docs / "guia.md", (future, future))
+
+        _run(tmp_path)
+        assert converted == []
+
+    def test_changed_content_is_converted(self, docs, tmp_path, converted):
+        _run(tmp_path)
+        converted.clear()
+        (docs / "guia.md").write_text("# Guia 2\n", encoding="utf-8")
+        future = os.stat(tmp_path / "out" / "guia.pdf").st_mtime + 60
+        os.utime(docs / "guia.md", (future, future))
+
+        _run(tmp_path)
+        assert [name for name, _, _ in converted] == ["guia.md"]
+
+    def test_changed_options_are_converted_even_with_an_older_input(self, docs, tmp_path, converted):
+        _run(tmp_path)
+        converted.clear()
+
+        _run(tmp_path, header="Outro cabeçalho")
+        assert sorted(converted) == [("guia.md", "Outro cabeçalho", False), ("loja.json", "Outro cabeçalho", False)]
+        converted.clear()
+
+        _run(tmp_path, "api/loja.json", header="Outro cabeçalho", all_examples=True)
+        assert converted == [("loja.json", "Outro cabeçalho", True)]
+
+    def test_force(self, docs, tmp_path, converted):
+        _run(tmp_path)
+        converted.clear()
+
+        _run(tmp_path, force=True)
+        assert len(converted) == 2
+
+    def test_outputs_without_a_manifest_entry_are_converted(self, docs, tmp_path, converted):
+        (tmp_path / "out").mkdir()
+        (tmp_path / "out" / "guia.pdf").write_bytes(b"feito a mao")
+
+        _run(tmp_path, "guia.md")
+        assert [name for name, _, _ in converted] == ["guia.md"]
+
+    def test_legacy_manifest_entries_are_upgraded(self, docs, tmp_path, converted):
+        _run(tmp_path, "guia.md")
+        manifest_path = tmp_path / "out" / cli.MANIFEST_NAME
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        manifest_path.write_text(json.dumps({"guia.pdf": manifest["guia.pdf"]["key"]}), encoding="utf-8")
+        converted.clear()
+
+        _run(tmp_path, "guia.md")
+        assert converted == []
+        assert json.loads(manifest_path.read_text(encoding="utf-8")) == manifest
+
+    def test_result_cache_is_shared_between_output_directories(self, docs, tmp_path, converted):
+        _run(tmp_path, "guia.md", no_cache=False)
+        converted.clear()
+        (tmp_path / "out" / "guia.pdf").unlink()
+
+        _run(tmp_path, "guia.md", no_cache=False)
+        assert converted == []
+        assert pdf_subject((tmp_path / "out" / "guia.pdf").read_bytes()) == "Documentação"
+
+
+class TestCacheKey:
+    def test_key_depends_on_content_header_and_examples(self, docs):
+        collection = docs / "api" / "loja.json"
+        key = cli.cache_key(collection, "postman", "A", False)
+
+        assert cli.cache_key(collection, "postman", "A", False) == key
+        assert cli.cache_key(collection, "postman", "B", False) != key
+        assert cli.cache_key(collection, "postman", "A", True) != key
+        assert cli.options_key("postman", "A", False) != cli.options_key("postman", "A", True)
+        assert cli.options_key("postman", "A", False) != cli.options_key("markdown", "A", False)
+
+    def test_key_never_matches_the_service(self, docs):
+        from src.api import main
+        from src.core.result_cache import PDFResultCache
+
+        with open(docs / "guia.md", "rb") as f:
+            service_key = PDFResultCache.make_key("markdown", [f.read()], "A", main.generate_pdf_css("A"))
+
+        assert cli.cache_key(docs / "guia.md", "markdown", "A", False) != service_key
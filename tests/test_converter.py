@@ -0,0 +1,103 @@
+import io
+import json
+
+import pytest
+
+from src.core.postman_json_to_markdown import PostmanJsonToMarkdown
+from src.core.postman_stream import StreamingPostmanJsonToMarkdown
+
+
+def _request(name, method="GET", **fields):
+    request = {
+        "method": method,
+        "header": [{"key": "Accept", "value": "application/json", "description": "Formato da resposta"}],
+        "url": {
+            "raw": f"https://api.exemplo.com/{name}?page=1",
+            "query": [{"key": "page", "value": "1", "description": {"content": "Página", "type": "text/plain"}}],
+        },
+        **fields,
+    }
+    return {
+        "name": name,
+        "description": f"Requisição {name}.",
+        "request": request,
+        "response": [{"name": "OK", "code": 200, "body": '{"id": 1, "tags": ["a", "b"]}'}],
+    }
+
+
+COLLECTION = {
+    "info": {
+        "name": "API de Exemplo",
+        "description": {"content": "Descrição da coleção (Postman v2.1).", "type": "text/markdown"},
+        "schema": "https://schema.getpostman.com/json/collection/v2.1.0/collection.json",
+    },
+    "variable": [{"key": "base", "value": "https://api.exemplo.com"}],
+    "item": [
+        {
+            "name": "Usuários",
+            "description": "Operações de usuários.",
+            "item": [
+                _request("listar"),
+                _request("criar", method="POST", body={"mode": "raw", "raw": '{"nome": "Ana", "idade": 30}'}),
+                {
+                    "name": "Administração",
+                    "item": [_request("remover", method="DELETE"), {"name": "Vazia", "item": []}],
+                },
+            ],
+        },
+        _request("status"),
+        "ignorado",
+        {"name": "Pedidos", "item": [_request("pedido", body={"mode": "raw", "raw": "texto simples"})]},
+    ],
+}
+
+
+def _stream_parser(collection=COLLECTION, **options):
+    return StreamingPostmanJsonToMarkdown(io.BytesIO(json.dumps(collection).encode("utf-8")), **options)
+
+
+def _without_strings(collection):
+    # O percurso em memória espera apenas objetos nas listas `item`.
+    items = [item for item in collection["item"] if isinstance(item, dict)]
+    return dict(collection, item=items)
+
+
+class TestStreamingPostman:
+    def test_stream_nodes_match_dict_traversal(self):
+        expected = list(PostmanJsonToMarkdown(_without_strings(COLLECTION))._iter_nodes())
+        actual = list(_stream_parser()._iter_nodes())
+
+        assert [level for level, _ in actual] == [level for level, _ in expected]
+        for (_, streamed), (_, item) in zip(actual, expected):
+            if "item" in item:
+                assert streamed == dict(item, item=[])
+            else:
+                assert streamed == item
+
+    def test_stream_markdown_matches_dict_markdown(self):
+        expected = "".join(PostmanJsonToMarkdown(_without_strings(COLLECTION)).iter_markdown())
+
+        assert "".join(_stream_parser().iter_markdown()) == expected
+
+    def test_top_level_items_match_collection(self):
+        parser = _stream_parser()
+
+        assert list(parser.iter_top_level_items()) == _without_strings(COLLECTION)["item"]
+        assert parser._item_count == 9
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 1024])
+    def test_leading_bom_is_skipped(self, chunk_size):
+        class SmallReads(io.BytesIO):
+            def read(self, size=-1):
+                return super().read(chunk_size if size < 0 else min(size, chunk_size))
+
+        content = json.dumps(COLLECTION).encode("utf-8")
+        expected = "".join(_stream_parser().iter_markdown())
+
+        parser = StreamingPostmanJsonToMarkdown(SmallReads(b"\xef\xbb\xbf" + content), max_bytes=len(content) + 3)
+        assert "".join(parser.iter_markdown()) == expected
+
+    @pytest.mark.parametrize("content", [b'{"info": {}, "item": [{"name": "x",', b"[1, 2]", b""])
+    def test_invalid_collection(self, content):
+        with pytest.raises(ValueError):
+            list(StreamingPostmanJsonToMarkdown(io.BytesIO(content))._iter_nodes())
@@ -0,0 +1,103 @@
+import os
+import time
+
+import pytest
+
+from src.core.jobs import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RENDERING, JobStore, describe_job
+
+
+@pytest.fixture
+def store(tmp_path):
+    job_store = JobStore(tmp_path / "jobs.sqlite3")
+    yield job_store
+    job_store.close()
+
+
+def _create(store, job_id: str):
+    return store.create(
+        job_id, input_kind="markdown", filename="doc.md", pdf_filename="doc.pdf",
+        header_text="Documentação", input_path=f"/tmp/{job_id}.input"
+    )
+
+
+class TestJobStore:
+    def test_lifecycle(self, store):
+        job = _create(store, "a")
+        assert job["status"] == JOB_QUEUED
+        assert job["worker_pid"] == os.getpid()
+
+        store.mark_rendering("a")
+        assert store.get("a")["status"] == JOB_RENDERING
+        store.mark_done("a", "/tmp/a.pdf")
+
+        job = store.get("a")
+        assert job["status"] == JOB_DONE
+        assert job["result_path"] == "/tmp/a.pdf"
+        assert job["input_path"] is None
+        assert job["started_at"] <= job["finished_at"]
+
+    def test_failed_job_keeps_the_error(self, store):
+        _create(store, "a")
+        store.mark_failed("a", "JSON inválido")
+
+        job = store.get("a")
+        assert job["status"] == JOB_FAILED
+        assert job["error"] == "JSON inválido"
+
+    def test_unknown_job(self, store):
+        assert store.get("nada") is None
+
+    def test_pop_expired_removes_only_old_finished_jobs(self, store):
+        for job_id in ("antigo", "recente", "pendente"):
+            _create(store, job_id)
+        store.mark_done("antigo", "/tmp/antigo.pdf")
+        store._update("antigo", finished_at=time.time() - 100)
+        store.mark_done("recente", "/tmp/recente.pdf")
+
+        expired = store.pop_expired(50)
+        assert [job["id"] for job in expired] == ["antigo"]
+        assert expired[0]["result_path"] == "/tmp/antigo.pdf"
+        assert store.get("antigo") is None
+        assert store.get("recente") is not None
+        assert store.get("pendente") is not None
+
+    def test_fail_unfinished_skips_jobs_of_live_processes(self, store):
+        _create(store, "meu")
+        _create(store, "outro_vivo")
+        _create(store, "outro_morto")
+        store._update("outro_vivo", worker_pid=os.getppid())
+        store._update("outro_morto", worker_pid=2 ** 22 + 12345)
+
+        failed = store.fail_unfinished("Reiniciado.")
+        assert sorted(job["id"] for job in failed) == ["meu", "outro_morto"]
+        assert failed[0]["input_path"].endswith(".input")
+        assert store.get("meu")["error"] == "Reiniciado."
+        assert store.get("outro_vivo")["status"] == JOB_QUEUED
+
+    def test_store_is_shared_between_connections(self, store, tmp_path):
+        _create(store, "a")
+        other = JobStore(tmp_path / "jobs.sqlite3")
+        try:
+            other.mark_done("a", "/tmp/a.pdf")
+        finally:
+            other.close()
+
+        assert store.get("a")["status"] == JOB_DONE
+
+
+class TestDescribeJob:
+    def test_queue_and_render_times(self, store):
+        _create(store, "a")
+        store._update("a", created_at=100.0, started_at=102.5, finished_at=110.0, status=JOB_DONE)
+
+        described = describe_job(store.get("a"))
+        assert described["queue_seconds"] == 2.5
+        assert described["render_seconds"] == 7.5
+        assert "input_path" not in described
+
+    def test_queued_job_has_no_render_time(self, store):
+        described = describe_job(_create(store, "a"))
+
+        assert described["status"] == JOB_QUEUED
+        assert described["render_seconds"] is None
+        assert described["queue_seconds"] >= 0
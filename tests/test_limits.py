@@ -0,0 +1,171 @@
+import io
+import json
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from src.api import main
+from src.api.limits import RequestSizeLimitMiddleware
+from src.core.postman_stream import (
+    PostmanCollectionTooComplexError,
+    PostmanCollectionTooLargeError,
+    StreamingPostmanJsonToMarkdown,
+)
+
+MAX_BYTES = 1024
+BATCH_MAX_BYTES = 4096
+
+
+def _make_client():
+    app = FastAPI()
+    app.add_middleware(RequestSizeLimitMiddleware, max_bytes=MAX_BYTES, path_limits={"/batch": BATCH_MAX_BYTES})
+    received = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        content = await file.read()
+        received.append(content)
+        return {"bytes": len(content)}
+
+    @app.post("/batch")
+    async def batch(file: UploadFile = File(...)):
+        return {"bytes": len(await file.read())}
+
+    return TestClient(app), received
+
+
+def _chunked(content: bytes, chunk_size: int = 100):
+    # Um gerador faz o httpx enviar o corpo com Transfer-Encoding: chunked, sem Content-Length.
+    for start in range(0, len(content), chunk_size):
+        yield content[start:start + chunk_size]
+
+
+def _multipart(payload: bytes):
+    boundary = "limite-de-teste"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="doc.md"\r\n'
+        "Content-Type: text/markdown\r\n\r\n"
+    ).encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+    return body, {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+
+class TestRequestSizeLimitMiddleware:
+    def test_accepts_body_within_limit(self):
+        client, received = _make_client()
+        response = client.post("/upload", files={"file": ("doc.md", b"# ok\n")})
+
+        assert response.status_code == 200
+        assert received == [b"# ok\n"]
+
+    def test_rejects_declared_content_length_before_reading(self):
+        client, received = _make_client()
+        response = client.post("/upload", files={"file": ("doc.md", b"x" * (MAX_BYTES + 1))})
+
+        assert response.status_code == 413
+        assert str(MAX_BYTES) in response.json()["detail"]
+        assert received == []
+
+    def test_rejects_invalid_content_length(self):
+        client, _ = _make_client()
+        body, headers = _multipart(b"x")
+        response = client.post("/upload", content=body, headers={**headers, "Content-Length": "muitos"})
+
+        assert response.status_code == 400
+
+    def test_rejects_chunked_body_while_streaming(self):
+        client, received = _make_client()
+        body, headers = _multipart(b"x" * (MAX_BYTES * 3))
+        response = client.post("/upload", content=_chunked(body), headers=headers)
+
+        assert response.status_code == 413
+        assert str(MAX_BYTES) in response.json()["detail"]
+        assert received == []
+
+    def test_accepts_chunked_body_within_limit(self):
+        client, received = _make_client()
+        body, headers = _multipart(b"y" * 200)
+        response = client.post("/upload", content=_chunked(body), headers=headers)
+
+        assert response.status_code == 200
+        assert received == [b"y" * 200]
+
+    def test_path_limit_overrides_default(self):
+        client, _ = _make_client()
+        payload = b"z" * (MAX_BYTES * 2)
+
+        assert client.post("/batch", files={"file": ("doc.md", payload)}).status_code == 200
+        assert client.post("/upload", files={"file": ("doc.md", payload)}).status_code == 413
+        body, headers = _multipart(b"z" * (BATCH_MAX_BYTES + 1))
+        assert client.post("/batch", content=_chunked(body), headers=headers).status_code == 413
+
+
+
+def _request(name: str) -> dict:
+    return {"name": name, "request": {"method": "GET", "url": {"raw": f"https://api.exemplo.com/{name}"}}}
+
+
+def _nested(folders: int) -> dict:
+    """Coleção com `folders` pastas aninhadas e uma requisição na mais interna."""
+    item = _request("folha")
+    for level in range(folders):
+        item = {"name": f"Pasta {folders - level}", "item": [item]}
+    return {"info": {"name": "API"}, "item": [item]}
+
+
+def _stream_parser(collection: dict, **options) -> StreamingPostmanJsonToMarkdown:
+    return StreamingPostmanJsonToMarkdown(io.BytesIO(json.dumps(collection).encode("utf-8")), **options)
+
+
+class TestPostmanLimits:
+    def test_item_limit_stops_inside_top_level_folder(self):
+        folder = {"name": "Grande", "item": [_request(f"r{i}") for i in range(1000)]}
+        parser = _stream_parser({"info": {}, "item": [folder]}, max_items=10)
+
+        with pytest.raises(PostmanCollectionTooComplexError):
+            next(parser.iter_top_level_items())
+        assert parser._item_count == 11
+
+    def test_item_limit_counts_folders_and_requests(self):
+        collection = {"info": {}, "item": [{"name": "Pasta", "item": [_request("a"), _request("b")]}]}
+
+        assert len(list(_stream_parser(collection, max_items=3)._iter_nodes())) == 3
+        with pytest.raises(PostmanCollectionTooComplexError):
+            list(_stream_parser(collection, max_items=2)._iter_nodes())
+
+    @pytest.mark.parametrize("traversal", ["_iter_nodes", "iter_top_level_items"])
+    def test_depth_limit_counts_folders_only(self, traversal):
+        assert list(getattr(_stream_parser(_nested(4), max_depth=4), traversal)())
+        with pytest.raises(PostmanCollectionTooComplexError, match="4 níveis de pastas"):
+            list(getattr(_stream_parser(_nested(5), max_depth=4), traversal)())
+
+    def test_loose_requests_fit_any_depth_limit(self):
+        collection = {"info": {}, "item": [_request("a"), _request("b")]}
+
+        assert len(list(_stream_parser(collection, max_depth=0)._iter_nodes())) == 2
+        with pytest.raises(PostmanCollectionTooComplexError):
+            list(_stream_parser(_nested(1), max_depth=0)._iter_nodes())
+
+    def test_size_limit_is_checked_while_reading(self):
+        collection = {"info": {}, "item": [_request(f"r{i}") for i in range(200)]}
+        data = json.dumps(collection).encode("utf-8")
+
+        with pytest.raises(PostmanCollectionTooLargeError):
+            list(StreamingPostmanJsonToMarkdown(io.BytesIO(data), max_bytes=len(data) - 1)._iter_nodes())
+        assert len(list(StreamingPostmanJsonToMarkdown(io.BytesIO(data), max_bytes=len(data))._iter_nodes())) == 200
+
+
+class TestUploadLimits:
+    def test_markdown_above_its_limit_returns_413(self, api, monkeypatch):
+        monkeypatch.setattr(main, "MARKDOWN_MAX_BYTES", 10)
+        response = api.post("/convert/", files={"markdown_file": ("doc.md", b"# " + b"x" * 20)})
+
+        assert response.status_code == 413
+
+    def test_collection_above_its_limits_is_rejected(self, api, monkeypatch):
+        monkeypatch.setattr(main, "POSTMAN_MAX_DEPTH", 1)
+        response = api.post("/convert/", files={"postman_json_file": ("api.json", json.dumps(_nested(2)).encode())})
+
+        assert response.status_code == 422
+        assert "níveis de pastas" in response.json()["detail"]
@@ -0,0 +1,79 @@
+import re
+from html.parser import HTMLParser
+
+from src.core.markdown_html import markdown_to_html
+from src.core.postman_html import PostmanHtmlRenderer
+from src.core.postman_json_to_markdown import PostmanJsonToMarkdown
+from tests.test_converter import COLLECTION, _without_strings
+
+
+class _Outline(HTMLParser):
+    """
+    Extrai a parte do HTML que chega ao PDF: títulos, células de tabela e blocos de
+    código, com o texto normalizado (o realce de sintaxe e os espaços não importam).
+    """
+    _BLOCKS = {"h1", "h2", "h3", "h4", "h5", "h6", "th", "td", "pre"}
+
+    def __init__(self):
+        super().__init__()
+        self.blocks = []
+        self._open = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._BLOCKS:
+            self._open.append((tag, []))
+
+    def handle_endtag(self, tag):
+        if self._open and self._open[-1][0] == tag:
+            _, text = self._open.pop()
+            self.blocks.append((tag, re.sub(r"\s+", "", "".join(text))))
+
+    def handle_data(self, data):
+        for _, text in self._open:
+            text.append(data)
+
+
+def _outline(html: str) -> list:
+    parser = _Outline()
+    parser.feed(html)
+    return parser.blocks
+
+
+def _both(collection: dict, **options):
+    markdown_html = markdown_to_html("".join(PostmanJsonToMarkdown(collection, **options).iter_markdown()))
+    template_html = PostmanHtmlRenderer(PostmanJsonToMarkdown(collection, **options)).convert_to_html()
+    return markdown_html, template_html
+
+
+class TestPostmanHtmlRenderer:
+    def test_same_headings_tables_and_bodies_as_the_markdown_path(self):
+        markdown_html, template_html = _both(_without_strings(COLLECTION))
+
+        assert _outline(template_html) == _outline(markdown_html)
+        assert len(_outline(template_html)) > 20
+
+    def test_all_examples_option(self):
+        collection = _without_strings(COLLECTION)
+        request = collection["item"][1]
+        request["response"].append({"name": "Erro", "code": 500, "body": '{"erro": true}'})
+        markdown_html, template_html = _both(collection, all_examples=True)
+
+        assert _outline(template_html) == _outline(markdown_html)
+        assert "erro" in template_html
+
+    def test_user_text_is_escaped(self):
+        collection = {"info": {"name": "<script>alert(1)</script>"}, "item": [
+            {"name": "<b>x</b>", "request": {"method": "GET", "url": {"raw": "https://x/?a=<b>"}}},
+        ]}
+        html = PostmanHtmlRenderer(PostmanJsonToMarkdown(collection)).convert_to_html()
+
+        assert "<script>" not in html
+        assert "<b>x</b>" not in html
+
+    def test_sections_split_at_top_level_items(self):
+        renderer = PostmanHtmlRenderer(PostmanJsonToMarkdown(_without_strings(COLLECTION)))
+        sections = list(renderer.iter_sections())
+
+        assert len(sections) == 1 + 3 # Cabeçalho e um por item de primeiro nível
+        assert "".join(sections) == renderer.convert_to_html()
+        assert sections[1].startswith("<h2")
@@ -0,0 +1,78 @@
+import copy
+import io
+import json
+
+from pypdf import PdfReader
+
+from src.core.postman_incremental import PostmanFragmentPlanner, merge_pdf_fragments
+from src.core.postman_stream import StreamingPostmanJsonToMarkdown
+from tests.conftest import fake_pdf, pdf_page_count
+
+
+def _request(name: str) -> dict:
+    return {"name": name, "request": {"method": "GET", "url": {"raw": f"https://api.exemplo.com/{name}"}}}
+
+
+COLLECTION = {
+    "info": {"name": "API", "description": "Coleção de exemplo."},
+    "item": [
+        _request("status"),
+        _request("versao"),
+        {"name": "Usuários", "item": [_request("listar"), _request("criar")]},
+        _request("solta"),
+        {"name": "Pedidos", "item": [_request("pedido")]},
+    ],
+}
+
+
+def _plan(collection=COLLECTION, header_text="Documentação", lookup=lambda key: None):
+    parser = StreamingPostmanJsonToMarkdown(io.BytesIO(json.dumps(collection).encode("utf-8")))
+    return PostmanFragmentPlanner(parser, header_text=header_text, css="body {}", lookup=lookup).plan()
+
+
+class TestPostmanFragmentPlanner:
+    def test_groups_loose_requests_and_splits_folders(self):
+        fragments = _plan()
+
+        assert [fragment["title"] for fragment in fragments] == ["API", "Usuários", "solta", "Pedidos"]
+        assert "Coleção de exemplo." in fragments[0]["html_content"]
+        assert "status" in fragments[0]["html_content"] and "versao" in fragments[0]["html_content"]
+        assert "listar" in fragments[1]["html_content"]
+        assert "solta" in fragments[2]["html_content"]
+        assert all(fragment["pdf_path"] is None for fragment in fragments)
+
+    def test_only_changed_fragments_get_new_keys(self):
+        changed = copy.deepcopy(COLLECTION)
+        changed["item"][4]["item"].append(_request("cancelar"))
+        before, after = _plan(), _plan(changed)
+
+        assert [f["cache_key"] for f in before[:3]] == [f["cache_key"] for f in after[:3]]
+        assert before[3]["cache_key"] != after[3]["cache_key"]
+
+    def test_header_text_changes_every_key(self):
+        keys = {fragment["cache_key"] for fragment in _plan()}
+
+        assert keys.isdisjoint(fragment["cache_key"] for fragment in _plan(header_text="Outro"))
+
+    def test_cached_fragments_skip_html_generation(self, tmp_path):
+        cached = {_plan()[1]["cache_key"]: tmp_path / "usuarios.pdf"}
+        fragments = _plan(lookup=cached.get)
+
+        assert fragments[1]["pdf_path"] == tmp_path / "usuarios.pdf"
+        assert fragments[1]["html_content"] is None
+        assert all(fragment["html_content"] for i, fragment in enumerate(fragments) if i != 1)
+
+
+class TestMergePdfFragments:
+    def test_one_outline_item_per_fragment(self, tmp_path):
+        documents = []
+        for title, pages in (("API", 1), ("Usuários", 2)):
+            path = tmp_path / f"{title}.pdf"
+            path.write_bytes(fake_pdf(title, pages=pages))
+            documents.append((title, str(path)))
+
+        merged = merge_pdf_fragments(documents)
+
+        reader = PdfReader(io.BytesIO(merged))
+        assert pdf_page_count(merged) == 3
+        assert [item.title for item in reader.outline] == ["API", "Usuários"]
@@ -0,0 +1,94 @@
+import json
+
+from src.api import main
+from src.core.preview import PREVIEW_CSP, iter_markdown_preview, preview_error, preview_head
+
+MARKDOWN = "# Título\n\nIntro com [link][ref].\n\n## Seção A\n\ntexto A\n\n## Seção B\n\ntexto B\n\n[ref]: https://exemplo.com\n"
+
+COLLECTION = {
+    "info": {"name": "Loja"},
+    "item": [
+        {"name": "Usuários", "item": [
+            {"name": "Listar", "request": {"method": "GET", "url": {"raw": "https://api/usuarios"}}},
+        ]},
+        {"name": "Saúde", "request": {"method": "GET", "url": {"raw": "https://api/saude"}}},
+    ],
+}
+
+
+def _preview(client, filename: str, content, **data):
+    field = "markdown_file" if filename.endswith(".md") else "postman_json_file"
+    return client.post("/preview", files={field: (filename, content)}, data=data)
+
+
+class TestMarkdownPreview:
+    def test_sections_are_cut_at_h1_and_h2(self):
+        sections = list(iter_markdown_preview(MARKDOWN))
+
+        assert len(sections) == 3
+        assert "<h1" in sections[0] and "<h2" in sections[1] and "<h2" in sections[2]
+
+    def test_reference_links_resolve_in_every_section(self):
+        sections = list(iter_markdown_preview(MARKDOWN))
+
+        assert 'href="https://exemplo.com"' in sections[0]
+
+    def test_head_and_error_escape_user_text(self):
+        assert "<script>" not in preview_head("<script>x</script>", "<b>t</b>")
+        assert "<script>" not in preview_error("<script>x</script>")
+
+
+class TestPreviewEndpoint:
+    def test_markdown_preview(self, api):
+        response = _preview(api, "guia.md", MARKDOWN.encode("utf-8-sig"), header_text="Cabeçalho")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/html; charset=utf-8"
+        body = response.text
+        assert body.startswith("<!DOCTYPE html>")
+        assert "<title>Pré-visualização: guia</title>" in body
+        assert "Cabeçalho" in body
+        assert "Seção A" in body and "Seção B" in body
+        assert "\ufeff" not in body
+        assert body.rstrip().endswith("</html>")
+
+    def test_security_headers(self, api):
+        response = _preview(api, "guia.md", b"# x\n")
+
+        assert response.headers["content-security-policy"] == PREVIEW_CSP
+        assert response.headers["x-content-type-options"] == "nosniff"
+        assert "script-src" not in PREVIEW_CSP and "default-src 'none'" in PREVIEW_CSP
+
+    def test_postman_preview(self, api):
+        response = _preview(api, "loja.json", json.dumps(COLLECTION).encode())
+
+        assert response.status_code == 200
+        assert "<title>Pré-visualização: Loja</title>" in response.text
+        assert "Usuários" in response.text and "https://api/saude" in response.text
+
+    def test_invalid_json_is_an_http_error(self, api):
+        response = _preview(api, "loja.json", b"{nao e json")
+
+        assert response.status_code == 400
+
+    def test_limit_reached_while_streaming_ends_with_an_error_block(self, api, monkeypatch):
+        monkeypatch.setattr(main, "POSTMAN_MAX_ITEMS", 2)
+        response = _preview(api, "loja.json", json.dumps(COLLECTION).encode())
+
+        assert response.status_code == 200
+        assert 'class="preview-error"' in response.text
+        assert response.text.rstrip().endswith("</html>")
+
+    def test_markdown_must_be_utf8(self, api):
+        response = _preview(api, "guia.md", "título".encode("latin-1"))
+
+        assert response.status_code == 400
+
+    def test_does_not_use_the_render_pool(self, api, monkeypatch):
+        def _fail(*args, **kwargs):
+            raise AssertionError("a pré-visualização não renderiza PDF")
+
+        monkeypatch.setattr(main, "render_markdown", _fail)
+        response = _preview(api, "guia.md", MARKDOWN.encode())
+
+        assert response.status_code == 200
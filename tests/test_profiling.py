@@ -0,0 +1,145 @@
+import io
+import json
+import marshal
+import pstats
+import threading
+import time
+import zipfile
+
+import pytest
+
+from src.api import main
+from src.core import profiling
+from src.core.profiling import StackSampler, document_stats, profile_conversion, write_artifact
+
+ADMIN_TOKEN = "segredo"
+
+
+class _FakeConverter:
+    page_count = 3
+    timings = {"render": 0.01}
+
+
+def _fake_convert(input_kind, data, header_text, assets, postman_options, body_options):
+    time.sleep(0.05)
+    return _FakeConverter(), b"%PDF-1.4\n", None
+
+
+def _fake_profile(input_kind, data, header_text, assets=None, postman_options=None, body_options=None):
+    return {
+        "pdf_bytes": b"%PDF-1.4\n",
+        "page_count": 1,
+        "timings": {},
+        "pstats": marshal.dumps({}),
+        "collapsed": "main (x.py:1) 1\n",
+        "stats": {"input_kind": input_kind, "input_bytes": len(data)},
+    }
+
+
+def _loaded(pstats_bytes: bytes):
+    # pstats.Stats lê arquivos; o perfil é reconstruído a partir do dicionário.
+    class _Profile:
+        def create_stats(self):
+            pass
+
+    profile = _Profile()
+    profile.stats = marshal.loads(pstats_bytes)
+    return profile
+
+
+def _busy_wait(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(100))
+
+
+def test_document_stats():
+    html = '<h1>T</h1><h2 id="a">A</h2><table><tr><td>x</td></tr></table><pre><code>c</code></pre><img src="a.png"><a href="#">l</a>'
+
+    stats = document_stats(html)
+
+    assert stats == {"headings": 2, "tables": 1, "code_blocks": 1, "images": 1, "links": 1, "html_chars": len(html)}
+
+
+def test_stack_sampler_collapses_stacks_from_root_to_leaf():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_wait, args=(stop,))
+    worker.start()
+    try:
+        with StackSampler(thread_id=worker.ident, interval=0.001) as sampler:
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        worker.join()
+
+    lines = sampler.collapsed().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) >= 1
+    assert stack.split(";")[-1].startswith("_busy_wait (test_profiling.py:")
+
+
+def test_profile_conversion_and_artifact(monkeypatch):
+    monkeypatch.setattr(profiling, "_convert", _fake_convert)
+
+    result = profile_conversion("markdown", "# Título\n\n| a |\n|---|\n| 1 |\n".encode("utf-8-sig"), "Cabeçalho", interval=0.001)
+
+    stats = result["stats"]
+    assert stats["page_count"] == 3
+    assert stats["headings"] == 1 and stats["tables"] == 1
+    assert stats["timings"] == {"render": 0.01}
+    assert stats["samples"] > 0
+    pstats.Stats(_loaded(result["pstats"])) # Formato aceito pelo pstats
+
+    output = io.BytesIO()
+    write_artifact(output, result, include_pdf=True)
+    with zipfile.ZipFile(output) as archive:
+        assert sorted(archive.namelist()) == ["document.pdf", "profile.collapsed", "profile.pstats", "stats.json"]
+        assert json.loads(archive.read("stats.json")) == stats
+
+
+class TestProfileEndpoints:
+    @pytest.fixture
+    def admin(self, api, monkeypatch):
+        monkeypatch.setattr(main, "ADMIN_TOKEN", ADMIN_TOKEN)
+        monkeypatch.setattr(main, "profile_conversion", _fake_profile)
+        return api
+
+    def _convert(self, client, token=None):
+        headers = {"X-Admin-Token": token} if token else {}
+        return client.post(
+            "/convert/", files={"markdown_file": ("doc.md", b"# x\n")}, data={"profile": "true"}, headers=headers
+        )
+
+    def test_profile_and_download(self, admin):
+        response = self._convert(admin, ADMIN_TOKEN)
+
+        assert response.status_code == 200
+        assert response.content == b"%PDF-1.4\n"
+        profile_url = response.headers["x-profile-url"]
+        assert profile_url == f"/admin/profiles/{response.headers['x-profile-id']}"
+
+        download = admin.get(profile_url, headers={"X-Admin-Token": ADMIN_TOKEN})
+        assert download.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+            assert json.loads(archive.read("stats.json"))["input_kind"] == "markdown"
+
+    def test_profiles_are_not_cached(self, admin):
+        assert self._convert(admin, ADMIN_TOKEN).status_code == 200
+        second = self._convert(admin, ADMIN_TOKEN)
+
+        assert "etag" not in second.headers
+        assert "x-profile-id" in second.headers
+
+    @pytest.mark.parametrize("token", [None, "errado"])
+    def test_requires_the_admin_token(self, admin, token):
+        assert self._convert(admin, token).status_code == 403
+        assert admin.get("/admin/profiles/abc", headers={"X-Admin-Token": token} if token else {}).status_code == 403
+
+    def test_disabled_without_admin_token(self, api):
+        assert self._convert(api, "qualquer").status_code == 403
+
+    @pytest.mark.parametrize("profile_id", ["inexistente", "..%2Fjobs"])
+    def test_unknown_profile(self, admin, profile_id):
+        response = admin.get(f"/admin/profiles/{profile_id}", headers={"X-Admin-Token": ADMIN_TOKEN})
+
+        assert response.status_code == 404
@@ -0,0 +1,65 @@
+import asyncio
+import signal
+import threading
+import time
+
+import pytest
+
+from src.core.render_executor import RenderQueueFullError, RenderTimeoutError, _run_with_deadline
+from tests.conftest import InlineRenderExecutor
+
+
+class TestRunWithDeadline:
+    def test_returns_result_within_deadline(self):
+        assert _run_with_deadline(5, sum, [1, 2, 3]) == 6
+
+    def test_interrupts_job_past_deadline(self):
+        start = time.monotonic()
+        with pytest.raises(RenderTimeoutError):
+            _run_with_deadline(0.05, time.sleep, 5)
+
+        assert time.monotonic() - start < 1
+        assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+    def test_restores_previous_alarm_handler(self):
+        previous = signal.getsignal(signal.SIGALRM)
+        _run_with_deadline(5, len, "abc")
+
+        assert signal.getsignal(signal.SIGALRM) is previous
+
+
+class TestAdmission:
+    def test_rejects_jobs_beyond_workers_and_queue(self):
+        executor = InlineRenderExecutor(max_workers=1, max_queue=1, timeout=None, retry_after=7)
+        release = threading.Event()
+
+        async def scenario():
+            running = [asyncio.create_task(executor.run(release.wait, 5)) for _ in range(executor.capacity)]
+            await asyncio.sleep(0.05)
+            assert executor.pending == 2
+            with pytest.raises(RenderQueueFullError) as error:
+                await executor.run(release.wait, 5)
+            assert error.value.retry_after == 7
+            release.set()
+            return await asyncio.gather(*running)
+
+        try:
+            assert asyncio.run(scenario()) == [True, True]
+            assert executor.pending == 0
+        finally:
+            release.set()
+            executor.shutdown()
+
+    def test_failed_job_releases_its_slot(self):
+        executor = InlineRenderExecutor(max_workers=1, max_queue=0, timeout=None)
+
+        async def scenario():
+            with pytest.raises(ZeroDivisionError):
+                await executor.run(divmod, 1, 0)
+            return await executor.run(divmod, 7, 2)
+
+        try:
+            assert asyncio.run(scenario()) == (3, 1)
+            assert executor.pending == 0
+        finally:
+            executor.shutdown()
@@ -0,0 +1,73 @@
+from src.core.result_cache import PDFResultCache
+
+
+class TestPDFResultCache:
+    def _key(self, content: bytes, chunk_size: int = 3, kind: str = "markdown", header: str = "Documentação"):
+        chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+        return PDFResultCache.make_key(kind, chunks, header, "body {}")
+
+    def test_key_ignores_bom_and_crlf_across_chunks(self):
+        plain = self._key(b"# T\nlinha\n", chunk_size=100)
+
+        assert self._key(b"\xef\xbb\xbf# T\r\nlinha\r\n") == plain
+        for size in range(1, 8):
+            assert self._key(b"# T\r\nlinha\r\n", chunk_size=size) == plain
+
+    def test_inputs_with_the_same_key_render_the_same_document(self):
+        # A chave ignora o BOM e o CRLF; a renderização também precisa ignorá-los.
+        from src.core.markdown_html import markdown_to_html
+
+        plain = b"# T\n\nlinha\n"
+        variant = b"\xef\xbb\xbf# T\r\n\r\nlinha\r\n"
+
+        assert self._key(variant) == self._key(plain)
+        assert markdown_to_html(variant.decode("utf-8-sig")) == markdown_to_html(plain.decode("utf-8-sig"))
+        assert "<h1" in markdown_to_html(variant.decode("utf-8-sig"))
+
+    def test_key_keeps_lone_carriage_returns(self):
+        assert self._key(b"a\rb") != self._key(b"a\nb")
+        assert self._key(b"a\r") != self._key(b"a")
+
+    def test_key_depends_on_kind_header_and_css(self):
+        base = self._key(b"x")
+
+        assert self._key(b"x", kind="postman") != base
+        assert self._key(b"x", header="Outro") != base
+        assert PDFResultCache.make_key("markdown", [b"x"], "Documentação", "body { color: red }") != base
+        # Os campos têm tamanho prefixado: mover texto entre eles muda a chave.
+        assert PDFResultCache.make_key("ab", [], "c", "") != PDFResultCache.make_key("a", [], "bc", "")
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = PDFResultCache(tmp_path, max_bytes=25)
+        cache.put("a", b"a" * 10)
+        cache.put("b", b"b" * 10)
+        assert cache.get("a") is not None # "a" passa a ser o mais recente
+        cache.put("c", b"c" * 10)
+
+        assert cache.get("b") is None
+        assert cache.get("a").read_bytes() == b"a" * 10
+        assert cache.get("c").read_bytes() == b"c" * 10
+        assert not (tmp_path / "b.pdf").exists()
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes_stored"] == 20
+
+    def test_keeps_entry_larger_than_quota(self, tmp_path):
+        cache = PDFResultCache(tmp_path, max_bytes=5)
+        cache.put("a", b"a" * 3)
+        path = cache.put("b", b"b" * 10)
+
+        assert path.read_bytes() == b"b" * 10
+        assert cache.get("a") is None
+        assert cache.stats()["entries"] == 1
+
+    def test_index_is_rebuilt_and_shared_through_disk(self, tmp_path):
+        writer = PDFResultCache(tmp_path, max_bytes=100)
+        reader = PDFResultCache(tmp_path, max_bytes=100)
+        writer.put("a", b"pdf")
+
+        assert reader.get("a").read_bytes() == b"pdf"
+        assert PDFResultCache(tmp_path, max_bytes=100).stats()["bytes_stored"] == 3
+
+        writer.put("b", b"b" * 98)
+        reader.refresh()
+        assert reader.stats()["bytes_stored"] <= 100
@@ -0,0 +1,71 @@
+import os
+import time
+
+from src.core.scratch import ScratchSpace
+
+
+def _write(path, size: int, age: float = 0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    if age:
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+class TestScratchSpace:
+    def test_removes_files_older_than_max_age(self, tmp_path):
+        old = _write(tmp_path / "batch_1" / "a.pdf", 10, age=100)
+        new = _write(tmp_path / "b.pdf", 10)
+        space = ScratchSpace(tmp_path, max_age=50, max_bytes=1000)
+
+        assert space.sweep() == {"removed_files": 1, "removed_bytes": 10}
+        assert not old.exists()
+        assert new.exists()
+
+    def test_enforces_quota_removing_oldest_first(self, tmp_path):
+        oldest = _write(tmp_path / "a.pdf", 40, age=30)
+        middle = _write(tmp_path / "b.pdf", 40, age=20)
+        newest = _write(tmp_path / "c.pdf", 40, age=10)
+        space = ScratchSpace(tmp_path, max_age=3600, max_bytes=90)
+
+        space.sweep()
+        assert not oldest.exists()
+        assert middle.exists() and newest.exists()
+        assert space.usage()["bytes"] == 80
+
+    def test_excluded_dirs_and_protected_files_are_kept(self, tmp_path):
+        cached = _write(tmp_path / "cache" / "k.pdf", 100, age=100)
+        job_input = _write(tmp_path / "jobs" / "j.input", 100, age=100)
+        database = _write(tmp_path / "jobs" / "jobs.sqlite3-wal", 100, age=100)
+        space = ScratchSpace(
+            tmp_path, max_age=50, max_bytes=0,
+            exclude_dirs=(tmp_path / "cache",), protected_patterns=("jobs.sqlite3*", "*.input")
+        )
+
+        assert space.sweep()["removed_files"] == 0
+        assert cached.exists() and job_input.exists() and database.exists()
+
+    def test_usage_by_directory_and_removed_totals(self, tmp_path):
+        _write(tmp_path / "jobs" / "a.pdf", 10, age=100)
+        _write(tmp_path / "jobs" / "b.pdf", 5)
+        _write(tmp_path / "c.pdf", 3)
+        space = ScratchSpace(tmp_path, max_age=50, max_bytes=1000)
+        space.sweep()
+
+        usage = space.usage()
+        assert usage["files"] == 2
+        assert usage["bytes"] == 8
+        assert usage["directories"] == {"jobs": {"files": 1, "bytes": 5}, ".": {"files": 1, "bytes": 3}}
+        assert usage["removed_files"] == 1
+        assert usage["removed_bytes"] == 10
+        assert usage["last_sweep"] is not None
+
+    def test_does_not_follow_symlinks(self, tmp_path):
+        outside = _write(tmp_path / "fora" / "importante.txt", 10, age=100)
+        scratch = tmp_path / "temp"
+        scratch.mkdir()
+        os.symlink(outside.parent, scratch / "link")
+        ScratchSpace(scratch, max_age=50, max_bytes=0).sweep()
+
+        assert outside.exists()